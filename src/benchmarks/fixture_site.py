@@ -0,0 +1,304 @@
+"""
+HTML fixtures served locally in place of the live sites the crawlers read.
+
+A fixture site is a directory of saved pages and an index.json:
+    {"seeds": [url, ...], "pages": {"<host>/<path>?<query>": "<file>.html"}}
+
+FixtureServer serves page https://<host>/<path> at http://127.0.0.1/<host>/<path>,
+rewriting links to recorded hosts on the way out, so a crawl seeded with local_url()
+stays on the fixtures. Sites are either recorded from the live seeds with this module or
+generated with generate_site().
+
+Usage:
+    python3 -m src.benchmarks.fixture_site out_dir url [url ...] [--max-pages 20]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import types
+import typing
+from html import escape
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from aiohttp import web
+
+INDEX_FILE = "index.json"
+DEFAULT_PORT = 80
+LOOPBACK = "127.0.0.1"
+HREF = re.compile(r"""href=["']([^"'#]+)""", re.IGNORECASE)
+ROOT_RELATIVE = re.compile(r"""\b(href|src|action)=(["'])/(?!/)""", re.IGNORECASE)
+
+WORDS = ["enterprise", "support", "companies", "local", "capability", "project", "costs", "qualifying", "business",
+         "growth", "digital", "solutions", "productivity", "overseas", "market", "workforce", "training", "partners",
+         "industry", "application", "assessment", "funding", "innovation", "sustainability", "development", "scheme",
+         "eligible", "applicants", "programme", "adoption", "technology", "expansion", "operations", "resources"]
+ADJECTIVES = ["Advanced", "Green", "Digital", "Global", "Smart", "Enterprise", "Future", "Regional", "Productive",
+              "Resilient", "Connected", "Skilled"]
+TOPICS = ["Manufacturing", "Logistics", "Retail", "Maritime", "Food Services", "Tourism", "Fintech", "Aviation",
+          "Construction", "Healthcare", "Media", "Agritech"]
+COUNTRIES = ["India", "China", "Indonesia", "Vietnam", "Hong Kong", "Thailand", "Malaysia", "Philippines"]
+GUIDE_SECTIONS = ["Why Invest", "Where to Invest", "Sector Insights", "Setting Up a Business", "Tax and Accounting",
+                  "HR and Payroll"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+# Values for fields whose name contains the key, checked in order, so facets and filters get realistic input
+FIELD_POOLS = [
+    ("time", ["9:00am - 12:00pm", "2:00pm - 5:30pm", "10:00am - 4:00pm"]),
+    ("mode", ["Physical", "Virtual", "Hybrid"]),
+    ("cost", ["Free", "Paid"]),
+    ("incentive_type", ["Grant", "Tax Incentive", "Programme", "Loan"]),
+    ("industr", ["Manufacturing & Engineering", "Retail", "Logistics", "Food Services", "ICT & Media", "All"]),
+    ("capability", ["Digitalisation", "Internationalisation", "Human Capital", "Sustainability", "Innovation"]),
+    ("agenc", ["Enterprise Singapore", "IMDA", "EDB", "MAS", "BCA", "STB"]),
+    ("organiser", ["Singapore Business Federation", "SGTech", "SME Centre"]),
+    ("market", ["Asia-Pacific", "ASEAN", "China", "No market focus"]),
+    ("event_type", ["Seminar or Workshop", "Networking Event", "Business Mission", "Conference"]),
+    ("audience", ["SMEs", "Startups", "Large Local Enterprises"]),
+    ("need", ["Automate processes", "Expand overseas", "Train employees", "Reduce emissions"]),
+]
+
+
+def page_key(url):
+    """Where a page is filed: host, path without the trailing slash and query, e.g. "www.x.gov.sg/a/b?page=2"."""
+    parts = urlsplit(url)
+    return parts.netloc.lower() + parts.path.rstrip("/") + (f"?{parts.query}" if parts.query else "")
+
+
+class FixtureSite:
+    """Saved pages of one or more hosts and the seeds a crawl over them starts from."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.seeds = []
+        self.pages = {}
+        path = os.path.join(directory, INDEX_FILE)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.seeds, self.pages = index["seeds"], index["pages"]
+
+    @property
+    def hosts(self):
+        return sorted({key.split("/", 1)[0].split("?", 1)[0] for key in self.pages})
+
+    def add_page(self, url, html):
+        key = page_key(url)
+        filename = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + ".html"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as f:
+            f.write(html)
+        self.pages[key] = filename
+
+    def read_page(self, key):
+        filename = self.pages.get(key)
+        if filename is None:
+            return None
+        with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"seeds": self.seeds, "pages": self.pages}, f, indent=1)
+
+
+class FixtureServer:
+    """
+    Serves a FixtureSite at http://127.0.0.1. crawl4ai's deep crawl only follows links whose
+    host has a dot and, port included, matches the page's host, so the server listens on
+    port 80 (root, or a lowered net.ipv4.ip_unprivileged_port_start) of the IPv4 loopback
+    rather than on localhost or a free port. Pages served are counted in requests, robots.txt
+    requests aside.
+    """
+
+    def __init__(self, site, port=DEFAULT_PORT):
+        self.site = site
+        self.port = port
+        self.requests = 0
+        self.base_url = None
+        self._runner = None
+        hosts = "|".join(re.escape(host) for host in site.hosts) or r"(?!)"
+        self._absolute = re.compile(rf"""\b((?:href|src|action)=["'])(?:https?:)?//({hosts})(?=[/"'?#])""",
+                                    re.IGNORECASE)
+
+    def local_url(self, url):
+        return f"{self.base_url}/{page_key(url)}"
+
+    def rewrite(self, html, host):
+        html = self._absolute.sub(lambda match: f"{match.group(1)}{self.base_url}/{match.group(2).lower()}", html)
+        return ROOT_RELATIVE.sub(lambda match: f"{match.group(1)}={match.group(2)}/{host}/", html)
+
+    async def _handle(self, request):
+        if request.path == "/robots.txt":
+            return web.Response(status=404)
+        key = page_key("https:/" + request.raw_path)
+        html = self.site.read_page(key)
+        if html is None:
+            return web.Response(status=404, text="Not a fixture page")
+        self.requests += 1
+        return web.Response(text=self.rewrite(html, key.split("/", 1)[0]), content_type="text/html")
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, LOOPBACK, self.port).start()
+            self.base_url = f"http://{LOOPBACK}" + (f":{self.port}" if self.port != 80 else "")
+        except OSError as e:
+            await web.TCPSite(self._runner, LOOPBACK, 0).start()
+            port = self._runner.addresses[0][1]
+            self.base_url = f"http://{LOOPBACK}:{port}"
+            print(f"⚠️ Could not listen on port {self.port} ({e}), serving fixtures at {self.base_url}. "
+                  f"crawl4ai counts links to a host with a port as external, so crawls stop at their seeds")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+
+async def record_site(urls, directory, max_pages=20):
+    """Save each seed and up to max_pages same-host pages it links to as a FixtureSite."""
+    site = FixtureSite(directory)
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
+        async def fetch(url):
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200 and "html" in response.headers.get("Content-Type", ""):
+                        return await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"⚠️ Could not record {url}: {e}")
+            return None
+
+        for seed in urls:
+            html = await fetch(seed)
+            if html is None:
+                continue
+            site.add_page(seed, html)
+            host = urlsplit(seed).netloc
+            links = [urljoin(seed, href) for href in HREF.findall(html)]
+            links = [link for link in dict.fromkeys(links)
+                     if urlsplit(link).netloc == host and page_key(link) not in site.pages][:max_pages]
+            for link, page in zip(links, await asyncio.gather(*(fetch(link) for link in links))):
+                if page is not None:
+                    site.add_page(link, page)
+            site.seeds.append(seed)
+            print(f"📼 Recorded {seed} and {len(links)} linked pages")
+    site.save()
+    return site
+
+
+def sentence(rng, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def paragraph(rng, words):
+    return " ".join(sentence(rng, 12) for _ in range(max(1, words // 12)))
+
+
+def is_list_annotation(annotation):
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        return any(is_list_annotation(arg) for arg in typing.get_args(annotation))
+    return typing.get_origin(annotation) in (list, typing.List)
+
+
+def field_value(field, is_list, name, url, rng):
+    """A plausible value of a record field, ";"-separated for list fields."""
+    if "link" in field or "website" in field:
+        return url
+    if "date" in field:
+        day, month = rng.randint(1, 28), rng.randrange(12)
+        return f"{day} {MONTHS[month]} 2027" if rng.random() < 0.7 else \
+            f"{day} - {min(day + 2, 28)} {MONTHS[month]} 2027"
+    if "valid" in field:
+        return f"Applications close on {rng.randint(1, 28)} {rng.choice(MONTHS)} 2027"
+    if "funding" in field or field == "benefits":
+        return f"Up to {rng.choice([30, 50, 70, 80])}% of qualifying costs, capped at S${rng.choice([20, 30, 50, 100])},000"
+    if field in ("type", "incentive_type"):
+        return rng.choice(["Grant", "Tax Incentive", "Programme", "Loan"])
+    pool = next((values for key, values in FIELD_POOLS if key in field), None)
+    if is_list:
+        return "; ".join(rng.sample(pool, 2) if pool else [sentence(rng, 8) for _ in range(2)])
+    if pool:
+        return rng.choice(pool)
+    return f"{field.replace('_', ' ').capitalize()} of the {name}: {sentence(rng, 10)}"
+
+
+def record_page(name, fields, merge_key, url, rng):
+    values = [(field, name if field == merge_key else field_value(field, is_list, name, url, rng))
+              for field, is_list in fields]
+    items = "\n".join(f"<li><strong>{escape(field.replace('_', ' '))}</strong>: {escape(value)}</li>"
+                      for field, value in values)
+    return (f"<html><head><title>{escape(name)}</title></head><body>\n<main>\n<h1>{escape(name)}</h1>\n"
+            f"<p>{paragraph(rng, 120)}</p>\n<ul>\n{items}\n</ul>\n<p>{paragraph(rng, 48)}</p>\n</main>\n</body></html>")
+
+
+def listing_page(title, links, rng):
+    items = "\n".join(f'<li><a href="{escape(path)}">{escape(text)}</a></li>' for path, text in links)
+    return (f"<html><head><title>{escape(title)}</title></head><body>\n<main>\n<h1>{escape(title)}</h1>\n"
+            f"<p>{paragraph(rng, 180)}</p>\n<ul>\n{items}\n</ul>\n</main>\n</body></html>")
+
+
+def slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def generate_site(directory, host, section, noun, model=None, merge_key=None, seeds=3, pages_per_seed=8):
+    """
+    Write a deterministic FixtureSite: seeds listing pages under /<section>/, each linking to
+    pages_per_seed record pages with one "field: value" line per field of the pydantic model.
+    Every fifth record page repeats the previous record under its acronym, the kind of
+    near-duplicate the merge stage folds together. Without a model the pages are guide
+    sections of prose, as the general info crawler reads them.
+    """
+    site = FixtureSite(directory)
+    site.seeds, site.pages = [], {}
+    fields = [(field, is_list_annotation(info.annotation)) for field, info in model.model_fields.items()] \
+        if model is not None else []
+    record = 0
+    for seed_number in range(seeds):
+        topic = COUNTRIES[seed_number % len(COUNTRIES)] if model is None else TOPICS[seed_number % len(TOPICS)]
+        seed_path = f"/{section}/{slug(topic)}"
+        links, previous = [], None
+        for page_number in range(pages_per_seed):
+            if model is None:
+                name = f"{GUIDE_SECTIONS[page_number % len(GUIDE_SECTIONS)]} in {topic}"
+            elif page_number % 5 == 4 and previous:
+                name = f"{previous} ({''.join(word[0] for word in previous.split() if word[0].isupper())})"
+            else:
+                name = f"{ADJECTIVES[record % len(ADJECTIVES)]} {TOPICS[record // len(ADJECTIVES) % len(TOPICS)]} {noun}"
+                name += f" {record // (len(ADJECTIVES) * len(TOPICS)) + 1}" if record >= len(ADJECTIVES) * len(TOPICS) else ""
+                record += 1
+            path = f"{seed_path}/{slug(name)}"
+            url = f"https://{host}{path}"
+            rng = random.Random(url)
+            site.add_page(url, listing_page(name, [], rng) if model is None else
+                          record_page(name, fields, merge_key, url, rng))
+            links.append((path, name))
+            previous = name
+        seed_url = f"https://{host}{seed_path}"
+        site.add_page(seed_url, listing_page(f"{topic} {section.replace('-', ' ')}", links, random.Random(seed_url)))
+        site.seeds.append(seed_url)
+    site.save()
+    return site
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--max-pages", type=int, default=20, help="linked pages recorded per seed")
+    args = parser.parse_args()
+    site = asyncio.run(record_site(args.urls, args.out_dir, args.max_pages))
+    print(f"📼 {len(site.pages)} pages of {len(site.seeds)} seeds saved to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
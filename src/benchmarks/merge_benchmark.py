@@ -0,0 +1,155 @@
+"""
+Benchmark merge_csv_records_by_name on a synthetic crawl output against the original
+list-scanning implementation, and check that every variant writes identical bytes.
+
+Usage:
+    python3 -m src.benchmarks.merge_benchmark [--rows 1000000] [--keys 20000] [--skip-legacy]
+
+Each variant runs in its own process so its peak RSS can be reported.
+"""
+import argparse
+import ast
+import csv
+import filecmp
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from src.common.csv_merge import merge_csv_records_by_name
+
+FIELDNAMES = ["incentive_name", "agency_administering", "eligibility_criteria", "activity", "funding_support",
+              "industry", "capability_areas", "error"]
+AGENCIES = ["Enterprise Singapore", "Monetary Authority of Singapore", "IMDA", "Workforce Singapore", "MPA"]
+INDUSTRIES = ["Retail", "Logistics", "Manufacturing", "Maritime", "Finance", "Food Services", "ICT", "Construction"]
+CAPABILITIES = ["Digitalisation", "Human Capital", "Internationalisation", "Sustainability", "Innovation"]
+
+
+def legacy_merge_csv_records_by_name(input_csv_path, output_csv_path=None, merge_key='name'):
+    """The merge as it was before the streaming rewrite, kept as the reference output."""
+    merged_records = defaultdict(dict)
+    with open(input_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        fieldnames = reader.fieldnames
+        for row in reader:
+            key = row.get(merge_key)
+            if not key:
+                continue
+            for field, raw_value in row.items():
+                if field == merge_key:
+                    merged_records[key][merge_key] = key
+                    continue
+                if not raw_value:
+                    continue
+                value = raw_value
+                try:
+                    if raw_value.startswith('[') and raw_value.endswith(']'):
+                        value = ast.literal_eval(raw_value)
+                except (ValueError, SyntaxError):
+                    value = raw_value
+                if field in merged_records[key]:
+                    existing = merged_records[key][field]
+                    if isinstance(existing, list) and isinstance(value, list):
+                        to_add = [v for v in value if v not in existing]
+                        existing.extend(to_add)
+                    elif isinstance(existing, list):
+                        if value not in existing:
+                            existing.append(value)
+                    elif isinstance(value, list):
+                        base = [existing]
+                        to_add = [v for v in value if v != existing]
+                        merged_records[key][field] = base + to_add
+                    else:
+                        lines = existing.split('\n')
+                        if value not in lines:
+                            merged_records[key][field] = existing + '\n' + value
+                else:
+                    merged_records[key][field] = value
+    result = list(merged_records.values())
+    if output_csv_path:
+        with open(output_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(result)
+        return None
+    return result
+
+
+def write_synthetic_csv(path, rows, keys, seed=7):
+    """Crawl-like rows: skewed key popularity, list columns and multi-line text cells."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(keys)]
+    names = [f"Scheme {rank} – {rng.choice(CAPABILITIES)} Grant" for rank in range(keys)]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for _ in range(rows):
+            name = rng.choices(names, weights)[0]
+            writer.writerow([
+                name,
+                rng.choice(AGENCIES),
+                str([f"Criterion {rng.randrange(400)}" for _ in range(rng.randrange(1, 4))]),
+                f"Supports activity {rng.randrange(300)}",
+                f"Up to {rng.randrange(30, 90)}% of qualifying costs" if rng.random() < 0.6 else "",
+                str(rng.sample(INDUSTRIES, rng.randrange(1, 3))),
+                str(rng.sample(CAPABILITIES, rng.randrange(1, 3))),
+                "False",
+            ])
+
+
+def run_variant(variant, input_path, output_path, chunk_rows):
+    if variant == "legacy":
+        legacy_merge_csv_records_by_name(input_path, output_path, "incentive_name")
+    elif variant == "in-memory":
+        merge_csv_records_by_name(input_path, output_path, "incentive_name")
+    else:
+        merge_csv_records_by_name(input_path, output_path, "incentive_name", external_sort=True, chunk_rows=chunk_rows)
+
+
+def measure(variant, input_path, output_path, chunk_rows):
+    """Run one variant in a child process, returning (seconds, peak RSS in MB)."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "src.benchmarks.merge_benchmark", "--run", variant,
+                                input_path, output_path, "--chunk-rows", str(chunk_rows)])
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"{variant} merge failed with status {status}")
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=20_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="the legacy merge takes minutes on 1M rows")
+    parser.add_argument("--run", nargs=3, metavar=("VARIANT", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(*args.run, args.chunk_rows)
+        return
+
+    variants = ["in-memory", "external-sort"] if args.skip_legacy else ["legacy", "in-memory", "external-sort"]
+    with tempfile.TemporaryDirectory(prefix="merge_benchmark_") as work_dir:
+        input_path = os.path.join(work_dir, "grants.csv")
+        write_synthetic_csv(input_path, args.rows, args.keys)
+        print(f"Synthetic input: {args.rows:,} rows, {args.keys:,} keys, "
+              f"{os.path.getsize(input_path) / 1e6:,.0f} MB\n")
+        print(f"{'Variant':<15} {'Seconds':>10} {'Peak RSS MB':>12} {'Identical':>10}")
+
+        reference = None
+        for variant in variants:
+            output_path = os.path.join(work_dir, f"{variant}.csv")
+            elapsed, peak_mb = measure(variant, input_path, output_path, args.chunk_rows)
+            reference = reference or output_path
+            identical = filecmp.cmp(reference, output_path, shallow=False)
+            print(f"{variant:<15} {elapsed:>10.1f} {peak_mb:>12.0f} {str(identical):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Run each tool's crawl -> extract -> merge -> recommend pipeline offline and time every stage.
+
+The stages run the tools' own code, as their main.py does, with three things swapped.
+Pages come from a FixtureServer on the loopback address instead of the live sites. The model
+is an OfflineLLM: extraction requests are answered with the records in the pages'
+"field: value" lines, and recommendation requests, streamed by recommend_async or synchronous
+from recommend(), with a stub answer quoting the request and the first rows of data it was
+given; every call waits --latency seconds first. The record store, crawl state, caches and
+exported files are written to a temporary directory, so the tools' scraper_output is never
+touched. Sites are generated unless --fixtures points at sites recorded with
+src.benchmarks.fixture_site (one subdirectory per tool).
+
+For every stage it reports wall time, pages or queries per second, model calls and tokens
+(counted with the local tokenizer) and the peak resident memory of the process while the
+stage ran. Extraction happens during the crawl, so its row is a share of the crawl row.
+
+Usage:
+    python3 -m src.benchmarks.pipeline_benchmark [--tools grants stocktake events guides] [--seeds 3]
+        [--pages 8] [--latency 0.2] [--queries 4] [--fixtures dir] [--json path]
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import importlib
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from src.benchmarks.fixture_site import DEFAULT_PORT, FixtureServer, FixtureSite, generate_site, slug
+from src.common import seed_crawl
+from src.common.columnar_store import read_table
+from src.common.extraction_cache import ExtractionCache
+from src.common.llm_stream import use_stub_llm
+from src.common.near_duplicates import merge_near_duplicates
+from src.common.offline_llm import OfflineExtractionStrategy, OfflineLLM
+from src.common.response_cache import ResponseCache
+
+TOOLS = {
+    "grants": {
+        "package": "src.grants_recommender_tool",
+        "crawler": "web_crawler",
+        "recommender": "src.grants_recommender_tool.grant_recommender",
+        "post_process": None,
+        "site": ("www.grants.fixture.gov.sg", "grants", "Grant"),
+        "queries": ["I run a logistics SME and want to automate my warehouse",
+                    "Funding to expand into overseas markets",
+                    "Grants for training staff in digital skills",
+                    "Support for reducing energy use in manufacturing"],
+    },
+    "stocktake": {
+        "package": "src.grants_stocktake_tool",
+        "crawler": "web_crawler",
+        "recommender": "src.grants_recommender_tool.grant_recommender",
+        "post_process": ("src.grants_stocktake_tool.incentive_facets", "add_funding_terms"),
+        "site": ("www.incentives.fixture.gov.sg", "schemes", "Scheme"),
+        "queries": ["Tax incentives for companies investing in innovation",
+                    "Schemes covering at least half of project costs",
+                    "Loans for retail businesses going digital",
+                    "Programmes for human capital development"],
+    },
+    "events": {
+        "package": "src.events_listing_tool",
+        "crawler": "web_crawler",
+        "recommender": "src.events_listing_tool.events_recommender",
+        "post_process": ("src.events_listing_tool.event_facets", "add_date_ranges"),
+        "site": ("members.events.fixture.org.sg", "events", "Workshop"),
+        "queries": ["Free virtual workshops on internationalisation",
+                    "Networking events for food services companies",
+                    "Business missions to ASEAN markets",
+                    "Seminars on sustainability for manufacturers"],
+    },
+    "guides": {
+        "package": "src.general_info_adviser_tool",
+        "crawler": "web_crawler",
+        "recommender": "src.general_info_adviser_tool.general_info_advisor",
+        "post_process": None,
+        "site": ("www.guides.fixture.com", "doing-business-guide", None),
+        "queries": ["What are the corporate tax rates in Vietnam?",
+                    "How do I set up a company in India?",
+                    "Which sectors are growing in Indonesia?",
+                    "What are the payroll obligations in China?"],
+    },
+}
+RSS_INTERVAL = 0.01  # Seconds between resident memory samples
+
+
+def rss_bytes():
+    """Resident memory of the process now, or its peak so far where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """Peak resident memory while the block runs, sampled from a background thread."""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, rss_bytes())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.peak = rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+class Stopwatch:
+    """Wall time during which at least one timed call runs, overlapping and nested calls counted once."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.items = 0
+        self._running = 0
+        self._started = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if not self._running:
+                self._started = time.perf_counter()
+            self._running += 1
+
+    def stop(self, items=0):
+        with self._lock:
+            self._running -= 1
+            self.items += items
+            if not self._running:
+                self.seconds += time.perf_counter() - self._started
+
+    def wrap(self, function, count_items=True):
+        def timed(*args, **kwargs):
+            self.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.stop(1 if count_items else 0)
+        return timed
+
+    def wrap_async(self, function, count_items=True):
+        async def timed(results, *args, **kwargs):
+            self.start()
+            try:
+                return await function(results, *args, **kwargs)
+            finally:
+                self.stop(sum(1 for result in results if result.success) if count_items else 0)
+        return timed
+
+
+class StageReport:
+    """Rows of the report, one per stage of each tool."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.rows = []
+
+    @contextlib.asynccontextmanager
+    async def stage(self, tool, name, unit):
+        """Time the block; it sets row["items"] to the pages or queries it handled."""
+        row = {"tool": tool, "stage": name, "unit": unit, "items": 0}
+        usage = self.llm.stats()
+        start = time.perf_counter()
+        with RssSampler() as rss:
+            yield row
+        row["seconds"] = time.perf_counter() - start
+        row.update({key: value - usage[key] for key, value in self.llm.stats().items()})
+        row["peak_rss_mb"] = rss.peak / 1e6
+        self.rows.append(row)
+
+    def add_share(self, parent, name, stopwatch):
+        """
+        A row for the part of a stage spent in stopwatch's calls, such as extraction during the
+        crawl. It shares the stage's model usage and memory peak.
+        """
+        self.rows.append(dict(parent, stage=name, items=stopwatch.items, seconds=stopwatch.seconds))
+
+    def print(self):
+        print(f"\n{'tool':<10} {'stage':<18} {'seconds':>8} {'rate':>16} {'llm calls':>10} {'prompt tok':>11} "
+              f"{'output tok':>11} {'peak RSS MB':>12}")
+        for row in self.rows:
+            rate = f"{row['items'] / row['seconds']:,.1f} {row['unit']}/s" if row["seconds"] and row["items"] else "-"
+            print(f"{row['tool']:<10} {row['stage']:<18} {row['seconds']:>8.2f} {rate:>16} {row['calls']:>10,} "
+                  f"{row['prompt_tokens']:>11,} {row['completion_tokens']:>11,} {row['peak_rss_mb']:>12.0f}")
+
+
+def fixture_site(tool, spec, store, args, directory):
+    recorded = os.path.join(args.fixtures, tool) if args.fixtures else None
+    if recorded and os.path.isfile(os.path.join(recorded, "index.json")):
+        return FixtureSite(recorded)
+    host, section, noun = spec["site"]
+    return generate_site(os.path.join(directory, "site"), host, section, noun,
+                         store.model if store is not None else None, store.merge_key if store is not None else None,
+                         args.seeds, args.pages)
+
+
+def isolate_crawler(stack, crawler, directory, llm, args):
+    """
+    Point the crawler module's state files and caches at directory and its model at llm.
+    Returns a record store in directory, None for the guides, which write text files instead.
+    """
+    stack.enter_context(mock.patch.object(crawler, "CRAWL_SETTINGS", dataclasses.replace(
+        crawler.CRAWL_SETTINGS, crawl_checkpoint=os.path.join(directory, "crawl_checkpoint.jsonl"),
+        crawl_report=os.path.join(directory, "crawl_report.json"),
+        readiness_profiles=os.path.join(directory, "readiness_profiles.json"),
+        fetch_tiers=os.path.join(directory, "fetch_tiers.json"), host_requests_per_second=args.rate)))
+    if not hasattr(crawler, "open_record_store"):
+        stack.enter_context(mock.patch.object(crawler, "OUTPUT_FILEPATH", os.path.join(directory, "guides", "")))
+        os.makedirs(os.path.join(directory, "guides"))
+        return None
+
+    cache = ExtractionCache(os.path.join(directory, "extraction_cache"))
+    strategy = OfflineExtractionStrategy(crawler.extraction_strategy.strategy, llm)
+    stack.enter_context(mock.patch.object(crawler, "extraction_cache", cache))
+    stack.enter_context(mock.patch.object(crawler.extraction_strategy, "cache", cache))
+    stack.enter_context(mock.patch.object(crawler.extraction_strategy, "strategy", strategy))
+    if crawler.batch_extractor is not None:
+        stack.enter_context(mock.patch.object(crawler.batch_extractor, "cache", cache))
+        stack.enter_context(mock.patch.object(crawler.batch_extractor, "strategy", strategy))
+    store = crawler.open_record_store(os.path.join(directory, "records.db"))
+    stack.callback(store.close)
+    return store
+
+
+def queries(spec, count):
+    base = spec["queries"]
+    return [base[i % len(base)] + (f" (request {i + 1})" if i >= len(base) else "") for i in range(count)]
+
+
+async def run_tool(tool, spec, report, llm, args):
+    crawler = importlib.import_module(f"{spec['package']}.{spec['crawler']}")
+    recommender = importlib.import_module(spec["recommender"])
+    contants = importlib.import_module(f"{spec['package']}.contants")
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.ExitStack() as stack:
+        store = isolate_crawler(stack, crawler, directory, llm, args)
+        stack.enter_context(mock.patch.object(recommender, "response_cache",
+                                              ResponseCache(os.path.join(directory, "response_cache"))))
+        site = fixture_site(tool, spec, store, args, directory)
+        guides = store is None
+
+        async with FixtureServer(site, args.port) as server:
+            seeds = [server.local_url(seed) for seed in site.seeds]
+            extraction = Stopwatch()
+            if not guides:
+                batched = crawler.batch_extractor is not None
+                stack.enter_context(mock.patch.object(seed_crawl, "extract_results",
+                                                      extraction.wrap_async(seed_crawl.extract_results, batched)))
+                stack.enter_context(mock.patch.object(crawler.extraction_strategy, "run", extraction.wrap(
+                    crawler.extraction_strategy.run, not batched)))
+
+            print(f"\n🧪 {tool}: crawling {len(seeds)} seeds of {len(site.pages)} fixture pages")
+            async with report.stage(tool, "crawl" if guides else "crawl + extract", "pages") as crawl:
+                if guides:
+                    await crawler.crawl_to_text([(seed, f"business_guide_{slug(seed.rsplit('/', 1)[-1])}.txt")
+                                                 for seed in seeds])
+                else:
+                    await crawler.crawl_to_json(seeds, store)
+                crawl["items"] = server.requests
+            if not guides:
+                report.add_share(crawl, "  of which extract", extraction)
+
+        if guides:
+            data_path = crawler.OUTPUT_FILEPATH
+            guide_index = importlib.import_module(f"{spec['package']}.guide_index")
+            stack.enter_context(mock.patch.object(guide_index, "GUIDE_INDEX_DIR", os.path.join(directory, "index")))
+            async with report.stage(tool, "index", "guides") as index:
+                guide_index.load_or_build_guide_index(data_path)
+                index["items"] = len(os.listdir(data_path))
+        else:
+            data_path = os.path.join(directory, f"{tool}.parquet")
+            async with report.stage(tool, "merge", "records") as merge:
+                store.export(data_path)
+                merge_near_duplicates(data_path, merge_key=store.merge_key,
+                                      threshold=contants.NEAR_DUPLICATE_THRESHOLD)
+                if spec["post_process"]:
+                    module, function = spec["post_process"]
+                    getattr(importlib.import_module(module), function)(data_path)
+                merge["items"] = len(read_table(data_path, [store.merge_key]))
+            async with report.stage(tool, "index", "records") as index:
+                recommender.refresh_index(data_path)
+                index["items"] = merge["items"]
+
+        async with report.stage(tool, "recommend", "queries") as recommend:
+            requests = queries(spec, args.queries)
+            answers = await asyncio.gather(*(recommender.recommend_async(request, data_path) for request in requests))
+            recommend["items"] = sum(1 for answer in answers if answer)
+
+        # The same requests through the synchronous recommend() the CLI used, one at a time and
+        # with an empty cache so every one reaches the model
+        stack.enter_context(mock.patch.object(recommender, "response_cache",
+                                              ResponseCache(os.path.join(directory, "response_cache_sync"))))
+        async with report.stage(tool, "recommend (sync)", "queries") as recommend:
+            answers = await asyncio.to_thread(lambda: [recommender.recommend(request, data_path) for request in requests])
+            recommend["items"] = sum(1 for answer in answers if answer)
+
+
+async def run(args):
+    llm = use_stub_llm(OfflineLLM(token_delay=args.token_delay, latency=args.latency))
+    report = StageReport(llm)
+    for tool in args.tools:
+        await run_tool(tool, TOOLS[tool], report, llm, args)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", nargs="+", choices=list(TOOLS), default=list(TOOLS))
+    parser.add_argument("--seeds", type=int, default=3, help="seed pages of each generated site")
+    parser.add_argument("--pages", type=int, default=8, help="record pages each generated seed links to")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the stand-in model takes per call")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds per streamed answer token")
+    parser.add_argument("--queries", type=int, default=4, help="recommendation requests sent at once per tool")
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second allowed to the fixture host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port the fixture server listens on")
+    parser.add_argument("--fixtures", help="directory of recorded sites, one subdirectory per tool")
+    parser.add_argument("--json", help="also write the report rows to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    report.print()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.rows, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compare prompt tokens of grant tables rendered with each prompt encoding.
+
+Every dataset is rendered whole with DataFrame.to_string() ("table", what the recommenders
+used to send) and with the compact encodings, with and without the per-field budgets of
+the grants recommender. Tokens are counted with the local gpt-4o tokenizer.
+
+Usage:
+    python3 -m src.benchmarks.prompt_encoding_benchmark [csv_path ...]
+"""
+import argparse
+import os
+import time
+
+from src.common.columnar_store import read_table
+from src.common.markdown_pruning import count_tokens
+from src.common.prompt_table import ENCODING_LABELS, render_rows
+from src.grants_recommender_tool.contants import PROMPT_EXCLUDED_FIELDS, PROMPT_FIELD_BUDGETS
+
+DEFAULT_DATASETS = ["esg_grants.csv", "sample_grants_d1.csv", "wsg_esg_grants.csv"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_paths", nargs="*", default=DEFAULT_DATASETS)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<26} {'encoding':<14} {'chars':>10} {'tokens':>10} {'vs table':>9} {'render ms':>10}")
+    for path in args.csv_paths:
+        df = read_table(path)
+        baseline = None
+        for encoding in ENCODING_LABELS:
+            for budgets in ([None] if encoding == "table" else [None, PROMPT_FIELD_BUDGETS]):
+                start = time.perf_counter()
+                text = render_rows(df, encoding, PROMPT_EXCLUDED_FIELDS, budgets)
+                elapsed = time.perf_counter() - start
+                tokens = count_tokens(text)
+                baseline = baseline or tokens
+                label = encoding + (" +budgets" if budgets else "")
+                print(f"{os.path.basename(path):<26} {label:<14} {len(text):>10,} {tokens:>10,} "
+                      f"{tokens / baseline:>9.0%} {elapsed * 1000:>10.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare prompt size and latency of grant recommendations with and without the BM25 pre-filter.
+
+Usage:
+    python3 -m src.benchmarks.retrieval_benchmark [csv_path] [--top-k 20] [--live]
+
+--live also sends every prompt to Azure OpenAI and reports end-to-end latency,
+otherwise only prompt construction is timed.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from litellm import token_counter
+
+from src.grants_recommender_tool.contants import POST_PROCESSED_OUTPUT, RETRIEVAL_TOP_K
+from src.grants_recommender_tool.grant_recommender import build_prompt, recommend
+
+FALLBACK_DATASET = "src/grants_stocktake_tool/scraper_output/post_processed_grants_3.csv"
+
+QUERIES = [
+    "I'm a startup in the AI sector looking for funding to expand my R&D efforts.",
+    "I am a manufacturing company doing steel works and am looking to leverage on technology to automate my internal processes",
+    "We are an SME in retail and want to digitalise our point of sale and inventory systems",
+    "Our logistics firm wants to expand overseas into Southeast Asian markets",
+    "Grants for training employees in sustainability and green skills",
+    "Funding for a maritime company trialling new port technology",
+]
+
+
+def run_variant(csv_path, top_k, live):
+    tokens, build_seconds, live_seconds = [], [], []
+    for query in QUERIES:
+        start = time.perf_counter()
+        formatted_prompt = build_prompt(query, csv_path, top_k)
+        build_seconds.append(time.perf_counter() - start)
+        tokens.append(token_counter(model="gpt-4o", text=formatted_prompt))
+        if live:
+            start = time.perf_counter()
+            recommend(query, csv_path, top_k)
+            live_seconds.append(time.perf_counter() - start)
+    return tokens, build_seconds, live_seconds
+
+
+def print_row(label, tokens, build_seconds, live_seconds):
+    row = (f"{label:<14} {statistics.mean(tokens):>12,.0f} {max(tokens):>12,} "
+           f"{statistics.mean(build_seconds) * 1000:>12.1f}")
+    if live_seconds:
+        row += f" {statistics.mean(live_seconds):>10.2f}"
+    print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_csv = POST_PROCESSED_OUTPUT if os.path.isfile(POST_PROCESSED_OUTPUT) else FALLBACK_DATASET
+    parser.add_argument("csv_path", nargs="?", default=default_csv)
+    parser.add_argument("--top-k", type=int, default=RETRIEVAL_TOP_K)
+    parser.add_argument("--live", action="store_true", help="also call the model and time full recommendations")
+    args = parser.parse_args()
+
+    # Build (or refresh) the persisted index up front so it is not charged to the first query
+    build_prompt(QUERIES[0], args.csv_path, args.top_k)
+
+    print(f"Dataset: {args.csv_path}, {len(QUERIES)} queries\n")
+    header = f"{'Variant':<14} {'Avg tokens':>12} {'Max tokens':>12} {'Build ms':>12}"
+    if args.live:
+        header += f" {'LLM s':>10}"
+    print(header)
+    print("-" * len(header))
+
+    full = run_variant(args.csv_path, None, args.live)
+    top_k = run_variant(args.csv_path, args.top_k, args.live)
+    print_row("full CSV", *full)
+    print_row(f"BM25 top-{args.top_k}", *top_k)
+    print(f"\nPrompt tokens reduced by {1 - statistics.mean(top_k[0]) / statistics.mean(full[0]):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare load time and memory of a recommender table stored as CSV and as Parquet.
+
+The CSV is loaded the way the recommenders used to: read, then every list column parsed
+from its Python-literal strings. The Parquet copy is loaded whole and with only the
+facet columns an index is built from.
+
+Usage:
+    python3 -m src.benchmarks.storage_benchmark [csv_path] [--copies 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.common.columnar_store import convert_csv, read_table, table_columns
+from src.common.csv_merge import parse_cell
+from src.common.record_store import record_schema
+from src.grants_stocktake_tool.incentive_facets import INDEX_COLUMNS
+from src.grants_stocktake_tool.web_crawler import Grant
+
+DEFAULT_DATASET = "src/grants_stocktake_tool/scraper_output/post_processed_grants_3.csv"
+SCHEMA = record_schema(Grant)
+LIST_COLUMNS = [field.name for field in SCHEMA if str(field.type).startswith("list")]
+RUNS = 5
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    for column in LIST_COLUMNS:
+        if column in df:
+            df[column] = [parse_cell(value) if isinstance(value, str) else value for value in df[column]]
+    return df
+
+
+def measure(loader):
+    seconds = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        loader()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    df = loader()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(seconds), peak, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_DATASET)
+    parser.add_argument("--copies", type=int, default=50, help="times the table is repeated to get a measurable size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "table.csv")
+        parquet_path = os.path.join(directory, "table.parquet")
+        pd.concat([pd.read_csv(args.csv_path)] * args.copies, ignore_index=True).to_csv(csv_path, index=False)
+        convert_csv(csv_path, parquet_path, SCHEMA)
+        index_columns = [column for column in INDEX_COLUMNS if column in table_columns(parquet_path)]
+
+        print(f"\n{args.csv_path} x {args.copies}: CSV {os.path.getsize(csv_path) / 1e6:.2f} MB, "
+              f"Parquet {os.path.getsize(parquet_path) / 1e6:.2f} MB\n")
+        print(f"{'load':<26} {'median ms':>10} {'peak alloc MB':>14} {'frame MB':>10}")
+        variants = [
+            ("CSV + list parsing", lambda: load_csv(csv_path)),
+            ("Parquet", lambda: read_table(parquet_path)),
+            (f"Parquet, {len(index_columns)} index columns", lambda: read_table(parquet_path, index_columns)),
+        ]
+        for label, loader in variants:
+            seconds, peak, frame = measure(loader)
+            print(f"{label:<26} {seconds * 1000:>10.1f} {peak / 1e6:>14.1f} {frame / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import asyncio
+import json
+
+from pydantic import ValidationError
+
+from src.common.llm_stream import complete_text
+from src.common.markdown_pruning import count_tokens
+
+DEFAULT_TOKEN_BUDGET = 12000  # Page markdown tokens packed into one request
+DEFAULT_MAX_DOCUMENTS = 8  # Pages packed into one request, more makes the model skip documents
+DEFAULT_CONCURRENCY = 4  # Batch requests in flight per extract() call
+
+BATCH_INSTRUCTIONS = """
+You are given {count} documents. Each one is wrapped in <document id="..." url="..."> and </document> tags.
+Apply the extraction instructions below to every document on its own. A document may describe no items, one item or several.
+
+Return a single JSON object of the form {{"documents": [{{"id": "<document id>", "records": [<one object per item, matching the schema>]}}]}} with exactly one entry per document id. Use an empty records list when a document has nothing to extract.
+
+Schema of each record:
+{schema}
+
+Extraction instructions:
+{instruction}
+"""
+
+
+def document_block(document_id, url, markdown):
+    return f'<document id="{document_id}" url="{url}">\n{markdown}\n</document>'
+
+
+class BatchExtractor:
+    """
+    Packs several crawled pages into one LLM extraction request.
+
+    Pages are grouped in crawl order up to token_budget markdown tokens and max_documents
+    pages, sent with per-document delimiters, and the model's {"documents": [...]} answer is
+    split back into per-page records validated against the pydantic model. Pages missing
+    from the answer, or whose records fail validation, and every page of a batch whose
+    answer is not valid JSON, are extracted again on their own with fallback_strategy's
+    LLMExtractionStrategy. Results are read from and written to the extraction cache under
+    the same keys as single-page extraction, so both modes share cached pages.
+    """
+
+    def __init__(self, fallback_strategy, model, cache=None, token_budget=DEFAULT_TOKEN_BUDGET,
+                 max_documents=DEFAULT_MAX_DOCUMENTS, concurrency=DEFAULT_CONCURRENCY):
+        # The cached wrapper keeps the LLMExtractionStrategy it delegates to in .strategy
+        self.strategy = getattr(fallback_strategy, "strategy", fallback_strategy)
+        self.model = model
+        self.cache = cache
+        self.token_budget = token_budget
+        self.max_documents = max_documents
+        self.concurrency = concurrency
+        self.requests = 0
+        self.batched_pages = 0
+        self.fallback_pages = 0
+        self.cached_pages = 0
+
+    @property
+    def provider(self):
+        return self.strategy.llm_config.provider
+
+    def plan_batches(self, documents):
+        """Group (index, url, markdown) documents in order so each batch fits the token and document limits."""
+        batches, batch, batch_tokens = [], [], 0
+        for document in documents:
+            tokens = count_tokens(document[2], self.provider)
+            if batch and (batch_tokens + tokens > self.token_budget or len(batch) >= self.max_documents):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(document)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _cache_key(self, markdown):
+        return self.cache.key(markdown, self.strategy.instruction, self.strategy.schema, self.provider)
+
+    def validate(self, records):
+        """Records as dicts in the shape LLMExtractionStrategy returns, raising ValidationError on bad records."""
+        if isinstance(records, dict):
+            records = [records]
+        return [dict(self.model.model_validate(record).model_dump(), error=False) for record in records]
+
+    async def _request(self, batch):
+        prompt = BATCH_INSTRUCTIONS.format(count=len(batch), schema=json.dumps(self.strategy.schema),
+                                           instruction=self.strategy.instruction)
+        documents = "\n\n".join(document_block(index, url, markdown) for index, url, markdown in batch)
+        llm_config = self.strategy.llm_config
+        self.requests += 1
+        return await complete_text(
+            self.provider,
+            [{"content": prompt, "role": "system"}, {"content": documents, "role": "user"}],
+            api_key=llm_config.api_token,
+            base_url=llm_config.base_url,
+            temperature=llm_config.temperature,
+            response_format={"type": "json_object"},
+        )
+
+    async def _extract_batch(self, batch):
+        """{index: records} for every document of the batch the model answered validly."""
+        try:
+            answer = json.loads(await self._request(batch))
+            entries = answer["documents"] if isinstance(answer, dict) else answer
+        except Exception as e:
+            print(f"⚠️ Batch of {len(batch)} pages returned unusable output ({e}), extracting them one by one")
+            return {}
+
+        expected = {str(index) for index, _, _ in batch}
+        extracted = {}
+        for entry in entries if isinstance(entries, list) else []:
+            document_id = str(entry.get("id")) if isinstance(entry, dict) else None
+            if document_id not in expected:
+                continue
+            try:
+                extracted[int(document_id)] = self.validate(entry.get("records") or [])
+            except (ValidationError, TypeError, ValueError):
+                continue
+        return extracted
+
+    async def _extract_single(self, url, markdown, key):
+        self.fallback_pages += 1
+        # LLMExtractionStrategy.run is synchronous, keep it off the event loop
+        records = await asyncio.to_thread(self.strategy.run, url, [markdown])
+        # Failed calls are retried on the next crawl rather than cached
+        if self.cache and not any(record.get("error") is True for record in records):
+            self.cache.put(key, records)
+        return records
+
+    async def extract(self, pages, pruner=None):
+        """
+        Extract records from crawled pages.
+
+        Args:
+            pages (list[tuple[str, str]]): (url, markdown) of each page
+            pruner (MarkdownPruner): Trims the pages that are not cached before they are sent.
+                Cache keys are taken from the unpruned markdown, so whether a page hits the
+                cache does not depend on the other pages the pruner has seen
+
+        Returns:
+            list[list[dict]]: The records of each page, in the order of pages
+        """
+        results = [[] for _ in pages]
+        keys, pending = {}, []
+        for index, (url, markdown) in enumerate(pages):
+            if not markdown or not markdown.strip():
+                continue
+            keys[index] = self._cache_key(markdown) if self.cache else None
+            cached = self.cache.get(keys[index]) if self.cache else None
+            if cached is not None:
+                results[index] = cached
+                self.cached_pages += 1
+            else:
+                pending.append((index, url, markdown))
+        if pruner is not None and pending:
+            # Every page of the seed counts towards what repeats on its domain
+            for url, markdown in pages:
+                if markdown:
+                    pruner.observe(url, markdown)
+            pending = [(index, url, pruner.prune(url, markdown)) for index, url, markdown in pending]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(batch):
+            async with semaphore:
+                extracted = await self._extract_batch(batch) if len(batch) > 1 else {}
+                self.batched_pages += len(extracted)
+                for index, url, markdown in batch:
+                    if index in extracted:
+                        results[index] = extracted[index]
+                        if self.cache:
+                            self.cache.put(keys[index], extracted[index])
+                    else:
+                        results[index] = await self._extract_single(url, markdown, keys[index])
+
+        await asyncio.gather(*(run(batch) for batch in self.plan_batches(pending)))
+        return results
+
+    def print_stats(self):
+        print(f"📦 Batch extraction: {self.batched_pages} pages in {self.requests} requests, "
+              f"{self.fallback_pages} extracted one by one, {self.cached_pages} from cache")
+
+
+async def extract_results(results, batch_extractor=None, pruner=None):
+    """
+    Records of each crawl result, in the order of results.
+
+    Without a batch extractor the records are the ones the crawler's extraction strategy
+    already produced per page, otherwise the seed's pages are extracted together, after
+    the MarkdownPruner when one is given.
+    """
+    if batch_extractor is None:
+        return [json.loads(result.extracted_content) if result.extracted_content else [] for result in results]
+    pages = [(result.url, result.markdown.raw_markdown if result.success and result.markdown else "")
+             for result in results]
+    return await batch_extractor.extract(pages, pruner)
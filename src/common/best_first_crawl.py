@@ -0,0 +1,189 @@
+import heapq
+import json
+import math
+import re
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+from src.common.crawl_frontier import FrontierBFSDeepCrawlStrategy, canonicalize_url
+from src.common.lexical_index import TOKEN_PATTERN
+
+NEGATIVE_LINK_KEYWORDS = ["news", "press", "media", "career", "job", "vacanc", "contact", "about", "privacy",
+                          "terms", "login", "sign-in", "signin", "sitemap", "feedback", "accessibility",
+                          "speech", "annual-report", "tender", "search"]
+DEFAULT_BATCH_SIZE = 5  # Pages fetched per pop from the queue
+DEFAULT_YIELD_WINDOW = 10  # Recent pages the marginal yield is measured over
+DEFAULT_MIN_YIELD = 0.2  # Stop a seed once fewer than this share of recent pages produced something new
+MIN_RELEVANT_KEYWORDS = 3  # Distinct keywords a page needs to count as productive when records are not known yet
+
+
+def keyword_pattern(keywords):
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + r")", re.IGNORECASE) if keywords else None
+
+
+def path_tokens(url):
+    return {token for token in TOKEN_PATTERN.findall(urlsplit(url).path.lower()) if not token.isdigit()}
+
+
+class LinkScorer:
+    """
+    Cheap relevance estimate for a link, from its url path, its anchor text and how much its
+    path looks like pages that held records, in earlier crawls or earlier in this run.
+    One scorer is shared by every seed of a run and also remembers the record names found so far.
+
+    score = 0.4 * path keywords + 0.3 * anchor keywords + 0.3 * similarity to known pages
+            - 0.5 if the path or anchor looks like news, careers, contact or similar pages
+            - 0.1 per level of depth
+    """
+
+    def __init__(self, keywords, negative_keywords=NEGATIVE_LINK_KEYWORDS, known_urls=()):
+        self.keywords = keyword_pattern(keywords)
+        self.negative_keywords = keyword_pattern(negative_keywords)
+        self.path_weights = Counter()
+        self.seen_records = set()
+        self.learn(known_urls)
+
+    def learn(self, urls):
+        """Add the paths of pages known to hold records, e.g. the link field of stored records."""
+        for url in urls:
+            if url:
+                self.path_weights.update(path_tokens(url))
+
+    def similarity(self, url):
+        tokens = path_tokens(url)
+        if not tokens or not self.path_weights:
+            return 0.0
+        # Tokens seen on many known pages (grants, schemes, financial-support) count most
+        top = math.log1p(max(self.path_weights.values()))
+        return sum(math.log1p(self.path_weights[token]) for token in tokens) / (top * len(tokens))
+
+    def _hits(self, pattern, text):
+        return min(len(set(match.lower() for match in pattern.findall(text))), 2) / 2 if pattern and text else 0.0
+
+    def score(self, url, anchor_text="", depth=1):
+        path = urlsplit(url).path.replace("-", " ").replace("_", " ").replace("/", " ")
+        score = 0.4 * self._hits(self.keywords, path) + 0.3 * self._hits(self.keywords, anchor_text) \
+            + 0.3 * self.similarity(url)
+        if self.negative_keywords and (self.negative_keywords.search(path) or self.negative_keywords.search(anchor_text)):
+            score -= 0.5
+        return round(score - 0.1 * depth, 4)
+
+
+class BestFirstDeepCrawlStrategy(FrontierBFSDeepCrawlStrategy):
+    """
+    Deep crawl that always fetches the most promising links first.
+
+    Links are scored with a LinkScorer and kept in a priority queue, so the max_pages budget
+    goes to pages that look like grant pages rather than to whatever the seed links first.
+    Links scoring below min_score are never fetched. The crawl of a seed stops early once
+    fewer than min_yield of its last yield_window pages were productive: a page is
+    productive when it produced a record name not seen earlier in the run or, when records
+    are only extracted after the crawl, when its markdown mentions at least
+    MIN_RELEVANT_KEYWORDS of the scorer's keywords.
+
+    Pages are claimed in the run's CrawlFrontier when they are fetched, not when they are
+    discovered, so links left in the queue remain open to the other seeds.
+    """
+
+    def __init__(self, frontier, scorer, record_key=None, min_score=0.0,
+                 batch_size=DEFAULT_BATCH_SIZE, yield_window=DEFAULT_YIELD_WINDOW, min_yield=DEFAULT_MIN_YIELD,
+                 **kwargs):
+        super().__init__(frontier, **kwargs)
+        self.scorer = scorer
+        self.record_key = record_key
+        self.min_score = min_score
+        self.batch_size = batch_size
+        self.yield_window = yield_window
+        self.min_yield = min_yield
+
+    def page_yield(self, result):
+        """1 if the page produced something new, 0 otherwise."""
+        if result.extracted_content and self.record_key:
+            try:
+                records = json.loads(result.extracted_content)
+            except ValueError:
+                records = []
+            names = {str(record.get(self.record_key) or "").strip().lower()
+                     for record in records if isinstance(record, dict)} - {""}
+            new_names = names - self.scorer.seen_records
+            self.scorer.seen_records.update(names)
+            return 1 if new_names else 0
+        markdown = result.markdown.raw_markdown if result.markdown else ""
+        keywords = self.scorer.keywords
+        hits = {match.lower() for match in keywords.findall(markdown)} if keywords else set()
+        return 1 if len(hits) >= MIN_RELEVANT_KEYWORDS else 0
+
+    async def discover(self, result, source_url, depth, queued):
+        """(score, url) for each new link of a page worth queueing."""
+        if depth + 1 > self.max_depth:
+            return []
+        links = list(result.links.get("internal", []))
+        if self.include_external:
+            links += result.links.get("external", [])
+
+        found = {}
+        for link in links:
+            if not link.get("href"):
+                continue
+            url = canonicalize_url(link["href"], source_url)
+            if url in queued or url in found or url in self.frontier.seen:
+                continue
+            if not await self.can_process_url(url, depth + 1):
+                self.stats.urls_skipped += 1
+                continue
+            score = self.scorer.score(url, link.get("text") or "", depth + 1)
+            if score < self.min_score:
+                self.stats.urls_skipped += 1
+                continue
+            found[url] = score
+        return [(score, url) for url, score in found.items()]
+
+    async def _arun_best_first(self, start_url, crawler, config):
+        # Entries are (-score, push order, depth, url, parent), so ties keep discovery order
+        queue = [(0.0, 0, 0, start_url, None)]
+        queued = {canonicalize_url(start_url)}
+        pushes = 1
+        recent = deque(maxlen=self.yield_window)
+
+        while queue and not self._cancel_event.is_set() and self._pages_crawled < self.max_pages:
+            if len(recent) == self.yield_window and sum(recent) / len(recent) < self.min_yield:
+                print(f"🛑 Stopping {start_url} early, only {sum(recent)} of the last {len(recent)} pages were productive")
+                break
+
+            batch = []
+            while queue and len(batch) < min(self.batch_size, self.max_pages - self._pages_crawled):
+                negative_score, _, depth, url, parent = heapq.heappop(queue)
+                # The seed was claimed up front, every other page is claimed as it is fetched
+                if depth == 0 or self.frontier.claim(url):
+                    batch.append((-negative_score, depth, url, parent))
+            if not batch:
+                break
+
+            batch_config = config.clone(deep_crawl_strategy=None, stream=False)
+            results = await crawler.arun_many(urls=[url for _, _, url, _ in batch], config=batch_config)
+            by_url = {url: (score, depth, parent) for score, depth, url, parent in batch}
+            for result in results:
+                score, depth, parent = by_url.get(result.url) or by_url.get(canonicalize_url(result.url)) \
+                    or (0.0, 0, None)
+                result.metadata = result.metadata or {}
+                result.metadata.update(depth=depth, parent_url=parent, score=score)
+                if result.success:
+                    self._pages_crawled += 1
+                    productive = self.page_yield(result)
+                    recent.append(productive)
+                    if productive:
+                        self.scorer.learn([result.url])
+                yield result
+
+                if result.success:
+                    for link_score, link in await self.discover(result, result.url, depth, queued):
+                        queued.add(link)
+                        heapq.heappush(queue, (-link_score, pushes, depth + 1, link, result.url))
+                        pushes += 1
+
+    async def _arun_batch(self, start_url, crawler, config):
+        return [result async for result in self._arun_best_first(start_url, crawler, config)]
+
+    async def _arun_stream(self, start_url, crawler, config):
+        async for result in self._arun_best_first(start_url, crawler, config):
+            yield result
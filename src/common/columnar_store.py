@@ -0,0 +1,157 @@
+import csv
+import os
+import types
+import typing
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.common.csv_merge import parse_cell
+
+ROW_GROUP_SIZE = 1000  # Records per Parquet row group, also the batch size read from the record store
+PYTHON_TYPES = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+
+
+def arrow_type(annotation):
+    """Arrow type of a pydantic field annotation: str | None -> string, Optional[List[str]] -> list<string>."""
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+    if typing.get_origin(annotation) in (list, typing.List):
+        item_args = typing.get_args(annotation)
+        return pa.list_(arrow_type(item_args[0]) if item_args else pa.string())
+    return PYTHON_TYPES.get(annotation, pa.string())
+
+
+def arrow_schema(model, extra_fields=None):
+    """
+    Arrow schema of a pydantic model, one nullable column per field plus extra_fields, e.g.
+    {"error": pa.bool_()} for the flag extracted blocks carry next to the schema fields.
+    """
+    fields = [pa.field(name, arrow_type(field.annotation)) for name, field in model.model_fields.items()]
+    fields += [pa.field(name, type_) for name, type_ in (extra_fields or {}).items()]
+    return pa.schema(fields)
+
+
+def coerce_value(value, type_):
+    """A stored record value as the schema type, None for missing or unreadable values."""
+    if value is None or value == "" or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return None
+    if pa.types.is_list(type_):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        return [coerce_value(item, type_.value_type) for item in values]
+    if pa.types.is_boolean(type_):
+        return str(value).strip().lower() in ("true", "1", "yes")
+    if pa.types.is_integer(type_) or pa.types.is_floating(type_):
+        try:
+            return int(float(value)) if pa.types.is_integer(type_) else float(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item) for item in value)
+    return str(value)
+
+
+class ParquetExport:
+    """
+    Writes records to a Parquet file one row group at a time, so an export never holds more
+    than one batch in memory. The file only replaces path once close() succeeds.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self.rows = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._tmp_path = f"{path}.tmp"
+        self._writer = pq.ParquetWriter(self._tmp_path, schema, compression="zstd")
+
+    def write(self, records):
+        columns = {field.name: [coerce_value(record.get(field.name), field.type) for record in records]
+                   for field in self.schema}
+        self._writer.write_table(pa.table(columns, schema=self.schema), row_group_size=ROW_GROUP_SIZE)
+        self.rows += len(records)
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+
+def is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+def table_columns(path):
+    """Column names of a Parquet or CSV table, read from its footer or header only."""
+    if is_parquet(path):
+        return pq.read_schema(path).names
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def read_table(path, columns=None):
+    """
+    Load a Parquet or CSV table as a DataFrame, with only the given columns when asked
+    (columns missing from the file are skipped).
+
+    Parquet list columns come back as Python lists, so nothing has to be parsed. CSV files
+    keep their list columns as the Python-literal strings they were written with.
+    """
+    if columns is not None:
+        available = set(table_columns(path))
+        columns = [column for column in dict.fromkeys(columns) if column in available]
+    if not is_parquet(path):
+        return pd.read_csv(path, usecols=columns)
+    table = pq.read_table(path, columns=columns)
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            # As an object column even when empty or all null, so write_table can type it as a list again
+            df[field.name] = pd.Series(table.column(field.name).to_pylist(), index=df.index, dtype=object)
+    return df
+
+
+def read_table_records(path, columns=None):
+    """Rows of a Parquet or CSV table as dicts, list columns as lists for Parquet."""
+    if is_parquet(path):
+        return pq.read_table(path, columns=columns).to_pylist()
+    df = read_table(path, columns)
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def inferred_field(df, name):
+    field = pa.Table.from_pandas(df[[name]], preserve_index=False).schema.field(name)
+    return field.with_type(pa.string()) if pa.types.is_large_string(field.type) else field
+
+
+def write_table(df, path, schema=None):
+    """
+    Rewrite a table in its own format. Parquet columns are typed by schema, or by the file
+    being rewritten, and columns added to df are typed from their values.
+    """
+    if not is_parquet(path):
+        df.to_csv(path, index=False)
+        return
+    if schema is None and os.path.isfile(path):
+        schema = pq.read_schema(path)
+    known = schema or pa.schema([])
+    schema = pa.schema([known.field(name) if name in known.names else inferred_field(df, name) for name in df.columns])
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+
+
+def convert_csv(csv_path, parquet_path, schema):
+    """
+    Migrate a CSV export to Parquet, parsing its Python-literal list cells this one time.
+    Columns the schema does not know, such as those added in post-processing, keep the
+    types pandas reads them with.
+    """
+    df = pd.read_csv(csv_path)
+    for field in schema:
+        if field.name in df:
+            df[field.name] = [coerce_value(parse_cell(value) if isinstance(value, str) else value, field.type)
+                              for value in df[field.name]]
+    write_table(df, parquet_path, schema)
+    print(f"🗃️ Converted {len(df)} rows of {csv_path} to {parquet_path}")
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+
+async def crawl_seeds(crawler, urls, config_factory, max_concurrency, per_domain_concurrency):
+    """
+    Crawl seed URLs concurrently on a single shared AsyncWebCrawler.
+
+    A seed first takes a slot for its domain and only then a global slot, so seeds
+    queued behind a busy domain never hold up seeds for other hosts.
+
+    Args:
+        crawler (AsyncWebCrawler): Crawler shared by every seed
+        urls (list[str]): Seed URLs to crawl
+        config_factory (callable): Returns a fresh CrawlerRunConfig per seed, deep crawl
+            strategies keep per-run state and must not be shared between seeds
+        max_concurrency (int): Maximum number of seeds crawled at the same time
+        per_domain_concurrency (int): Maximum number of seeds per host crawled at the same time
+
+    Yields:
+        (url, results, elapsed) tuples in completion order, where elapsed is the
+        wall time in seconds spent crawling the seed (excluding time queued).
+    """
+    global_limit = asyncio.Semaphore(max_concurrency)
+    domain_limits = defaultdict(lambda: asyncio.Semaphore(per_domain_concurrency))
+
+    async def crawl_seed(url):
+        async with domain_limits[urlparse(url).netloc]:
+            async with global_limit:
+                print(f"🔗 Crawling {url}...")
+                start = time.perf_counter()
+                try:
+                    results = await crawler.arun(url, config=config_factory())
+                except Exception as e:
+                    print(f"❌ Failed to crawl {url}: {e}")
+                    results = []
+                return url, results, time.perf_counter() - start
+
+    tasks = [asyncio.create_task(crawl_seed(url)) for url in urls]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def print_seed_timings(timings):
+    """Print per-seed wall times, slowest first, as (url, seconds) tuples."""
+    if not timings:
+        return
+
+    print("\n⏱️ Per-seed crawl times:")
+    for url, elapsed in sorted(timings, key=lambda timing: timing[1], reverse=True):
+        print(f"{elapsed:8.1f}s  {url}")
+    print(f"{sum(elapsed for _, elapsed in timings):8.1f}s  total crawl time across {len(timings)} seeds")
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+
+class CrawlCheckpoint:
+    """
+    Append-only journal of a crawl run, so a run that dies midway resumes where it stopped.
+
+    The first line names the run's seeds. After that every page a seed finished is appended
+    with its stored entry (the manifest's page entry, or just its records), followed by a
+    line marking the seed done or failed, which also lists the pages the seed claimed in
+    the crawl frontier without storing them. Each seed's lines are flushed and fsynced in one
+    append, so a dying process loses at most the seed it was writing.
+
+    A run over the same seed list as an unfinished journal resumes it: seeds marked done
+    are restored from the journal instead of being fetched and extracted again, and the
+    pages they claimed are claimed again in the new run's frontier, failed fetches
+    included, so the other seeds skip them as they would have in one run. Seeds that
+    were still in flight are crawled again, their pages are usually answered by the
+    extraction cache. finish() removes the journal once the run's results are saved.
+
+    Layout on disk, one JSON object per line:
+        {"seeds": [seed_url, ...], "started_at": ...}
+        {"seed": seed_url, "page": page_url, "entry": {..., "records": [...]}}
+        {"seed": seed_url, "status": "done" | "failed", "claimed": [page_url, ...]}
+    """
+
+    def __init__(self, path, seeds):
+        self.path = path
+        self.seeds = list(seeds)
+        self.pages = {}
+        self.done = []
+        self.claimed = {}
+        journal = self._read()
+        if journal and journal[0].get("seeds") == self.seeds:
+            self._replay(journal[1:])
+        else:
+            if journal:
+                print("🗑️ Discarding the checkpoint of an interrupted run over a different seed list")
+            self._start()
+
+    def _read(self):
+        """
+        Journal lines up to the last complete seed block, cutting the file back to them.
+
+        A seed's lines are written in one append ending with its status line, so page
+        lines after the last status line, or a torn last line, belong to a block the dying
+        process did not finish. Cutting them off keeps later appends readable.
+        """
+        if not os.path.isfile(self.path):
+            return []
+        lines, kept, valid_bytes, read_bytes = [], 0, 0, 0
+        with open(self.path, "rb") as f:
+            for raw in f:
+                try:
+                    if not raw.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    line = json.loads(raw)
+                except ValueError:
+                    break
+                lines.append(line)
+                read_bytes += len(raw)
+                if "page" not in line:
+                    kept, valid_bytes = len(lines), read_bytes
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return lines[:kept]
+
+    def _replay(self, lines):
+        pages = {}
+        for line in lines:
+            seed = line.get("seed")
+            if "page" in line:
+                pages.setdefault(seed, {})[line["page"]] = line["entry"]
+            elif line.get("status") == "done":
+                if seed not in self.done:
+                    self.done.append(seed)
+                self.pages[seed] = pages.pop(seed, {})
+                self.claimed[seed] = line.get("claimed", [])
+            else:
+                pages.pop(seed, None)
+
+    def _start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seeds": self.seeds, "started_at": time.time()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _append(self, lines):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def completed_seeds(self):
+        """{seed_url: {page_url: entry}} for the seeds an interrupted run already finished, in the order they finished."""
+        if self.done:
+            print(f"♻️ Resuming an interrupted crawl: {len(self.done)} of {len(self.seeds)} seeds already done")
+        return {seed: self.pages[seed] for seed in self.done}
+
+    def claimed_pages(self):
+        """Every page the finished seeds claimed in the crawl frontier, stored or not."""
+        return [page for seed in self.done for page in list(self.pages[seed]) + self.claimed.get(seed, [])]
+
+    def record_seed(self, seed, pages, success=True, claimed=()):
+        """
+        Journal a finished seed.
+
+        Args:
+            seed (str): The seed URL
+            pages (dict): {page_url: entry} of the pages the seed stored, each entry holding its "records"
+            success (bool): False when the seed's crawl failed outright, so a resumed run retries it
+            claimed (list): Pages the seed's crawl claimed in the frontier without storing them, e.g. failed fetches
+        """
+        lines = [{"seed": seed, "page": page, "entry": entry} for page, entry in pages.items()] if success else []
+        claimed = [page for page in claimed if page not in pages]
+        self._append(lines + [{"seed": seed, "status": "done" if success else "failed", "claimed": claimed}])
+        if success and seed not in self.done:
+            self.done.append(seed)
+            self.pages[seed] = dict(pages)
+            self.claimed[seed] = claimed
+
+    def finish(self):
+        """The run completed and its results are saved, the journal is no longer needed."""
+        if os.path.isfile(self.path):
+            os.remove(self.path)
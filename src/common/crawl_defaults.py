@@ -0,0 +1,46 @@
+"""
+Crawl settings shared by every tool. Each tool's contants.py builds its CRAWL_SETTINGS from
+CrawlSettings, passing its own state file paths and keywords and overriding only the
+settings it needs to differ, e.g. a longer readiness_max_wait_ms for slow sites.
+"""
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class CrawlSettings:
+    """One tool's crawl settings, read by its web_crawler and passed to crawl_seed_records."""
+    crawl_checkpoint: str  # Journal of finished seeds an interrupted crawl resumes from
+    crawl_report: str  # Per host fetch statistics and failed pages of the last crawl
+    readiness_profiles: str  # Learned per domain settle times
+    fetch_tiers: str  # Domains pinned to the browser
+    link_keywords: list = field(default_factory=list)  # Scored in link paths and anchor texts
+    prune_keywords: list = field(default_factory=list)  # Sections mentioning these are kept first when pruning
+
+    # Pack several small pages into one extraction request instead of one request per page
+    batch_extraction: bool = True
+    extraction_token_budget: int = 12000  # Page markdown tokens per batched extraction request
+    extraction_max_documents: int = 8  # Pages per batched extraction request
+    # Strip navigation, footers and other blocks repeated across a domain's pages before batched extraction
+    prune_markdown: bool = True
+    page_token_budget: int = 6000  # Markdown tokens kept per page
+
+    # Deep crawl order: "best_first" fetches the highest scoring links first and stops a seed when it stops
+    # yielding new pages of interest, "bfs" follows links in page order
+    crawl_strategy: str = "best_first"
+    best_first_max_depth: int = 2
+    min_link_score: float = -0.15  # Links scoring lower are never fetched, a link without any signal scores -0.1 per level
+    yield_window: int = 10  # Recent pages the yield of a seed is measured over
+    min_yield: float = 0.2  # Share of recent pages that must be productive for a seed's crawl to go on
+
+    crawl_concurrency: int = 5  # Seeds crawled at the same time
+    per_domain_concurrency: int = 2  # Seeds per host crawled at the same time
+
+    # Politeness towards each host, on top of its robots.txt Crawl-delay
+    host_requests_per_second: float = 2.0
+    host_max_concurrency: int = 4  # Pages fetched at once per host, adapted to the host's latency and errors
+    fetch_retries: int = 3  # Retries of timeouts, network errors, 429 and 5xx responses
+    adaptive_readiness: bool = True  # Wait for each page to settle instead of a fixed delay_before_return_html
+    readiness_quiet_ms: int = 500  # DOM and network quiet time after which a page counts as ready
+    readiness_max_wait_ms: int = 8000  # Longest wait for a page to settle, also used for domains not profiled yet
+    http_fast_path: bool = True  # Fetch pages over plain HTTP first, rendering only JavaScript pages in the browser
+    http_min_words: int = 150  # Words of content an HTTP page needs to skip the browser
@@ -0,0 +1,105 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from crawl4ai import BFSDeepCrawlStrategy
+
+# Links written as markdown autolinks end up glued to the page url, e.g.
+# https://www.gobusiness.gov.sg/gov-assist/grants/<https:/www.mas.gov.sg/...> or
+# https://www.enterprisesg.gov.sg/</financial-support/...>
+NESTED_LINK = re.compile(r"^(?P<base>.*?)<(?P<inner>[^<>]*)>?$")
+COLLAPSED_SCHEME = re.compile(r"^(https?):/*", re.IGNORECASE)
+TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|ref|_ga)$", re.IGNORECASE)
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def repair_nested_link(url):
+    """Unwrap a <...> link glued onto a page url, resolving it against that page when it is relative."""
+    match = NESTED_LINK.match(url.strip())
+    if not match:
+        return url.strip()
+    inner = match.group("inner").strip()
+    if COLLAPSED_SCHEME.match(inner):
+        return COLLAPSED_SCHEME.sub(lambda m: f"{m.group(1).lower()}://", inner, count=1)
+    return urljoin(match.group("base"), inner)
+
+
+def canonicalize_url(url, base_url=None):
+    """
+    Canonical form of a url, used to decide whether two links are the same page.
+
+    Nested <...> links are repaired and relative links resolved against base_url. The scheme
+    and host are lowercased, default ports, fragments, tracking parameters and trailing
+    slashes are dropped, repeated slashes in the path are collapsed and the query is
+    sorted. Trailing slashes and fragments are handled the way crawl4ai's deep crawl
+    normalises links, so both agree on what a page's url is.
+    """
+    url = repair_nested_link(url)
+    if base_url:
+        url = urljoin(base_url, url)
+    url = COLLAPSED_SCHEME.sub(lambda m: f"{m.group(1).lower()}://", url, count=1)
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(key)))
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+class CrawlFrontier:
+    """
+    Pages already claimed during one crawl run, shared by every seed's deep crawl.
+
+    Seeds are claimed up front, so a page that is itself a seed is only crawled as that
+    seed, with its full depth. Any other page is fetched and extracted by the first seed
+    that reaches it and skipped by the rest.
+    """
+
+    def __init__(self):
+        self.seen = set()
+        self.duplicates = 0
+
+    def claim(self, url):
+        """True if the url's page has not been claimed yet, claiming it."""
+        url = canonicalize_url(url)
+        if url in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(url)
+        return True
+
+    def mark_seen(self, urls):
+        """Claim pages without crawling them, e.g. the pages of seeds skipped as unchanged."""
+        self.seen.update(canonicalize_url(url) for url in urls)
+
+    def claim_seeds(self, urls):
+        """The seeds to crawl, in order, without seeds that are the same page as an earlier one."""
+        seeds = [url for url in urls if self.claim(url)]
+        if len(seeds) < len(urls):
+            print(f"🔁 Dropped {len(urls) - len(seeds)} duplicate seeds")
+        return seeds
+
+    def print_stats(self):
+        print(f"🧭 Crawl frontier: {len(self.seen)} unique pages, {self.duplicates} repeat visits skipped")
+
+
+class FrontierBFSDeepCrawlStrategy(BFSDeepCrawlStrategy):
+    """BFSDeepCrawlStrategy that repairs and canonicalises links and skips pages another seed already claimed."""
+
+    def __init__(self, frontier, **kwargs):
+        super().__init__(**kwargs)
+        self.frontier = frontier
+
+    async def link_discovery(self, result, source_url, current_depth, visited, next_level, depths):
+        for links in (result.links or {}).values():
+            for link in links:
+                if link.get("href"):
+                    link["href"] = canonicalize_url(link["href"], source_url)
+
+        start = len(next_level)
+        await super().link_discovery(result, source_url, current_depth, visited, next_level, depths)
+        # Claim only the links that survived filtering and the max_pages cut, so a link this
+        # seed had no room for is still open to the other seeds
+        claimed = [(url, parent) for url, parent in next_level[start:] if self.frontier.claim(url)]
+        next_level[start:] = claimed
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import aiohttp
+
+from src.common.extraction_cache import clean_markdown
+
+VALIDATION_CONCURRENCY = 10  # Conditional requests in flight at once
+VALIDATION_TIMEOUT_SECONDS = 15
+
+
+def content_hash(markdown):
+    return hashlib.sha256(clean_markdown(markdown or "").encode("utf-8")).hexdigest()
+
+
+class CrawlManifest:
+    """
+    Per-URL record of the last crawl, used for incremental recrawls.
+
+    For every seed the manifest keeps the pages its deep crawl reached. For every page
+    it keeps the fetch time, the HTTP validators (ETag / Last-Modified), a hash of the
+    page markdown and the records extracted from it. A seed whose pages all answer a
+    conditional request with 304 Not Modified is skipped entirely, and only the output
+    rows of the seeds that were re-crawled are rebuilt from the stored records.
+
+    Layout on disk:
+        {"seeds": {seed_url: [page_url, ...]},
+         "pages": {page_url: {"fetched_at", "etag", "last_modified", "content_hash", "records"}}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.seeds = {}
+        self.pages = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.seeds = data.get("seeds", {})
+            self.pages = data.get("pages", {})
+
+    def save(self):
+        self._drop_orphan_pages()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seeds": self.seeds, "pages": self.pages}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.seeds = {}
+        self.pages = {}
+
+    def retain_seeds(self, seed_urls):
+        """Drop seeds that are no longer in the seed list, along with pages only they reached."""
+        seed_urls = set(seed_urls)
+        for seed in list(self.seeds):
+            if seed not in seed_urls:
+                del self.seeds[seed]
+        self._drop_orphan_pages()
+
+    def _drop_orphan_pages(self):
+        reachable = {page for pages in self.seeds.values() for page in pages}
+        for page in list(self.pages):
+            if page not in reachable:
+                del self.pages[page]
+
+    def begin_seed(self, seed):
+        """Forget the pages previously reached from a seed before it is re-crawled."""
+        self.seeds[seed] = []
+
+    def record_page(self, seed, url, response_headers, markdown, records):
+        """
+        Store the outcome of fetching a page.
+
+        Returns:
+            True if the page content differs from the previous crawl.
+        """
+        headers = {key.lower(): value for key, value in (response_headers or {}).items()}
+        new_hash = content_hash(markdown)
+        previous = self.pages.get(url)
+        if url not in self.seeds.setdefault(seed, []):
+            self.seeds[seed].append(url)
+        self.pages[url] = {
+            "fetched_at": time.time(),
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_hash": new_hash,
+            "records": records,
+        }
+        return previous is None or previous["content_hash"] != new_hash
+
+    def restore_seed(self, seed, pages):
+        """Put back the {page_url: entry} pages of a seed journaled by an interrupted run."""
+        self.seeds[seed] = list(pages)
+        self.pages.update(pages)
+
+    def seed_pages(self, seed):
+        """(page_url, records) pairs for the pages last reached from a seed, in crawl order."""
+        return [(page, self.pages[page]["records"]) for page in self.seeds.get(seed, []) if page in self.pages]
+
+    def seed_records(self, seed):
+        """Records of the pages last reached from a seed."""
+        return [record for _, records in self.seed_pages(seed) for record in records]
+
+    def records(self, seed_urls=None):
+        """Stored records in seed order, each page contributing once."""
+        result = []
+        seen_pages = set()
+        for seed in seed_urls if seed_urls is not None else self.seeds:
+            for page in self.seeds.get(seed, []):
+                if page in seen_pages or page not in self.pages:
+                    continue
+                seen_pages.add(page)
+                result.extend(self.pages[page]["records"])
+        return result
+
+    async def unchanged_seeds(self, seed_urls):
+        """
+        Ask the servers whether any page reached from each seed changed since the last crawl.
+
+        A seed counts as unchanged only if it has been crawled before and every one of its
+        pages answers a conditional GET with 304 Not Modified. Pages without stored
+        validators, or servers that ignore them, are treated as changed.
+
+        Returns:
+            The set of seed URLs that can be skipped.
+        """
+        candidates = [seed for seed in seed_urls if self.seeds.get(seed)]
+        if not candidates:
+            return set()
+
+        limit = asyncio.Semaphore(VALIDATION_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=VALIDATION_TIMEOUT_SECONDS)
+
+        async def not_modified(session, url):
+            page = self.pages.get(url)
+            if not page or not (page["etag"] or page["last_modified"]):
+                return False
+            headers = {}
+            if page["etag"]:
+                headers["If-None-Match"] = page["etag"]
+            if page["last_modified"]:
+                headers["If-Modified-Since"] = page["last_modified"]
+            async with limit:
+                try:
+                    async with session.get(url, headers=headers, allow_redirects=False) as response:
+                        return response.status == 304
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    return False
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            pages = sorted({page for seed in candidates for page in self.seeds[seed]})
+            verdicts = dict(zip(pages, await asyncio.gather(*(not_modified(session, page) for page in pages))))
+
+        return {seed for seed in candidates if all(verdicts[page] for page in self.seeds[seed])}
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from crawl4ai.models import CrawlResult
+
+DEFAULT_REQUESTS_PER_SECOND = 2.0  # Per host
+DEFAULT_BURST = 4  # Requests a host's token bucket can hold
+DEFAULT_MAX_HOST_CONCURRENCY = 4  # Upper bound of a host's adaptive concurrency
+DEFAULT_RETRIES = 3  # Retries of a retryable failure, on top of the first attempt
+DEFAULT_BACKOFF_SECONDS = 1.0  # First backoff, doubled on every retry
+MAX_BACKOFF_SECONDS = 60.0
+ROBOTS_TIMEOUT_SECONDS = 10
+ROBOTS_USER_AGENT = "*"
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+SLOW_LATENCY_FACTOR = 2.0  # A response this many times slower than the host's best is a sign of load
+CRAWL_DELAY = re.compile(r"^\s*crawl-delay\s*:\s*(\d+(?:\.\d+)?)", re.IGNORECASE | re.MULTILINE)
+
+
+class TokenBucket:
+    """Lets through at most rate requests per second on average, with bursts of up to capacity."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostState:
+    """
+    Politeness state of one host: its token bucket, robots.txt rules and an adaptive
+    concurrency limit. The limit grows by one per limit successful fast responses and is
+    halved, together with the request rate, when the host throttles, errors or slows down.
+    """
+
+    def __init__(self, rate, burst, max_concurrency):
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.limit = 1.0
+        self.in_flight = 0
+        self.robots = None
+        self.best_latency = None
+        self.latency = None
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled = 0
+        self._slot_freed = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        await self.bucket.acquire()
+
+    async def __aexit__(self, *exc_info):
+        async with self._slot_freed:
+            self.in_flight -= 1
+            self._slot_freed.notify_all()
+
+    def on_success(self, latency):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        if self.latency > SLOW_LATENCY_FACTOR * self.best_latency:
+            self.limit = max(1.0, self.limit * 0.75)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.bucket.rate = min(self.base_rate, self.bucket.rate * 1.1)
+
+    def on_failure(self, throttled):
+        self.errors += 1
+        self.throttled += throttled
+        self.limit = max(1.0, self.limit / 2)
+        self.bucket.rate = max(self.base_rate / 16, self.bucket.rate / 2)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "concurrency": int(self.limit),
+            "requests_per_second": round(self.bucket.rate, 2),
+            "latency_seconds": round(self.latency, 2) if self.latency is not None else None,
+        }
+
+
+def robots_crawl_delay(robots, text):
+    """Crawl-delay in seconds. RobotFileParser only reads whole numbers, so fractional delays come from the file itself."""
+    delay = robots.crawl_delay(ROBOTS_USER_AGENT)
+    if delay is None:
+        match = CRAWL_DELAY.search(text)
+        delay = match.group(1) if match else None
+    return float(delay) if delay else None
+
+
+def retry_after_seconds(headers):
+    """Seconds asked for by a Retry-After header, given as seconds or as an HTTP date."""
+    value = {key.lower(): value for key, value in (headers or {}).items()}.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CrawlScheduler:
+    """
+    Per-host politeness, retries and failure reporting for every page fetched in a crawl run.
+
+    Each host gets a token bucket (requests_per_second, burst), tightened to the host's
+    robots.txt Crawl-delay, and an adaptive concurrency limit. Pages disallowed by
+    robots.txt are not fetched. Timeouts, network errors and 408/425/429/5xx responses are
+    retried with exponential backoff and full jitter, honouring Retry-After. Pages and
+    seeds that still fail are kept for the run report.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST,
+                 max_host_concurrency=DEFAULT_MAX_HOST_CONCURRENCY, retries=DEFAULT_RETRIES,
+                 backoff_seconds=DEFAULT_BACKOFF_SECONDS, respect_robots=True):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_host_concurrency = max_host_concurrency
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.respect_robots = respect_robots
+        self.hosts = defaultdict(lambda: HostState(requests_per_second, burst, max_host_concurrency))
+        self.failed_pages = {}
+        self.failed_seeds = {}
+        self.disallowed = []
+        self._robots_locks = defaultdict(asyncio.Lock)
+
+    async def _robots(self, url):
+        parts = urlsplit(url)
+        host = self.hosts[parts.netloc]
+        async with self._robots_locks[parts.netloc]:
+            if host.robots is None:
+                host.robots = RobotFileParser()
+                try:
+                    timeout = aiohttp.ClientTimeout(total=ROBOTS_TIMEOUT_SECONDS)
+                    async with aiohttp.ClientSession(timeout=timeout) as session:
+                        async with session.get(f"{parts.scheme}://{parts.netloc}/robots.txt") as response:
+                            text = await response.text() if response.status == 200 else ""
+                except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError):
+                    text = ""
+                host.robots.parse(text.splitlines())
+                delay = robots_crawl_delay(host.robots, text)
+                if delay:
+                    host.base_rate = min(host.base_rate, 1 / delay)
+                    host.bucket.rate, host.bucket.capacity = host.base_rate, 1
+                    print(f"🤖 {parts.netloc} asks for a {delay}s crawl delay")
+        return host.robots
+
+    def backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, self.backoff_seconds * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+    async def fetch(self, crawler, url, config=None, **kwargs):
+        """Fetch one page with crawler.arun, politely and with retries. Always returns a CrawlResult."""
+        host = self.hosts[urlsplit(url).netloc]
+        if self.respect_robots and not (await self._robots(url)).can_fetch(ROBOTS_USER_AGENT, url):
+            self.disallowed.append(url)
+            return CrawlResult(url=url, html="", success=False, error_message="Disallowed by robots.txt")
+
+        for attempt in range(self.retries + 1):
+            error, retry_after, result = None, None, None
+            async with host:
+                host.requests += 1
+                started = time.perf_counter()
+                try:
+                    result = (await crawler.arun(url, config=config, **kwargs))[0]
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                elapsed = time.perf_counter() - started
+
+            status = result.status_code if result is not None else None
+            if result is not None and status not in RETRY_STATUS_CODES and (result.success or status):
+                # Successes and permanent failures such as 404 are final
+                host.on_success(elapsed)
+                if not result.success:
+                    self.failed_pages[url] = result.error_message or f"HTTP {status}"
+                return result
+
+            host.on_failure(throttled=status in THROTTLE_STATUS_CODES)
+            if result is not None:
+                error = result.error_message or f"HTTP {status}"
+                retry_after = retry_after_seconds(result.response_headers)
+            if attempt < self.retries:
+                host.retries += 1
+                delay = self.backoff(attempt, retry_after)
+                print(f"🔁 Retrying {url} in {delay:.1f}s ({error})")
+                await asyncio.sleep(delay)
+
+        self.failed_pages[url] = error
+        return result or CrawlResult(url=url, html="", success=False, error_message=error)
+
+    async def fetch_many(self, crawler, urls, config=None, **kwargs):
+        return await asyncio.gather(*(self.fetch(crawler, url, config, **kwargs) for url in urls))
+
+    def record_seed(self, seed, results):
+        """Note a seed as failed when none of its pages could be fetched."""
+        if any(result.success for result in results):
+            self.failed_seeds.pop(seed, None)
+            return
+        errors = [result.error_message for result in results if result.error_message]
+        self.failed_seeds[seed] = self.failed_pages.get(seed) or (errors[0] if errors else "No pages fetched")
+
+    def report(self):
+        return {
+            "hosts": {host: state.stats() for host, state in sorted(self.hosts.items())},
+            "failed_seeds": self.failed_seeds,
+            "failed_pages": self.failed_pages,
+            "disallowed_by_robots": self.disallowed,
+        }
+
+    def write_report(self, path):
+        """Write the run report as JSON and print the seeds that failed."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+        retries = sum(state.retries for state in self.hosts.values())
+        print(f"\n🚦 {sum(state.requests for state in self.hosts.values())} requests to {len(self.hosts)} hosts, "
+              f"{retries} retries, {len(self.failed_pages)} pages failed, {len(self.disallowed)} disallowed by robots.txt")
+        if self.failed_seeds:
+            print(f"❌ {len(self.failed_seeds)} seeds failed:")
+            for seed, error in self.failed_seeds.items():
+                print(f"   {seed}: {error}")
+        print(f"📋 Crawl report written to {path}")
+
+
+class PoliteCrawler:
+    """
+    AsyncWebCrawler wrapper that sends every page fetch through a CrawlScheduler.
+
+    Deep crawl strategies are run with this wrapper as their crawler, so the pages they
+    fetch with arun_many are rate limited and retried too. With a PageReadiness, every
+    page waits until it settled instead of a fixed delay, and the waits are learned per domain.
+    """
+
+    def __init__(self, crawler, scheduler, readiness=None):
+        self.crawler = crawler
+        self.scheduler = scheduler
+        self.readiness = readiness
+
+    async def _fetch(self, url, config=None, **kwargs):
+        if self.readiness is not None and config is not None:
+            config = self.readiness.configure(url, config)
+        result = await self.scheduler.fetch(self.crawler, url, config, **kwargs)
+        if self.readiness is not None:
+            self.readiness.observe(result)
+        return result
+
+    async def arun(self, url, config=None, **kwargs):
+        if config is not None and config.deep_crawl_strategy is not None:
+            return await config.deep_crawl_strategy.arun(start_url=url, crawler=self, config=config)
+        return [await self._fetch(url, config, **kwargs)]
+
+    async def arun_many(self, urls, config=None, **kwargs):
+        if config is not None and config.stream:
+            return self._stream(urls, config, **kwargs)
+        return await asyncio.gather(*(self._fetch(url, config, **kwargs) for url in urls))
+
+    async def _stream(self, urls, config, **kwargs):
+        for fetch in asyncio.as_completed([self._fetch(url, config, **kwargs) for url in urls]):
+            yield await fetch
+
+    def __getattr__(self, name):
+        return getattr(self.crawler, name)
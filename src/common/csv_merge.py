@@ -0,0 +1,280 @@
+import ast
+import csv
+import heapq
+import os
+import re
+import tempfile
+
+DEFAULT_CHUNK_ROWS = 200_000  # Rows held in memory per spill file in external sort mode
+
+# str(list_of_str) as written by csv.DictWriter: quoted items without escapes joined by ", "
+_STRING_ITEM = r"""'[^'\\\n\r\x00]*'|"[^"\\\n\r\x00]*\""""
+_SIMPLE_LIST = re.compile(rf"\[(?:(?:{_STRING_ITEM})(?:, (?:{_STRING_ITEM}))*)?\]")
+_LIST_ITEMS = re.compile(_STRING_ITEM)
+
+
+def parse_cell(raw_value):
+    """
+    Parse a list-literal cell, returning the raw string if it is not a valid literal.
+
+    Lists of plain quoted strings, which is what every extracted list column contains,
+    are split with a regex. Anything else (escapes, numbers, nesting) goes through
+    ast.literal_eval, so results are identical either way.
+    """
+    if not (raw_value.startswith('[') and raw_value.endswith(']')):
+        return raw_value
+    if _SIMPLE_LIST.fullmatch(raw_value):
+        return [item[1:-1] for item in _LIST_ITEMS.findall(raw_value)]
+    try:
+        return ast.literal_eval(raw_value)
+    except (ValueError, SyntaxError):
+        return raw_value
+
+
+SET_THRESHOLD = 32  # Below this many items a linear scan is cheaper than keeping a set
+
+
+class _ListAccumulator:
+    """Order-preserving list that switches to set-backed membership checks once it grows."""
+
+    __slots__ = ("items", "seen", "unhashable")
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.seen = None
+        self.unhashable = None
+        if len(self.items) > SET_THRESHOLD:
+            self._build_set()
+
+    def _build_set(self):
+        self.seen, self.unhashable = set(), []
+        for item in self.items:
+            self._remember(item)
+
+    def _remember(self, item):
+        try:
+            self.seen.add(item)
+        except TypeError:
+            self.unhashable.append(item)
+
+    def __contains__(self, item):
+        if self.seen is None:
+            return item in self.items
+        try:
+            return item in self.seen
+        except TypeError:
+            return item in self.unhashable
+
+    def _append(self, item):
+        self.items.append(item)
+        if self.seen is not None:
+            self._remember(item)
+        elif len(self.items) > SET_THRESHOLD:
+            self._build_set()
+
+    def extend_new(self, values):
+        # Membership is checked against the items before this merge, so repeats inside
+        # `values` are kept, matching list.extend([v for v in value if v not in existing])
+        to_add = [v for v in values if v not in self]
+        for item in to_add:
+            self._append(item)
+
+    def append_if_absent(self, value):
+        if value not in self:
+            self._append(value)
+
+    def result(self):
+        return self.items
+
+
+class _TextAccumulator:
+    """
+    Newline-joined string that only gains values not already present as a line. Parts
+    are joined once at the end instead of re-concatenating the string on every merge.
+    """
+
+    __slots__ = ("parts", "lines")
+
+    def __init__(self, value):
+        self.parts = [value]
+        self.lines = None
+
+    def text(self):
+        return '\n'.join(self.parts)
+
+    def append_if_absent(self, value):
+        if self.lines is None:
+            if value in self.text().split('\n'):
+                return
+            self.parts.append(value)
+            if len(self.parts) > SET_THRESHOLD:
+                self.lines = set(self.text().split('\n'))
+        elif value not in self.lines:
+            self.parts.append(value)
+            self.lines.update(value.split('\n'))
+
+    def result(self):
+        return self.text()
+
+
+def merge_into(record, field, value):
+    """
+    Merge one parsed value into record, a dict of field -> accumulator: lists gain only new
+    items and strings gain only new lines. finish_record turns the accumulators back into values.
+    """
+    existing = record.get(field)
+    if existing is None:
+        record[field] = _ListAccumulator(value) if isinstance(value, list) else _TextAccumulator(value)
+    elif isinstance(existing, _ListAccumulator):
+        if isinstance(value, list):
+            existing.extend_new(value)
+        else:
+            existing.append_if_absent(value)
+    elif isinstance(value, list):
+        text = existing.text()
+        record[field] = _ListAccumulator([text] + [v for v in value if v != text])
+    else:
+        existing.append_if_absent(value)
+
+
+def _merge_row(record, row, merge_key):
+    for field, raw_value in row.items():
+        if field == merge_key or not raw_value:
+            continue
+        merge_into(record, field, parse_cell(raw_value))
+
+
+def finish_record(key, record, merge_key):
+    merged = {merge_key: key}
+    for field, accumulator in record.items():
+        merged[field] = accumulator.result()
+    return merged
+
+
+def _merge_in_memory(reader, merge_key):
+    """Yield merged records in first-seen key order, releasing each accumulator as it is yielded."""
+    merged_records = {}
+    for row in reader:
+        key = row.get(merge_key)
+        if not key:
+            continue
+        _merge_row(merged_records.setdefault(key, {}), row, merge_key)
+    for key in list(merged_records):
+        yield finish_record(key, merged_records.pop(key), merge_key)
+
+
+def _write_run(rows, spill_dir):
+    """Write one sorted run to a spill file and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".csv", dir=spill_dir)
+    with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+
+def _sorted_runs(rows, sort_key, chunk_rows, spill_dir):
+    """Split an iterable of rows into sorted spill files of at most chunk_rows rows."""
+    paths, chunk = [], []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            chunk.sort(key=sort_key)
+            paths.append(_write_run(chunk, spill_dir))
+            chunk = []
+    if chunk:
+        chunk.sort(key=sort_key)
+        paths.append(_write_run(chunk, spill_dir))
+    return paths
+
+
+def _merge_external(reader, fieldnames, merge_key, output_csv_path, chunk_rows):
+    """
+    Two-pass external merge for inputs that do not fit in memory.
+
+    Pass 1 sorts (key, row number, cells) into spill files, then stream-merges them so
+    each key's rows arrive together and in file order, and merges one group at a time.
+    Pass 2 sorts the merged rows by the row number of each key's first occurrence,
+    which restores the output order of the in-memory merge.
+    """
+    value_fields = [field for field in fieldnames if field != merge_key]
+    with tempfile.TemporaryDirectory(prefix="csv_merge_") as spill_dir:
+        def keyed_rows():
+            for seq, row in enumerate(reader):
+                key = row.get(merge_key)
+                if key:
+                    yield [key, str(seq)] + [row.get(field) or '' for field in value_fields]
+
+        by_key = lambda row: (row[0], int(row[1]))
+        runs = _sorted_runs(keyed_rows(), by_key, chunk_rows, spill_dir)
+
+        def render(first_seq, key, record):
+            merged = finish_record(key, record, merge_key)
+            return [first_seq] + ['' if merged.get(field) is None else str(merged[field]) for field in fieldnames]
+
+        def merged_groups():
+            current_key, first_seq, record = None, None, None
+            for row in heapq.merge(*(_read_run(path) for path in runs), key=by_key):
+                if row[0] != current_key:
+                    if current_key is not None:
+                        yield render(first_seq, current_key, record)
+                    current_key, first_seq, record = row[0], row[1], {}
+                _merge_row(record, dict(zip(value_fields, row[2:])), merge_key)
+            if current_key is not None:
+                yield render(first_seq, current_key, record)
+
+        by_first_seq = lambda row: int(row[0])
+        output_runs = _sorted_runs(merged_groups(), by_first_seq, chunk_rows, spill_dir)
+
+        with open(output_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            for row in heapq.merge(*(_read_run(path) for path in output_runs), key=by_first_seq):
+                writer.writerow(row[1:])
+
+
+def merge_csv_records_by_name(input_csv_path, output_csv_path=None, merge_key='name', external_sort=False,
+                              chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Merge records from a CSV file that have the same 'name' attribute.
+
+    For records with the same name:
+    - List values are appended (no duplicates)
+    - String values are appended with newlines (no duplicate lines)
+    - Other values are kept from the last occurrence
+
+    Args:
+        input_csv_path (str): Path to the input CSV file
+        output_csv_path (str, optional): Path to save the merged CSV. If None, returns the merged data.
+        merge_key (str): Column name to merge on (default 'name')
+        external_sort (bool): Sort rows by merge key into spill files and merge one group at a
+            time, so memory stays bounded by chunk_rows. Requires output_csv_path.
+        chunk_rows (int): Rows per spill file in external sort mode
+
+    Returns:
+        If output_csv_path is None, returns a list of dictionaries with the merged records.
+        Otherwise, saves to CSV and returns None.
+    """
+    if external_sort and not output_csv_path:
+        raise ValueError("external_sort requires output_csv_path")
+
+    with open(input_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        fieldnames = reader.fieldnames
+
+        if external_sort:
+            _merge_external(reader, fieldnames, merge_key, output_csv_path, chunk_rows)
+            return None
+
+        merged_records = _merge_in_memory(reader, merge_key)
+        if not output_csv_path:
+            return list(merged_records)
+
+        with open(output_csv_path, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(merged_records)
+        return None
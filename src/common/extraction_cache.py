@@ -0,0 +1,72 @@
+import hashlib
+import json
+import re
+
+from crawl4ai.extraction_strategy import ExtractionStrategy
+
+from src.common.disk_cache import DiskCache
+
+
+def clean_markdown(markdown):
+    """Normalise whitespace so cosmetic re-renders of a page hash the same."""
+    lines = [line.rstrip() for line in markdown.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+class ExtractionCache(DiskCache):
+    """
+    On-disk cache of LLM extraction results.
+
+    Entries are keyed by a hash of the cleaned page markdown, the extraction
+    instructions and the output schema, so changing the prompt or the pydantic
+    model invalidates every entry.
+    """
+
+    @staticmethod
+    def key(markdown, instruction, schema, model=""):
+        digest = hashlib.sha256()
+        for part in (clean_markdown(markdown), instruction or "", json.dumps(schema, sort_keys=True), model):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"🗃️ Extraction cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['evictions']} evictions")
+
+
+class CachedExtractionStrategy(ExtractionStrategy):
+    """
+    Wraps an LLMExtractionStrategy and skips the model call for pages whose
+    markdown has already been extracted with the same instructions and schema.
+    """
+
+    def __init__(self, strategy, cache):
+        super().__init__(input_format=strategy.input_format)
+        self.strategy = strategy
+        self.cache = cache
+
+    def extract(self, url, html, *q, **kwargs):
+        return self.strategy.extract(url, html, *q, **kwargs)
+
+    def run(self, url, sections, *q, **kwargs):
+        key = self.cache.key(
+            "\n\n".join(sections),
+            self.strategy.instruction,
+            self.strategy.schema,
+            self.strategy.llm_config.provider,
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"🗃️ Extraction cache hit for {url}")
+            return cached
+
+        blocks = self.strategy.run(url, sections, *q, **kwargs)
+        # Failed calls are retried on the next crawl rather than cached
+        if not any(block.get("error") is True for block in blocks):
+            self.cache.put(key, blocks)
+        return blocks
+
+    def show_usage(self):
+        self.strategy.show_usage()
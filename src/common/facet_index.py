@@ -0,0 +1,86 @@
+import ast
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+
+def facet_values(value):
+    """Lowercase values of a facet cell, which may be a plain string or a list exported as its Python repr."""
+    if value is None or (not isinstance(value, (list, tuple)) and pd.isna(value)):
+        return []
+    if isinstance(value, str) and value.strip().startswith("["):
+        try:
+            value = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            value = value.strip("[]").split(",")
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [str(item).strip().strip("'\"").lower() for item in values if str(item).strip().strip("'\"")]
+
+
+class FacetIndex:
+    """
+    Inverted index from each value of a set of categorical columns to the rows holding it.
+
+    Rows are identified by their position in the DataFrame the index was built from. A
+    query ANDs its facets and ORs the values asked for within a facet. Rows tagged with a
+    wildcard value (e.g. industries "all") match every value of that facet.
+    """
+
+    def __init__(self, df, columns, wildcards=()):
+        self.size = len(df)
+        self.wildcards = {value.lower() for value in wildcards}
+        self.postings = {column: defaultdict(set) for column in columns}
+        for column in columns:
+            if column not in df:
+                continue
+            for position, cell in enumerate(df[column].tolist()):
+                for value in facet_values(cell):
+                    self.postings[column][value].add(position)
+
+    def counts(self, column):
+        """How many rows hold each value of a facet, most common first."""
+        return Counter({value: len(rows) for value, rows in self.postings[column].items()}).most_common()
+
+    def match(self, column, values):
+        """Rows holding any of the values in a facet."""
+        if column not in self.postings:
+            raise ValueError(f"Unknown facet {column!r}, expected one of {', '.join(self.postings)}")
+        postings = self.postings[column]
+        rows = set()
+        for value in [values] if isinstance(values, str) else values:
+            rows |= postings.get(str(value).strip().lower(), set())
+        for wildcard in self.wildcards:
+            rows |= postings.get(wildcard, set())
+        return rows
+
+    def filter(self, facets):
+        """Rows matching every {column: value or [values]} facet, all rows when there is none."""
+        rows = set(range(self.size))
+        for column, values in facets.items():
+            rows &= self.match(column, values)
+        return rows
+
+
+class IntervalIndex:
+    """
+    Rows with a [low, high] range, e.g. event dates or funding amounts, indexed for overlap queries.
+
+    Lows and highs are kept in two sorted lists, so the rows overlapping a query range are
+    the rows starting before it ends intersected with the rows ending after it starts, each
+    found with a binary search. Rows without a range are kept apart in unbounded.
+    """
+
+    def __init__(self, ranges):
+        bounded = [(position, low, high) for position, (low, high) in enumerate(ranges)
+                   if low is not None and high is not None]
+        self.unbounded = {position for position, (low, high) in enumerate(ranges)
+                          if low is None or high is None}
+        self._lows = sorted((low, position) for position, low, _ in bounded)
+        self._highs = sorted((high, position) for position, _, high in bounded)
+
+    def overlapping(self, low=None, high=None):
+        """Rows whose range overlaps [low, high], either bound may be left open."""
+        starts_before = self._lows if high is None else self._lows[:bisect_right(self._lows, (high, float("inf")))]
+        ends_after = self._highs if low is None else self._highs[bisect_left(self._highs, (low, -1)):]
+        return {position for _, position in starts_before} & {position for _, position in ends_after}
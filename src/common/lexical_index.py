@@ -0,0 +1,140 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its my of on or our so "
+    "that the their this to we what which who will with you your".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens with stopwords removed and simple plural folding."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a list of documents, stored as an inverted index of
+    term -> [[doc_id, term_frequency], ...] postings so a query only touches the
+    documents that share a term with it.
+    """
+
+    def __init__(self, postings, doc_lengths, k1=1.5, b=0.75, fingerprint=None):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.fingerprint = fingerprint
+        self.avg_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+
+    @classmethod
+    def build(cls, documents, fingerprint=None, **kwargs):
+        postings = defaultdict(list)
+        doc_lengths = []
+        for doc_id, document in enumerate(documents):
+            tokens = tokenize(document)
+            doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings[term].append([doc_id, frequency])
+        return cls(dict(postings), doc_lengths, fingerprint=fingerprint, **kwargs)
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def idf(self, term):
+        doc_frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self) - doc_frequency + 0.5) / (doc_frequency + 0.5))
+
+    def search(self, query, top_k=10, allowed_ids=None):
+        """
+        Args:
+            allowed_ids: Only score these documents, e.g. the rows left after hard filters
+
+        Returns:
+            Up to top_k (doc_id, score) tuples, best first. Documents sharing no term
+            with the query are never returned.
+        """
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in term_postings:
+                if allowed_ids is not None and doc_id not in allowed_ids:
+                    continue
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_doc_length or 1)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+    def save(self, path):
+        # Unique per writer so concurrent recommend calls rebuilding the same index do not collide
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "fingerprint": self.fingerprint,
+                "k1": self.k1,
+                "b": self.b,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["postings"], data["doc_lengths"], k1=data["k1"], b=data["b"], fingerprint=data["fingerprint"])
+
+
+def file_fingerprint(path, *extra):
+    """sha256 of a file's bytes plus any extra strings, e.g. the indexed field names."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    for part in extra:
+        digest.update(b"\0" + str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_or_build_csv_index(df, csv_path, fields):
+    """
+    Load the BM25 index persisted next to a CSV, rebuilding it if the CSV or the
+    indexed fields changed since it was written.
+
+    Args:
+        df (pd.DataFrame): The parsed CSV, one document per row
+        csv_path (str): Path the DataFrame was read from, the index is saved as <csv_path>.bm25.json
+        fields (list[str]): Columns to index, columns missing from the CSV are ignored.
+            If none of them are present every column is indexed.
+    """
+    columns = [field for field in fields if field in df.columns] or list(df.columns)
+    fingerprint = file_fingerprint(csv_path, *columns)
+    index_path = f"{csv_path}.bm25.json"
+
+    if os.path.isfile(index_path):
+        try:
+            index = BM25Index.load(index_path)
+            if index.fingerprint == fingerprint and len(index) == len(df):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+
+    documents = df[columns].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+    index = BM25Index.build(documents, fingerprint=fingerprint)
+    index.save(index_path)
+    return index
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import weakref
+
+from litellm import acompletion, completion
+
+from src.common.markdown_pruning import count_tokens
+
+DEFAULT_MAX_CONCURRENCY = 8  # Model calls streaming at the same time per event loop
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many model calls stream at once. Each event loop gets its own semaphore, so
+    the limiter can be shared by module-level code and reused across asyncio.run calls.
+    Changing limit applies to event loops that have not used the limiter yet.
+    """
+
+    def __init__(self, limit=DEFAULT_MAX_CONCURRENCY):
+        self.limit = limit
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    async def __aenter__(self):
+        await self._semaphore().acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore().release()
+
+
+llm_limiter = ConcurrencyLimiter()
+
+
+class StubLLM:
+    """
+    Offline stand-in for the model, for running the service and benchmarks without Azure
+    credentials. It answers with the user's request and the first lines of the data it was
+    given, streamed word by word with an optional delay per token.
+
+    Every call waits latency seconds before answering, and its prompt and answer tokens are
+    counted with the local tokenizer, so benchmarks see a model's call and token load.
+    """
+
+    def __init__(self, token_delay=0.0, context_lines=3, latency=0.0, model="gpt-4o"):
+        self.token_delay = token_delay
+        self.context_lines = context_lines
+        self.latency = latency
+        self.model = model
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Extraction calls come from worker threads as well as the event loop
+        self._lock = threading.Lock()
+
+    def answer(self, messages):
+        content = messages[-1]["content"]
+        request, _, data = content.partition("\n\n")
+        request = request.removeprefix("User Request:").strip()
+        lines = [line.strip() for line in data.splitlines()[1:] if line.strip()]
+        context = "\n".join(f"- {line[:120]}" for line in lines[:self.context_lines])
+        return f"Stub answer for: {request}\nBased on {len(lines)} lines of data, starting with:\n{context}"
+
+    def answer_json(self, messages):
+        """Answer to a request for a JSON object (response_format={"type": "json_object"})."""
+        return json.dumps({"answer": self.answer(messages)})
+
+    def _respond(self, messages, response_format=None):
+        json_mode = isinstance(response_format, dict) and response_format.get("type") == "json_object"
+        text = self.answer_json(messages) if json_mode else self.answer(messages)
+        prompt_tokens = sum(count_tokens(message["content"], self.model) for message in messages)
+        completion_tokens = count_tokens(text, self.model)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return text
+
+    async def complete(self, messages, response_format=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages, response_format)
+
+    def complete_sync(self, messages, response_format=None, **kwargs):
+        """complete() for synchronous callers, such as crawl4ai extraction strategies."""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages, response_format)
+
+    async def stream(self, messages):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in re.findall(r"\S+\s*", self._respond(messages)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+    def stats(self):
+        return {"calls": self.calls, "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens}
+
+
+_stub_llm = None
+
+
+def use_stub_llm(stub=None):
+    """Route every completion, streamed or not, to a StubLLM (a default one when stub is None) instead of litellm."""
+    global _stub_llm
+    _stub_llm = stub or StubLLM()
+    return _stub_llm
+
+
+def complete_text_sync(model, messages, **kwargs):
+    """complete_text for synchronous callers, such as each recommender's recommend()."""
+    if _stub_llm is not None:
+        return _stub_llm.complete_sync(messages, **kwargs)
+    response = completion(model=model, messages=messages, **kwargs)
+    return response.choices[0].message["content"]
+
+
+async def complete_text(model, messages, **kwargs):
+    """Text of a chat completion that is not streamed, from the StubLLM when one is in use."""
+    if _stub_llm is not None:
+        return await _stub_llm.complete(messages, **kwargs)
+    response = await acompletion(model=model, messages=messages, **kwargs)
+    return response.choices[0].message["content"]
+
+
+async def stream_completion(model, messages, temperature, limiter=llm_limiter, **kwargs):
+    """Yield the text of a chat completion as litellm streams it, holding a limiter slot throughout."""
+    async with limiter:
+        if _stub_llm is not None:
+            async for token in _stub_llm.stream(messages):
+                yield token
+            return
+
+        response = await acompletion(model=model, messages=messages, temperature=temperature, stream=True,
+                                     **kwargs)
+        async for chunk in response:
+            # Some chunks carry no text: role-only or final deltas, and chunks without choices or a delta
+            delta = chunk.choices[0].delta if chunk.choices else None
+            token = delta.content if delta is not None else None
+            if token:
+                yield token
+
+
+async def stream_cached_answer(cache, cache_key, build_messages, model, temperature, limiter=llm_limiter,
+                               **kwargs):
+    """
+    Stream an answer, serving it from the response cache when possible.
+
+    A cached answer is yielded as a single chunk. Otherwise build_messages runs in a worker
+    thread (it reads the data file and runs retrieval), the completion is streamed token by
+    token, and the full answer is cached once the stream finishes. The cache's disk tier is
+    read and written from worker threads as well.
+
+    Args:
+        cache (ResponseCache): Cache the answer is read from and written to
+        cache_key (str): Key from ResponseCache.key
+        build_messages (callable): Returns the chat messages for the request
+        model (str): litellm model name
+        temperature (float): Sampling temperature
+        limiter (ConcurrencyLimiter): Cap on concurrently streaming model calls
+        **kwargs: Passed on to litellm.acompletion, e.g. mock_response
+    """
+    cached = await asyncio.to_thread(cache.get, cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    messages = await asyncio.to_thread(build_messages)
+    tokens = []
+    async for token in stream_completion(model, messages, temperature, limiter, **kwargs):
+        tokens.append(token)
+        yield token
+    await asyncio.to_thread(cache.put, cache_key, "".join(tokens))
@@ -0,0 +1,145 @@
+import re
+import zlib
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from litellm import token_counter
+
+from src.common.lexical_index import TOKEN_PATTERN
+
+HEADING = re.compile(r"^#{1,6}\s")
+SHINGLE_WORDS = 4  # Words per shingle when fingerprinting blocks
+DEFAULT_MIN_PAGES = 3  # A block is boilerplate once its shingles appear on this many pages of the domain
+BOILERPLATE_SHINGLE_RATIO = 0.8  # Share of a block's shingles that must be repeated for it to be boilerplate
+DEFAULT_PAGE_TOKEN_BUDGET = 6000
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Prompt tokens of text for a litellm model name, falling back to ~4 characters per token."""
+    try:
+        return token_counter(model=model.split("/")[-1], text=text)
+    except Exception:
+        return len(text) // 4
+
+
+def split_blocks(markdown):
+    """Paragraph-level blocks of a page, separated by blank lines."""
+    return [block.strip() for block in re.split(r"\n\s*\n", markdown) if block.strip()]
+
+
+def block_shingles(block):
+    """crc32 hashes of the word SHINGLE_WORDS-grams of a block, so a menu with one highlighted item still matches."""
+    words = TOKEN_PATTERN.findall(block.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+class MarkdownPruner:
+    """
+    Trims crawled markdown before it is sent for extraction.
+
+    Blocks whose shingles keep turning up on other pages of the same domain (navigation
+    menus, footers, cookie banners) are dropped, headings are always kept. What is left is
+    capped to token_budget tokens: the opening section and sections whose heading or text
+    mention one of the keywords (the schema's fields, e.g. eligibility or funding) are kept
+    first, then the remaining sections in page order while they fit.
+
+    Shingle counts accumulate per domain for the pruner's lifetime, so call observe() on a
+    seed's pages before pruning them. What is pruned therefore depends on the pages crawled
+    before, and BatchExtractor keys its cache on the unpruned markdown.
+    """
+
+    def __init__(self, keywords=(), token_budget=DEFAULT_PAGE_TOKEN_BUDGET, min_pages=DEFAULT_MIN_PAGES,
+                 model="gpt-4o", verbose=True):
+        self.keywords = re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + r")", re.IGNORECASE) \
+            if keywords else None
+        self.token_budget = token_budget
+        self.min_pages = min_pages
+        self.model = model
+        self.verbose = verbose
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.pages = 0
+        self._shingle_pages = defaultdict(Counter)
+        self._domain_pages = Counter()
+
+    def observe(self, url, markdown):
+        domain = urlparse(url).netloc
+        shingles = set()
+        for block in split_blocks(markdown):
+            shingles |= block_shingles(block)
+        self._shingle_pages[domain].update(shingles)
+        self._domain_pages[domain] += 1
+
+    def is_boilerplate(self, domain, block):
+        if HEADING.match(block) or self._domain_pages[domain] < self.min_pages:
+            return False
+        shingles = block_shingles(block)
+        if not shingles:
+            # Nothing to compare, e.g. a table rule or non-Latin text: keep it rather than risk the content
+            return False
+        counts = self._shingle_pages[domain]
+        repeated = sum(1 for shingle in shingles if counts[shingle] >= self.min_pages)
+        return repeated / len(shingles) >= BOILERPLATE_SHINGLE_RATIO
+
+    def _sections(self, blocks):
+        sections = [[]]
+        for block in blocks:
+            if HEADING.match(block) and sections[-1]:
+                sections.append([])
+            sections[-1].append(block)
+        return ["\n\n".join(section) for section in sections if section]
+
+    def _fit_budget(self, sections):
+        """Sections kept within token_budget, in page order. A section too long for what is left is cut at a block."""
+        if not sections:
+            return []
+        priority = [0] + [i for i, section in enumerate(sections[1:], 1)
+                          if self.keywords and self.keywords.search(section)]
+        order = priority + [i for i in range(1, len(sections)) if i not in priority]
+        kept, used = {}, 0
+        for i in order:
+            tokens = count_tokens(sections[i], self.model)
+            if used + tokens <= self.token_budget:
+                kept[i] = sections[i]
+                used += tokens
+                continue
+            partial = []
+            for block in sections[i].split("\n\n"):
+                block_tokens = count_tokens(block, self.model)
+                if used + block_tokens > self.token_budget:
+                    break
+                partial.append(block)
+                used += block_tokens
+            if partial:
+                kept[i] = "\n\n".join(partial)
+        return [kept[i] for i in sorted(kept)]
+
+    def prune(self, url, markdown):
+        if not markdown or not markdown.strip():
+            return markdown
+        domain = urlparse(url).netloc
+        blocks = [block for block in split_blocks(markdown) if not self.is_boilerplate(domain, block)]
+        pruned = "\n\n".join(self._fit_budget(self._sections(blocks)))
+
+        before, after = count_tokens(markdown, self.model), count_tokens(pruned, self.model)
+        self.tokens_before += before
+        self.tokens_after += after
+        self.pages += 1
+        if self.verbose:
+            print(f"✂️ {url}: {before} → {after} tokens ({before - after} saved)")
+        return pruned
+
+    def prune_pages(self, pages):
+        """Prune a seed's (url, markdown) pages, counting their shingles first so repeats within the seed are caught."""
+        for url, markdown in pages:
+            if markdown:
+                self.observe(url, markdown)
+        return [(url, self.prune(url, markdown)) for url, markdown in pages]
+
+    def print_stats(self):
+        saved = self.tokens_before - self.tokens_after
+        share = saved / self.tokens_before if self.tokens_before else 0
+        print(f"✂️ Markdown pruning: {saved} of {self.tokens_before} tokens saved ({share:.0%}) over {self.pages} pages")
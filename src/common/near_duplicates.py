@@ -0,0 +1,267 @@
+import csv
+import os
+import re
+import tempfile
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from src.common.columnar_store import ParquetExport, is_parquet, read_table_records
+from src.common.csv_merge import finish_record, merge_csv_records_by_name
+from src.common.lexical_index import TOKEN_PATTERN, tokenize
+from src.common.record_store import accumulate_record
+
+DEFAULT_THRESHOLD = 0.85  # Minimum character-shingle Jaccard similarity for two names to merge
+NUM_PERM = 128  # MinHash permutations per signature
+SHINGLE_SIZE = 3
+TARGET_RECALL = 0.95  # Chance that a pair right at the threshold shares at least one LSH bucket
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_PARENTHETICAL = re.compile(r"\(([^()]*)\)")
+# Numbers and roman numerals tell tranches and grant calls apart ("Tranche 1", "Grant Call II")
+_NUMBER = re.compile(r"\d+|(?=[ivx])x{0,3}(?:ix|iv|v?i{0,3})")
+
+
+def _is_acronym(text):
+    """Whether a parenthetical spells out an acronym such as "PSG", "EFS-Green" or "GMIS-EB 2.0"."""
+    return len(text) <= 12 and sum(char.isupper() for char in text) >= 2
+
+
+def _split_parentheticals(name):
+    """The name without its parentheticals, and those that qualify it rather than spell out an acronym."""
+    qualifiers = []
+
+    def strip(match):
+        if not _is_acronym(match.group(1)):
+            qualifiers.append(match.group(1))
+        return " "
+
+    return _PARENTHETICAL.sub(strip, name), qualifiers
+
+
+def name_features(name):
+    """
+    Normalised text, number tokens and parenthetical qualifier of a name.
+
+    Parentheticals, punctuation, stopwords and numbers are dropped from the text, so
+    "FSTI 3.0 – AI Grant (FSTI)" and "FSTI AI Grant" normalise to the same string. The
+    numbers and the normalised text of non-acronym parentheticals such as "(Core)" are
+    returned separately, so names whose numbers or qualifiers conflict are never merged.
+    """
+    text, qualifiers = _split_parentheticals(str(name))
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    qualifier_tokens = TOKEN_PATTERN.findall(" ".join(qualifiers).lower())
+    numbers = frozenset(token for token in tokens + qualifier_tokens if _NUMBER.fullmatch(token))
+    words = tokenize(" ".join(token for token in tokens if token not in numbers))
+    qualifier = tokenize(" ".join(token for token in qualifier_tokens if token not in numbers))
+    return " ".join(words), numbers, " ".join(qualifier)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of character n-grams of text (the whole text when it is shorter than size)."""
+    if len(text) <= size:
+        return {text}
+    return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+
+def jaccard(left, right):
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def numbers_compatible(left, right):
+    """Names may merge when only one side carries numbers or both carry the same ones."""
+    return not left or not right or left == right
+
+
+def qualifiers_compatible(left, right):
+    """
+    Names may only merge when their qualifiers are the same: "Enterprise Development Grant
+    (Core)" is one track of the grant, not another spelling of "Enterprise Development Grant".
+    """
+    return left == right
+
+
+def lsh_params(threshold, num_perm=NUM_PERM, target_recall=TARGET_RECALL):
+    """
+    Pick (bands, rows) for LSH banding.
+
+    A pair with similarity s becomes a candidate with probability 1 - (1 - s**rows)**bands.
+    The widest bands (fewest false candidates) that still reach target_recall at the
+    threshold are used; candidates are verified with exact Jaccard afterwards.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= target_recall:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """MinHash signatures of shingle sets using num_perm universal hash functions (a*x + b mod p)."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        # a and x are below 2**61 and 2**32; uint64 arithmetic wraps, which keeps the mix uniform
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def cluster_names(names, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+    """
+    Map near-duplicate names onto a canonical name.
+
+    Names are visited in order and the first name of each cluster is its canonical form.
+    Each name is only compared with canonical names that share an LSH bucket with it, so the
+    work grows with the number of candidates rather than with every pair, and clusters cannot
+    chain through intermediate names. A name only joins a cluster when its numbers agree with
+    those of every member, so a name without numbers cannot bridge "Grant Call I" and
+    "Grant Call II" into one cluster, and when its parenthetical qualifier is the
+    cluster's, so "(Core)" and "(Market Access)" tracks stay apart from the grant itself.
+
+    Args:
+        names (list[str]): Distinct names in first-seen order
+        threshold (float): Minimum Jaccard similarity of the normalised names' shingles
+        num_perm (int): MinHash permutations per signature
+
+    Returns:
+        dict: {duplicate_name: (canonical_name, similarity)} for every merged name
+    """
+    bands, rows = lsh_params(threshold, num_perm)
+    hasher = MinHasher(num_perm)
+    buckets = defaultdict(list)
+    canonical = []  # (name, shingle set, qualifier) of each cluster's first name
+    member_numbers = []  # Distinct non-empty number sets of each cluster's members
+    by_features = {}  # Identical normalised names are matched without hashing
+    merges = {}
+
+    for name in names:
+        text, numbers, qualifier = name_features(name)
+        if not text:
+            continue
+        exact = by_features.get((text, numbers, qualifier))
+        if exact is not None:
+            merges[name] = (canonical[exact][0], 1.0)
+            continue
+
+        shingle_set = shingles(text)
+        signature = hasher.signature(shingle_set)
+        keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+        best, best_similarity = None, 0.0
+        for candidate in sorted({index for key in keys for index in buckets.get(key, ())}):
+            _, candidate_shingles, candidate_qualifier = canonical[candidate]
+            if not qualifiers_compatible(qualifier, candidate_qualifier):
+                continue
+            if not all(numbers_compatible(numbers, member) for member in member_numbers[candidate]):
+                continue
+            similarity = jaccard(shingle_set, candidate_shingles)
+            if similarity >= threshold and similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+
+        if best is not None:
+            merges[name] = (canonical[best][0], round(best_similarity, 4))
+            if numbers:
+                member_numbers[best].add(numbers)
+            continue
+
+        by_features[(text, numbers, qualifier)] = len(canonical)
+        for key in keys:
+            buckets[key].append(len(canonical))
+        canonical.append((name, shingle_set, qualifier))
+        member_numbers.append({numbers} if numbers else set())
+
+    return merges
+
+
+def _merge_parquet(input_path, output_path, merges, merge_key):
+    """Rename and re-merge the records of a Parquet table, keeping its schema."""
+    schema = pq.read_schema(input_path)
+    merged = {}
+    for record in read_table_records(input_path):
+        key = record[merge_key]
+        key = merges[key][0] if key in merges else key
+        # Values are merged in their normalized form, the export casts them back to the schema types
+        accumulate_record(merged.setdefault(key, {}), record, merge_key)
+    export = ParquetExport(output_path, schema)
+    export.write([finish_record(key, accumulators, merge_key) for key, accumulators in merged.items()])
+    export.close()
+
+
+def merge_near_duplicates(input_csv_path, output_csv_path=None, merge_key='name', threshold=DEFAULT_THRESHOLD,
+                          audit_csv_path=None):
+    """
+    Rename near-duplicate keys of a merged CSV (or Parquet table) to their canonical name and merge them again.
+
+    Args:
+        input_csv_path (str): CSV or .parquet table already merged on exact merge_key values
+        output_csv_path (str, optional): Where to write the result, defaults to rewriting input_csv_path
+        merge_key (str): Column holding the scheme or event name
+        threshold (float): Minimum similarity for two names to be treated as the same record
+        audit_csv_path (str, optional): CSV listing every merge as canonical, duplicate, similarity
+
+    Returns:
+        dict: {duplicate_name: (canonical_name, similarity)} for every merged name
+    """
+    output_csv_path = output_csv_path or input_csv_path
+
+    if is_parquet(input_csv_path):
+        names = list(dict.fromkeys(record[merge_key] for record in read_table_records(input_csv_path, [merge_key])))
+    else:
+        with open(input_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            names = list(dict.fromkeys(row[merge_key] for row in reader))
+    merges = cluster_names(names, threshold)
+
+    if audit_csv_path:
+        with open(audit_csv_path, 'w', newline='', encoding='utf-8') as audit_file:
+            writer = csv.writer(audit_file)
+            writer.writerow(["canonical", "duplicate", "similarity"])
+            for duplicate, (canonical, similarity) in merges.items():
+                writer.writerow([canonical, duplicate, similarity])
+
+    if not merges and output_csv_path == input_csv_path:
+        return merges
+
+    if is_parquet(input_csv_path):
+        _merge_parquet(input_csv_path, output_csv_path, merges, merge_key)
+        if merges:
+            print(f"🧹 Merged {len(merges)} near-duplicate {merge_key} values (threshold {threshold})")
+        return merges
+
+    directory = os.path.dirname(os.path.abspath(output_csv_path))
+    with tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8', suffix='.csv', dir=directory,
+                                     delete=False) as renamed_file:
+        with open(input_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            writer = csv.DictWriter(renamed_file, fieldnames=reader.fieldnames)
+            writer.writeheader()
+            for row in reader:
+                if row[merge_key] in merges:
+                    row[merge_key] = merges[row[merge_key]][0]
+                writer.writerow(row)
+    try:
+        merged_path = renamed_file.name + '.merged'
+        merge_csv_records_by_name(renamed_file.name, merged_path, merge_key)
+        os.replace(merged_path, output_csv_path)
+    finally:
+        for path in (renamed_file.name, renamed_file.name + '.merged'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    if merges:
+        print(f"🧹 Merged {len(merges)} near-duplicate {merge_key} values (threshold {threshold})")
+    return merges
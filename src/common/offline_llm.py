@@ -0,0 +1,120 @@
+import json
+import re
+
+from crawl4ai.extraction_strategy import ExtractionStrategy
+
+from src.common.batch_extraction import document_block
+from src.common.llm_stream import StubLLM
+
+DOCUMENT_PATTERN = re.compile(r'<document id="([^"]*)" url="([^"]*)">\n(.*?)\n</document>', re.DOTALL)
+# "field: value" lines, also as list items or with the field in bold ("* **field**: value")
+FIELD_LINE = re.compile(r"^\s*(?:[-*+]\s+)?(?:\*\*|__)?([A-Za-z_][A-Za-z0-9_ ]*?)(?:\*\*|__)?\s*:\s*(.+?)\s*$")
+HEADING = re.compile(r"^\s*#{1,6}\s")
+LIST_SEPARATOR = ";"
+
+
+def find_schema(text):
+    """The first JSON schema (an object with "properties") written out in text, None when there is none."""
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+        except ValueError:
+            continue
+        if isinstance(value, dict) and isinstance(value.get("properties"), dict):
+            return value
+    return None
+
+
+def is_list_property(spec):
+    return spec.get("type") == "array" or any(option.get("type") == "array" for option in spec.get("anyOf", []))
+
+
+def fixture_records(markdown, schema):
+    """
+    Records a page describes as "field: value" lines, one record per heading section.
+
+    Fields are the schema's properties, array fields are split on ";". Sections without
+    every required field are skipped, the way a model leaves out items it cannot fill.
+    """
+    properties = schema.get("properties", {})
+    fields = {name.lower().replace(" ", "_"): name for name in properties}
+    sections, record = [], {}
+    for line in markdown.splitlines():
+        if HEADING.match(line) and record:
+            sections.append(record)
+            record = {}
+        match = FIELD_LINE.match(line)
+        name = fields.get(match.group(1).strip().lower().replace(" ", "_")) if match else None
+        if name is None:
+            continue
+        value = match.group(2).strip()
+        if is_list_property(properties[name]):
+            value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+        record[name] = value
+    if record:
+        sections.append(record)
+    required = schema.get("required", [])
+    return [record for record in sections if all(field in record for field in required)]
+
+
+class OfflineLLM(StubLLM):
+    """
+    StubLLM that also answers extraction requests, for running the crawlers offline.
+
+    Extraction requests carry the record schema and one or more <document> blocks; the
+    answer is the {"documents": [...]} object batch extraction asks for, with the records
+    of each document read from its "field: value" lines by fixture_records. Answers are
+    deterministic, so repeated runs over the same pages extract the same records.
+    """
+
+    def answer_json(self, messages):
+        text = "\n\n".join(message["content"] for message in messages)
+        schema = find_schema(text)
+        documents = DOCUMENT_PATTERN.findall(text)
+        if schema is None or not documents:
+            return super().answer_json(messages)
+        return json.dumps({"documents": [{"id": document_id, "records": fixture_records(markdown, schema)}
+                                         for document_id, _, markdown in documents]})
+
+
+class OfflineExtractionStrategy(ExtractionStrategy):
+    """
+    Stands in for a crawler's LLMExtractionStrategy: same instruction, schema and provider,
+    so extraction cache keys do not change, with each page answered by an OfflineLLM.
+    """
+
+    def __init__(self, strategy, llm):
+        super().__init__(input_format=strategy.input_format)
+        self.instruction = strategy.instruction
+        self.schema = strategy.schema
+        self.llm_config = strategy.llm_config
+        self.llm = llm
+
+    def extract(self, url, html, *q, **kwargs):
+        return self.run(url, [html])
+
+    def run(self, url, sections, *q, **kwargs):
+        messages = [
+            {"content": f"{self.instruction}\n\nSchema:\n{json.dumps(self.schema)}", "role": "system"},
+            {"content": document_block(0, url, "\n\n".join(sections)), "role": "user"},
+        ]
+        answer = json.loads(self.llm.complete_sync(messages, response_format={"type": "json_object"}))
+        records = answer["documents"][0]["records"] if answer.get("documents") else []
+        return [dict(record, error=False) for record in records]
+
+    def show_usage(self):
+        print(f"🧪 Offline extraction: {self.llm.calls} calls")
+
+
+def use_offline_extraction(cached_strategy, llm, batch_extractor=None):
+    """
+    Swap the LLMExtractionStrategy behind a crawler's CachedExtractionStrategy (and its
+    BatchExtractor, which keeps its own reference) for an OfflineExtractionStrategy.
+    Returns the strategy that was replaced.
+    """
+    original = cached_strategy.strategy
+    cached_strategy.strategy = OfflineExtractionStrategy(original, llm)
+    if batch_extractor is not None:
+        batch_extractor.strategy = cached_strategy.strategy
+    return original
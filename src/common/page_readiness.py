@@ -0,0 +1,121 @@
+import json
+import os
+import re
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+DEFAULT_QUIET_MS = 500  # A page is ready once neither its DOM nor its network changed for this long
+DEFAULT_MIN_TIMEOUT_MS = 1500
+DEFAULT_MAX_TIMEOUT_MS = 10000  # Fallback for domains without a profile, and the cap of learned timeouts
+MIN_SAMPLES = 5  # Pages of a domain measured before its learned timeout is used
+MAX_SAMPLES = 50  # Recent waits kept per domain
+TIMEOUT_HEADROOM = 1.5  # Learned timeout = 90th percentile wait * headroom + quiet period
+READY_ATTRIBUTES = re.compile(r"<html\b[^>]*?\bdata-ready-ms=\"(\d+)\"(?P<timeout>[^>]*?\bdata-ready-timeout=)?",
+                              re.IGNORECASE)
+
+# Polled by crawl4ai's wait_for every 100ms after the page loaded and was scrolled. The page counts as
+# ready once it finished loading and no DOM mutation or new network resource was seen for quiet_ms, or
+# when timeout_ms passed. The wait is written onto <html> so it can be read back from the crawled html.
+READINESS_JS = """js:() => {
+    const root = document.documentElement;
+    const state = window.__crawlReadiness || (window.__crawlReadiness = (() => {
+        const s = {start: performance.now(), last: performance.now(), resources: 0};
+        new MutationObserver(() => { s.last = performance.now(); })
+            .observe(root, {subtree: true, childList: true, characterData: true});
+        return s;
+    })());
+    const now = performance.now();
+    const resources = performance.getEntriesByType("resource").length;
+    if (resources !== state.resources) {
+        state.resources = resources;
+        state.last = now;
+    }
+    const settled = document.readyState === "complete" && now - state.last >= %(quiet_ms)d;
+    if (!settled && now - state.start < %(timeout_ms)d) {
+        return false;
+    }
+    root.setAttribute("data-ready-ms", Math.round(now - state.start));
+    if (!settled) {
+        root.setAttribute("data-ready-timeout", "1");
+    }
+    return true;
+}"""
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class PageReadiness:
+    """
+    Waits for each page to settle instead of sleeping a fixed delay_before_return_html.
+
+    A page is ready once its DOM and network have been quiet for quiet_ms. How long that
+    takes is learned per domain: after MIN_SAMPLES pages, a domain's wait is capped at
+    TIMEOUT_HEADROOM times its 90th percentile wait, between min_timeout_ms and
+    max_timeout_ms, so static sites are released within the quiet period and slow ones
+    are not cut short. Domains without a profile wait up to max_timeout_ms. The measured
+    waits are kept in the profile file across runs.
+
+    Layout on disk:
+        {domain: {"waits_ms": [...], "timeouts": int, "pages": int}}
+    """
+
+    def __init__(self, path=None, quiet_ms=DEFAULT_QUIET_MS, min_timeout_ms=DEFAULT_MIN_TIMEOUT_MS,
+                 max_timeout_ms=DEFAULT_MAX_TIMEOUT_MS):
+        self.path = path
+        self.quiet_ms = quiet_ms
+        self.min_timeout_ms = min_timeout_ms
+        self.max_timeout_ms = max_timeout_ms
+        self.profiles = defaultdict(lambda: {"waits_ms": [], "timeouts": 0, "pages": 0})
+        self.run_waits_ms = []
+        self.run_timeouts = 0
+        if path and os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.profiles.update(json.load(f))
+
+    def timeout_ms(self, domain):
+        waits = self.profiles[domain]["waits_ms"] if domain in self.profiles else []
+        if len(waits) < MIN_SAMPLES:
+            return self.max_timeout_ms
+        learned = percentile(waits, 0.9) * TIMEOUT_HEADROOM + self.quiet_ms
+        return int(min(self.max_timeout_ms, max(self.min_timeout_ms, learned)))
+
+    def configure(self, url, config):
+        """A copy of the run config that waits for the page to settle, with the url's domain timeout."""
+        wait_for = READINESS_JS % {"quiet_ms": self.quiet_ms, "timeout_ms": self.timeout_ms(urlsplit(url).netloc)}
+        return config.clone(wait_for=wait_for, delay_before_return_html=0)
+
+    def observe(self, result):
+        """Learn from the wait a crawled page recorded on its <html> tag."""
+        match = READY_ATTRIBUTES.search(result.html or "") if result.success else None
+        if not match:
+            return None
+        wait_ms, timed_out = int(match.group(1)), match.group("timeout") is not None
+        profile = self.profiles[urlsplit(result.url).netloc]
+        profile["waits_ms"] = (profile["waits_ms"] + [wait_ms])[-MAX_SAMPLES:]
+        profile["timeouts"] += timed_out
+        profile["pages"] += 1
+        self.run_waits_ms.append(wait_ms)
+        self.run_timeouts += timed_out
+        result.metadata = result.metadata or {}
+        result.metadata.update(ready_ms=wait_ms, ready_timeout=timed_out)
+        return wait_ms
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        if not self.run_waits_ms:
+            return
+        total = sum(self.run_waits_ms) / 1000
+        print(f"⏱️ Page readiness: {total:.1f}s waited over {len(self.run_waits_ms)} pages "
+              f"(median {percentile(self.run_waits_ms, 0.5) / 1000:.2f}s, "
+              f"p90 {percentile(self.run_waits_ms, 0.9) / 1000:.2f}s), {self.run_timeouts} hit their timeout")
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import threading
+
+import pandas as pd
+
+from src.common.csv_merge import parse_cell
+from src.common.markdown_pruning import count_tokens
+
+DEFAULT_ENCODING = "csv"
+LIST_SEPARATOR = "; "
+ELLIPSIS = "…"
+# How each encoding is introduced in the prompt, so the model knows how to read the rows
+ENCODING_LABELS = {
+    "table": "table",
+    "jsonl": "one JSON object per line",
+    "csv": "CSV",
+    "kv": "one 'field: value' block per entry",
+}
+
+
+def cell_value(value):
+    """A cell as a list or a stripped string, None when empty. CSV list literals are read back as lists."""
+    if isinstance(value, (list, tuple)):
+        values = [str(item).strip() for item in value if item is not None and str(item).strip()]
+        return values or None
+    if value is None or pd.isna(value):
+        return None
+    text = str(value).strip()
+    if text.startswith("["):
+        parsed = parse_cell(text)
+        if isinstance(parsed, list):
+            return cell_value(parsed)
+    return text or None
+
+
+def truncate(text, max_chars):
+    """Cut text to max_chars at a word boundary, marking the cut with an ellipsis."""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0] if " " in text[:max_chars] else text[:max_chars]
+    return cut.rstrip(" ,;:.") + ELLIPSIS
+
+
+def prompt_records(df, excluded_fields=(), field_budgets=None):
+    """
+    Rows of df as dicts of their non-empty fields, each text field cut to its budget in
+    field_budgets ({field: max characters}); items of a list field share its budget.
+    """
+    field_budgets = field_budgets or {}
+    columns = [column for column in df.columns if column not in set(excluded_fields)]
+    records = []
+    for row in df[columns].itertuples(index=False, name=None):
+        record = {}
+        for column, value in zip(columns, row):
+            value = cell_value(value)
+            if value is None:
+                continue
+            budget = field_budgets.get(column)
+            if isinstance(value, list):
+                value = truncate(LIST_SEPARATOR.join(value), budget).split(LIST_SEPARATOR) if budget else value
+            else:
+                value = truncate(value, budget)
+            record[column] = value
+        records.append(record)
+    return records, columns
+
+
+def encode_jsonl(records, columns):
+    return "\n".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) for record in records)
+
+
+def encode_csv(records, columns):
+    used = [column for column in columns if any(column in record for record in records)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(used)
+    for record in records:
+        writer.writerow([LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                         for value in (record.get(column, "") for column in used)])
+    return buffer.getvalue().rstrip("\n")
+
+
+def encode_kv(records, columns):
+    return "\n\n".join("\n".join(f"{field}: {LIST_SEPARATOR.join(value) if isinstance(value, list) else value}"
+                                 for field, value in record.items())
+                       for record in records)
+
+
+ENCODINGS = {"jsonl": encode_jsonl, "csv": encode_csv, "kv": encode_kv}
+
+
+def render_rows(df, encoding=DEFAULT_ENCODING, excluded_fields=(), field_budgets=None):
+    """
+    Render rows for a prompt. "jsonl", "csv" and "kv" drop empty cells and column padding;
+    "table" is DataFrame.to_string(), kept for comparison.
+    """
+    if encoding == "table":
+        return df.drop(columns=[column for column in excluded_fields if column in df]).to_string()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown prompt encoding {encoding!r}, expected one of {', '.join(ENCODING_LABELS)}")
+    records, columns = prompt_records(df, excluded_fields, field_budgets)
+    return ENCODINGS[encoding](records, columns)
+
+
+def data_heading(kind, encoding=DEFAULT_ENCODING):
+    """e.g. "Grants Data (CSV)", the line the rows follow in the prompt."""
+    return f"{kind} Data ({ENCODING_LABELS.get(encoding, encoding)})"
+
+
+class PromptStats:
+    """Tokens of the data part of the prompts built for the model, counted with the local tokenizer."""
+
+    def __init__(self, model="gpt-4o"):
+        self.model = model
+        self.prompts = 0
+        self.tokens = 0
+        self.max_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, text):
+        tokens = count_tokens(text, self.model)
+        with self._lock:
+            self.prompts += 1
+            self.tokens += tokens
+            self.max_tokens = max(self.max_tokens, tokens)
+        return tokens
+
+    def stats(self):
+        return {
+            "prompts": self.prompts,
+            "data_tokens": self.tokens,
+            "mean_data_tokens": self.tokens / self.prompts if self.prompts else 0.0,
+            "max_data_tokens": self.max_tokens,
+        }
+
+    def print_stats(self):
+        if self.prompts:
+            print(f"🧾 Prompt data: {self.prompts} prompts, {self.tokens / self.prompts:,.0f} tokens on average, "
+                  f"{self.max_tokens:,} at most")
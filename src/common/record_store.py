@@ -0,0 +1,219 @@
+import csv
+import json
+import os
+import sqlite3
+
+import pyarrow as pa
+
+from src.common.columnar_store import ROW_GROUP_SIZE, ParquetExport, arrow_schema, is_parquet
+from src.common.csv_merge import finish_record, merge_into
+
+SQLITE_MAX_VARIABLES = 900  # Stay under SQLite's bound parameter limit for IN (...) lookups
+
+
+def normalize_value(value):
+    """
+    Coerce an extracted value to what the CSV round trip produced: lists stay lists,
+    everything else becomes its string form, None and "" mean missing.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return str(value)
+
+
+def accumulate_record(accumulators, record, merge_key):
+    """
+    Merge a record into accumulators (field -> csv_merge accumulator) the way
+    merge_csv_records_by_name merges CSV rows, with set-backed lookups once a field grows.
+    finish_record turns the accumulators into the merged record.
+    """
+    for field, value in record.items():
+        if field == merge_key:
+            continue
+        value = normalize_value(value)
+        if value is not None:
+            merge_into(accumulators, field, value)
+    return accumulators
+
+
+def record_schema(model):
+    """Arrow schema of the records a RecordStore of model exports, with the "error" flag extracted blocks carry."""
+    return arrow_schema(model, {"error": pa.bool_()})
+
+
+class RecordStore:
+    """
+    SQLite (WAL mode) store of extracted records, one table per tool schema with a
+    unique index on the merge key.
+
+    Records are merged on write, so a record upserted for an existing key is combined
+    with the stored one exactly as merge_csv_records_by_name would combine the two
+    CSV rows. Values are stored as JSON in one column per schema field, and the merged
+    records are written from the table with export_csv, or export_parquet for a typed
+    columnar copy whose list fields are native Arrow lists.
+    """
+
+    def __init__(self, db_path, table, model, merge_key):
+        self.db_path = db_path
+        self.table = table
+        self.model = model
+        self.merge_key = merge_key
+        # Extracted blocks carry an "error" flag next to the schema fields
+        self.columns = list(model.model_fields) + ["error"]
+        self.schema = record_schema(model)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        column_sql = ", ".join(f'"{column}" TEXT' for column in self.columns if column != merge_key)
+        with self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ("{merge_key}" TEXT NOT NULL, {column_sql})'
+            )
+            self.connection.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "{table}_{merge_key}_idx" ON "{table}" ("{merge_key}")'
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def _row_to_record(self, row):
+        record = {self.merge_key: row[0]}
+        for column, value in zip(self._value_columns(), row[1:]):
+            if value is not None:
+                record[column] = json.loads(value)
+        return record
+
+    def _value_columns(self):
+        return [column for column in self.columns if column != self.merge_key]
+
+    def _select_sql(self):
+        return ", ".join(f'"{column}"' for column in [self.merge_key] + self._value_columns())
+
+    def get(self, key):
+        row = self.connection.execute(
+            f'SELECT {self._select_sql()} FROM "{self.table}" WHERE "{self.merge_key}" = ?', (key,)
+        ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def _get_many(self, keys):
+        found = {}
+        for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+            chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f'SELECT {self._select_sql()} FROM "{self.table}" WHERE "{self.merge_key}" IN ({placeholders})', chunk
+            )
+            for row in rows:
+                found[row[0]] = self._row_to_record(row)
+        return found
+
+    def upsert_many(self, records):
+        """
+        Merge a batch of records into the table in a single transaction. Records without
+        a merge key are skipped, as in merge_csv_records_by_name.
+
+        Returns:
+            The number of distinct keys written.
+        """
+        batch = {}
+        for record in records:
+            key = normalize_value(record.get(self.merge_key))
+            if not key or isinstance(key, list):
+                continue
+            batch.setdefault(key, []).append(record)
+        if not batch:
+            return 0
+
+        existing = self._get_many(list(batch))
+        rows = []
+        for key, records_for_key in batch.items():
+            # The stored record comes first, as the earlier CSV rows did
+            accumulators = accumulate_record({}, existing[key], self.merge_key) if key in existing else {}
+            for record in records_for_key:
+                accumulate_record(accumulators, record, self.merge_key)
+            merged = finish_record(key, accumulators, self.merge_key)
+            rows.append([key] + [
+                json.dumps(merged[column], ensure_ascii=False) if column in merged else None
+                for column in self._value_columns()
+            ])
+
+        value_columns = self._value_columns()
+        column_sql = ", ".join(f'"{column}"' for column in [self.merge_key] + value_columns)
+        update_sql = ", ".join(f'"{column}" = excluded."{column}"' for column in value_columns)
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT INTO "{self.table}" ({column_sql}) VALUES ({", ".join("?" * len(rows[0]))}) '
+                f'ON CONFLICT ("{self.merge_key}") DO UPDATE SET {update_sql}',
+                rows,
+            )
+        return len(rows)
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute(f'DELETE FROM "{self.table}"')
+
+    def replace_all(self, records):
+        """Rebuild the table from scratch, e.g. from the records stored in a crawl manifest."""
+        with self.connection:
+            self.connection.execute(f'DELETE FROM "{self.table}"')
+        return self.upsert_many(records)
+
+    def replace_keys(self, keys, records):
+        """
+        Rebuild only the rows of the given merge keys from records, e.g. the keys the seeds of
+        an incremental crawl touched. Rows of other keys are left as they are, and records of
+        other keys are skipped.
+
+        Returns:
+            The number of distinct keys written.
+        """
+        keys = [key for key in {normalize_value(key) for key in keys} if key and not isinstance(key, list)]
+        if not keys:
+            return 0
+        with self.connection:
+            for start in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[start:start + SQLITE_MAX_VARIABLES]
+                self.connection.execute(
+                    f'DELETE FROM "{self.table}" WHERE "{self.merge_key}" IN ({", ".join("?" * len(chunk))})', chunk
+                )
+        keys = set(keys)
+        return self.upsert_many(record for record in records if normalize_value(record.get(self.merge_key)) in keys)
+
+    def records(self):
+        """All merged records in the order their keys were first written."""
+        rows = self.connection.execute(f'SELECT {self._select_sql()} FROM "{self.table}" ORDER BY rowid')
+        return [self._row_to_record(row) for row in rows]
+
+    def record_batches(self, batch_size=ROW_GROUP_SIZE):
+        """The merged records in write order, batch_size at a time."""
+        cursor = self.connection.execute(f'SELECT {self._select_sql()} FROM "{self.table}" ORDER BY rowid')
+        while rows := cursor.fetchmany(batch_size):
+            yield [self._row_to_record(row) for row in rows]
+
+    def __len__(self):
+        return self.connection.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+    def export_csv(self, output_csv_path):
+        """Write the merged records as a CSV view of the table."""
+        with open(output_csv_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=self.columns)
+            writer.writeheader()
+            writer.writerows(self.records())
+
+    def export_parquet(self, output_parquet_path):
+        """Write the merged records as a Parquet file typed by the model's schema, one row group per batch."""
+        export = ParquetExport(output_parquet_path, self.schema)
+        for batch in self.record_batches():
+            export.write(batch)
+        export.close()
+        return export.rows
+
+    def export(self, output_path):
+        """export_parquet for a .parquet path, export_csv otherwise."""
+        if is_parquet(output_path):
+            self.export_parquet(output_path)
+        else:
+            self.export_csv(output_path)
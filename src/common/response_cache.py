@@ -0,0 +1,149 @@
+import fnmatch
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from src.common.disk_cache import DiskCache
+from src.common.lexical_index import file_fingerprint
+from src.common.warm_files import directory_signature
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_BYTES = 50 * 1024 * 1024  # 50 MB
+DEFAULT_ANSWER_MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # 7 days, answers also expire when the data file changes
+WORD = re.compile(r"\w+")
+
+
+def normalize_query(query):
+    """
+    Case, punctuation and whitespace insensitive form of a query, so "What grants can I
+    apply for?" and "what grants can i apply for" share a cache entry. Every word is kept:
+    stopwords such as "from" or "with" change what is asked.
+    """
+    query = unicodedata.normalize("NFKC", str(query)).lower()
+    words = WORD.findall(query)
+    return " ".join(words) if words else " ".join(query.split())
+
+
+class DatasetVersions:
+    """
+    sha256 of data files, only re-read when a file's size or mtime changes. A directory's
+    version covers the dataset files directly inside it, those matching pattern, so the
+    crawl state and reports written next to them do not invalidate answers.
+    """
+
+    def __init__(self, pattern="*.txt"):
+        self.pattern = pattern
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, path):
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name, _, _ in directory_signature(path)
+                     if fnmatch.fnmatch(name, self.pattern)]
+            return hashlib.sha256("".join(f"{file}\0{self.version(file)}" for file in files).encode()).hexdigest()
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._versions.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        version = file_fingerprint(path)
+        with self._lock:
+            self._versions[path] = (signature, version)
+        return version
+
+
+dataset_versions = DatasetVersions()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of model answers: an in-process LRU in front of an on-disk store.
+
+    Keys cover the normalised query, the model, the temperature, a hash of the system
+    prompt and a content hash of the data file the answer was grounded on, so editing the
+    prompt or re-exporting the data makes old answers unreachable. Unreachable entries
+    fall out of the memory LRU and expire or get evicted from disk.
+    """
+
+    def __init__(self, cache_dir, memory_entries=DEFAULT_MEMORY_ENTRIES, max_bytes=DEFAULT_DISK_BYTES,
+                 max_age_seconds=DEFAULT_ANSWER_MAX_AGE_SECONDS):
+        self.memory_entries = memory_entries
+        self.disk = DiskCache(cache_dir, max_bytes=max_bytes, max_age_seconds=max_age_seconds)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query, model, temperature, system_prompt, data_file_path, *extra):
+        """
+        Cache key for an answer.
+
+        Args:
+            query (str): The user's request, normalised before hashing
+            model (str): litellm model name
+            temperature (float): Sampling temperature
+            system_prompt (str): System prompt sent with the request
+            data_file_path (str): Data file pasted into the prompt
+            *extra: Anything else that changes the prompt, e.g. the retrieval top_k
+        """
+        digest = hashlib.sha256()
+        parts = (normalize_query(query), model, repr(float(temperature)),
+                 hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+                 dataset_versions.version(data_file_path), *map(repr, extra))
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        # The disk tier keeps its own hit and miss counters
+        answer = self.disk.get(key)
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, answer)
+        return answer
+
+    def put(self, key, answer):
+        if not answer:
+            return
+        self._remember(key, answer)
+        self.disk.put(key, answer)
+
+    def _remember(self, key, answer):
+        with self._lock:
+            self._memory[key] = answer
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_evictions": self.disk.evictions,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"⚡ Response cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+              f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
@@ -0,0 +1,170 @@
+from crawl4ai import AsyncWebCrawler
+
+from src.common.batch_extraction import extract_results
+from src.common.best_first_crawl import LinkScorer
+from src.common.concurrent_crawl import crawl_seeds, print_seed_timings
+from src.common.crawl_checkpoint import CrawlCheckpoint
+from src.common.crawl_frontier import CrawlFrontier
+from src.common.crawl_scheduler import CrawlScheduler, PoliteCrawler
+from src.common.page_readiness import PageReadiness
+from src.common.tiered_fetch import TieredCrawler
+
+
+class RecordSink:
+    """
+    Where crawl_seed_records puts a seed's pages for the tools that extract records: the
+    records are merged into a RecordStore, keyed on its merge key.
+
+    Args:
+        record_store (RecordStore): Store the extracted records are merged into
+        link_field (str): Record field holding the URL of the page a record came from
+        extraction_cache (ExtractionCache): The tool's extraction cache, only used for its stats
+        batch_extractor (BatchExtractor): Extracts each seed's pages together, None keeps the crawler's own extraction
+        markdown_pruner (MarkdownPruner): Trims the markdown batch extraction sends, None sends it whole
+    """
+
+    def __init__(self, record_store, link_field, extraction_cache, batch_extractor=None, markdown_pruner=None):
+        self.record_store = record_store
+        self.link_field = link_field
+        self.extraction_cache = extraction_cache
+        self.batch_extractor = batch_extractor
+        self.markdown_pruner = markdown_pruner
+
+    def known_urls(self):
+        """URLs of the pages that held records in earlier crawls."""
+        return (record.get(self.link_field) for record in self.record_store.records())
+
+    async def extract(self, results):
+        """Records of each crawl result, in the order of results."""
+        return await extract_results(results, self.batch_extractor, self.markdown_pruner)
+
+    def add(self, seed, pages):
+        """Merge a seed's {page_url: {"records": [...]}} pages, for crawls without a manifest."""
+        self.record_store.upsert_many([record for page in pages.values() for record in page["records"]])
+
+    def rebuild(self, manifest, urls, changed_seeds, previous_records):
+        """
+        Rebuild the rows whose keys a changed seed held, before or after the crawl, from the
+        manifest. Without previous records every row is rebuilt.
+        """
+        if not previous_records:
+            self.record_store.replace_all(manifest.records(urls))
+            return
+        keys = {record.get(self.record_store.merge_key) for seed in changed_seeds
+                for record in previous_records.get(seed, []) + manifest.seed_records(seed)}
+        print(f"🔁 Updating {self.record_store.replace_keys(keys, manifest.records(urls))} records of "
+              f"{len(changed_seeds)} changed seeds")
+
+    def print_stats(self):
+        self.extraction_cache.print_stats()
+        if self.batch_extractor is not None:
+            self.batch_extractor.print_stats()
+        if self.markdown_pruner is not None:
+            self.markdown_pruner.print_stats()
+
+
+async def crawl_seed_records(urls, settings, seed_config, sink, manifest=None, max_concurrency=None,
+                             per_domain_concurrency=None):
+    """
+    Crawl the seed URLs concurrently and hand each seed's records to the sink as the seed finishes.
+
+    The sink turns crawl results into per page records and stores them (see RecordSink):
+        known_urls(), await extract(results), add(seed, pages),
+        rebuild(manifest, urls, changed_seeds, previous_records), print_stats()
+
+    When a CrawlManifest is given the crawl is incremental: seeds whose pages are all
+    unchanged on the server are skipped. Once the crawl finishes the sink rebuilds what the
+    re-crawled, resumed and dropped seeds held from the manifest; with a RecordSink those
+    rows move to the end of the store's order. An empty manifest cannot tell which rows are
+    stale, so the first incremental run rebuilds everything. A run that dies midway resumes
+    from its checkpoint journal the next time it is started over the same seeds.
+
+    Args:
+        urls (list[str]): Seed URLs to crawl
+        settings (CrawlSettings): The tool's crawl settings and state file paths
+        seed_config (callable): seed_config(frontier, link_scorer) returns the CrawlerRunConfig of one seed
+        sink (RecordSink): Extracts and stores the records of each seed's pages
+        manifest (CrawlManifest): Makes the crawl incremental, None crawls every seed
+        max_concurrency (int): Seeds crawled at the same time, default settings.crawl_concurrency, 1 crawls them one at a time
+        per_domain_concurrency (int): Seeds per host crawled at the same time, default settings.per_domain_concurrency
+
+    Returns:
+        A list of (url, seconds) tuples with the wall time spent crawling each seed.
+    """
+    seed_timings = []
+    # What every seed held before this crawl, to find the rows its re-crawl or removal touches
+    previous_records = {seed: manifest.seed_records(seed) for seed in manifest.seeds} if manifest is not None else {}
+    # Seeds an interrupted run over the same seed list already finished are restored, not crawled
+    checkpoint = CrawlCheckpoint(settings.crawl_checkpoint, urls)
+    resumed = checkpoint.completed_seeds()
+    for seed, pages in resumed.items():
+        if manifest is not None:
+            manifest.restore_seed(seed, pages)
+        else:
+            sink.add(seed, pages)
+    urls_to_crawl = [url for url in urls if url not in resumed]
+    if manifest is not None:
+        manifest.retain_seeds(urls)
+        unchanged = await manifest.unchanged_seeds(urls_to_crawl)
+        urls_to_crawl = [url for url in urls_to_crawl if url not in unchanged]
+        print(f"⏭️ Skipping {len(unchanged)} unchanged seeds, recrawling {len(urls_to_crawl)}")
+
+    frontier = CrawlFrontier()
+    frontier.mark_seen(checkpoint.claimed_pages())
+    if manifest is not None:
+        frontier.mark_seen(page for seed in unchanged for page, _ in manifest.seed_pages(seed))
+    urls_to_crawl = frontier.claim_seeds(urls_to_crawl)
+    # Pages that held records in earlier crawls teach the scorer what a relevant path looks like
+    link_scorer = LinkScorer(settings.link_keywords, known_urls=sink.known_urls())
+
+    changed_pages = 0
+    page_readiness = PageReadiness(settings.readiness_profiles, settings.readiness_quiet_ms,
+                                   max_timeout_ms=settings.readiness_max_wait_ms) if settings.adaptive_readiness else None
+    scheduler = CrawlScheduler(settings.host_requests_per_second, max_host_concurrency=settings.host_max_concurrency,
+                               retries=settings.fetch_retries)
+    tiered_crawler = TieredCrawler(settings.fetch_tiers, settings.http_min_words) if settings.http_fast_path else None
+    async with tiered_crawler or AsyncWebCrawler() as browser:
+        # Every page fetch, including the deep crawl's, goes through the scheduler
+        crawler = PoliteCrawler(browser, scheduler, page_readiness)
+        async for url, results, elapsed in crawl_seeds(
+                crawler, urls_to_crawl, lambda: seed_config(frontier, link_scorer),
+                max_concurrency or settings.crawl_concurrency,
+                per_domain_concurrency or settings.per_domain_concurrency):
+            scheduler.record_seed(url, results)
+            # Keep the previous records of a seed whose crawl failed outright
+            if manifest is not None and any(result.success for result in results):
+                manifest.begin_seed(url)
+            overall_combined_json = []
+            seed_pages = {}
+            for result, page_json in zip(results, await sink.extract(results)):
+                overall_combined_json = overall_combined_json + page_json
+                if manifest is not None and result.success:
+                    markdown = result.markdown.raw_markdown if result.markdown else ""
+                    changed_pages += manifest.record_page(url, result.url, result.response_headers, markdown, page_json)
+                if result.success:
+                    seed_pages[result.url] = manifest.pages[result.url] if manifest is not None else {"records": page_json}
+
+            if manifest is None:
+                sink.add(url, seed_pages)
+            checkpoint.record_seed(url, seed_pages, success=any(result.success for result in results),
+                                   claimed=[result.url for result in results])
+            print(f"✅ Crawled {url} in {elapsed:.1f}s ({len(overall_combined_json)} records)")
+            seed_timings.append((url, elapsed))
+
+    if manifest is not None:
+        manifest.save()
+        print(f"📝 {changed_pages} pages changed since the last crawl")
+        changed_seeds = (set(previous_records) - set(urls)) | set(resumed) | set(urls_to_crawl)
+        sink.rebuild(manifest, urls, changed_seeds, previous_records)
+    checkpoint.finish()
+
+    print_seed_timings(seed_timings)
+    scheduler.write_report(settings.crawl_report)
+    if page_readiness is not None:
+        page_readiness.save()
+        page_readiness.print_stats()
+    if tiered_crawler is not None:
+        tiered_crawler.print_stats()
+    frontier.print_stats()
+    sink.print_stats()
+    return seed_timings
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from crawl4ai import AsyncWebCrawler
+from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+
+from src.common.lexical_index import TOKEN_PATTERN
+
+DEFAULT_MIN_WORDS = 150  # Words of content below which an HTTP page is assumed to be rendered by JavaScript
+PIN_AFTER_ESCALATIONS = 2  # Pages of a domain that needed the browser before the domain skips HTTP altogether
+# Markers of client-side rendered pages: an empty app root, Angular's version stamp or a JavaScript-required notice
+SPA_MARKERS = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__nuxt|___gatsby)[\"'][^>]*>\s*</div>|<app-root[^>]*>\s*</app-root>|"
+    r"\bng-version=|enable javascript to|requires javascript|javascript is (?:required|disabled)",
+    re.IGNORECASE)
+HTTP_STATUS = re.compile(r"\bHTTP (\d{3})\b")
+# Failures the browser would get too, left to the scheduler to retry or report
+FINAL_STATUS_CODES = {404, 408, 410, 425, 429, 500, 502, 503, 504}
+
+
+def needs_browser(result, min_words=DEFAULT_MIN_WORDS):
+    """Why a page fetched over plain HTTP has to be rendered in the browser, or None if it can be used as is."""
+    if not result.success:
+        return f"HTTP fetch failed ({(result.error_message or '').strip().splitlines()[0][:80]})"
+    words = len(TOKEN_PATTERN.findall(result.markdown.raw_markdown if result.markdown else ""))
+    if words < min_words:
+        return f"only {words} words of content"
+    if SPA_MARKERS.search(result.html or "") and words < 3 * min_words:
+        return "single-page app markers"
+    return None
+
+
+class TieredCrawler:
+    """
+    Fetches pages with a plain HTTP client first and renders them in the browser only when needed.
+
+    Pages come from crawl4ai's pooled aiohttp strategy and go through the same markdown and
+    link pipeline as browser pages. A page escalates to the headless browser when the HTTP
+    fetch fails, or when it has fewer than min_words words of content (an empty app root,
+    a "please enable JavaScript" notice). HTTP errors the browser would get too, such as
+    404 or 503, are returned as they are for the scheduler to retry or report.
+
+    Which tier worked is remembered per domain. Once a domain's pages needed the browser
+    PIN_AFTER_ESCALATIONS more times than they worked over HTTP, the domain goes straight
+    to the browser, in later runs too. The browser is only launched on the first escalation.
+
+    Layout on disk:
+        {domain: {"http": pages served over HTTP, "browser": pages that needed the browser}}
+    """
+
+    def __init__(self, path=None, min_words=DEFAULT_MIN_WORDS):
+        self.path = path
+        self.min_words = min_words
+        self.domains = defaultdict(lambda: {"http": 0, "browser": 0})
+        if path and os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.domains.update(json.load(f))
+        self.http_crawler = AsyncWebCrawler(crawler_strategy=AsyncHTTPCrawlerStrategy())
+        self.browser = None
+        self._browser_lock = asyncio.Lock()
+        self.pages = Counter()
+
+    async def __aenter__(self):
+        await self.http_crawler.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http_crawler.close()
+        if self.browser is not None:
+            await self.browser.close()
+        self.save()
+
+    async def _browser(self):
+        async with self._browser_lock:
+            if self.browser is None:
+                self.browser = AsyncWebCrawler()
+                await self.browser.start()
+        return self.browser
+
+    def pinned_to_browser(self, domain):
+        counts = self.domains[domain] if domain in self.domains else {"http": 0, "browser": 0}
+        return counts["browser"] - counts["http"] >= PIN_AFTER_ESCALATIONS
+
+    async def _fetch_http(self, url, config, **kwargs):
+        # Extraction runs once the tier is settled, so an escalated page is not sent to the LLM twice
+        extraction_strategy = config.extraction_strategy if config is not None else None
+        http_config = config.clone(extraction_strategy=None) if extraction_strategy is not None else config
+        result = (await self.http_crawler.arun(url, config=http_config, **kwargs))[0]
+        if not result.success and result.status_code is None:
+            status = HTTP_STATUS.search(result.error_message or "")
+            result.status_code = int(status.group(1)) if status else None
+        if result.success and extraction_strategy is not None:
+            # LLMExtractionStrategy.run is synchronous, keep it off the event loop
+            records = await asyncio.to_thread(extraction_strategy.run, result.url, [result.markdown.raw_markdown])
+            result.extracted_content = json.dumps(records)
+        return result
+
+    async def arun(self, url, config=None, **kwargs):
+        domain = urlsplit(url).netloc
+        if not self.pinned_to_browser(domain):
+            result = await self._fetch_http(url, config, **kwargs)
+            if result.status_code in FINAL_STATUS_CODES:
+                return [result]
+            reason = needs_browser(result, self.min_words)
+            if reason is None:
+                self.domains[domain]["http"] += 1
+                self.pages["http"] += 1
+                return [result]
+            print(f"🌐 Rendering {url} in the browser: {reason}")
+            if result.success:
+                # Only content problems count towards pinning, not network errors
+                self.domains[domain]["browser"] += 1
+
+        result = (await (await self._browser()).arun(url, config=config, **kwargs))[0]
+        self.pages["browser"] += 1
+        return [result]
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.domains, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def print_stats(self):
+        pinned = sum(1 for domain in self.domains if self.pinned_to_browser(domain))
+        print(f"⚡ Tiered fetch: {self.pages['http']} pages over plain HTTP, {self.pages['browser']} in the browser, "
+              f"{pinned} of {len(self.domains)} domains need the browser")
+
+    def __getattr__(self, name):
+        return getattr(self.http_crawler, name)
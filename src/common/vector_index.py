@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+
+from src.common.lexical_index import tokenize
+
+HEADER_BYTES = 128  # Fixed .npy header size, leaves room for the row count to grow in place
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+_sync_lock = threading.Lock()  # Index files are updated in place, one writer per process
+
+
+class HashingEmbedder:
+    """
+    Deterministic, offline embedder using signed feature hashing of word unigrams and
+    bigrams. Good enough for lexical-semantic overlap and for tests without Azure.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _bucket(self, feature):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                bucket, sign = self._bucket(feature)
+                vectors[row, bucket] += sign
+        return normalize(vectors)
+
+
+class LiteLLMEmbedder:
+    """
+    Embeds through litellm, e.g. an Azure OpenAI embedding deployment. Unless dim is given
+    it is None until the first response, which sets it to the returned vector size.
+    """
+
+    def __init__(self, model="azure/text-embedding-3-small", batch_size=64, dim=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.dim = dim
+        self.name = model
+
+    def embed(self, texts):
+        from litellm import embedding
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = embedding(model=self.model, input=list(texts[start:start + self.batch_size]))
+            vectors.extend(item["embedding"] for item in response.data)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None and vectors.size:
+            self.dim = vectors.shape[1]
+        return normalize(vectors)
+
+
+def get_embedder(model=None):
+    """LiteLLMEmbedder for the given model, or the offline HashingEmbedder when model is None."""
+    return LiteLLMEmbedder(model) if model else HashingEmbedder()
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class VectorIndex:
+    """
+    Persistent cosine-similarity index of unit-length row embeddings.
+
+    Stored as three files sharing a prefix:
+        <prefix>.npy        float32 (rows, dim) matrix, opened memory-mapped
+        <prefix>.ids        one JSON [id, text sha1] line per row
+        <prefix>.meta.json  embedder name, dimension and the mtime of the last synced source
+
+    New ids are appended to the end of the .npy file and existing ids are overwritten
+    in place, so refreshing the index after an export only embeds the rows that changed.
+    """
+
+    def __init__(self, prefix, embedder):
+        self.prefix = prefix
+        self.embedder = embedder
+        self.ids = []
+        self.hashes = []
+        self.positions = {}
+        self.vectors = np.zeros((0, embedder.dim or 0), dtype=np.float32)
+        self.meta = self._read_meta()
+        if self._compatible():
+            self._load()
+        else:
+            self.meta = {}
+
+    @property
+    def npy_path(self):
+        return f"{self.prefix}.npy"
+
+    @property
+    def ids_path(self):
+        return f"{self.prefix}.ids"
+
+    @property
+    def meta_path(self):
+        return f"{self.prefix}.meta.json"
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self):
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+
+    def _compatible(self):
+        # An embedder that has not answered yet does not know its dimension, the stored one is used
+        dim = self.embedder.dim if self.embedder.dim is not None else self.meta.get("dim")
+        return (self.meta.get("embedder") == self.embedder.name and self.meta.get("dim") == dim
+                and os.path.isfile(self.npy_path) and os.path.isfile(self.ids_path))
+
+    def _load(self):
+        with open(self.ids_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row_id, row_hash = json.loads(line)
+                except ValueError:
+                    break  # Torn final line from an interrupted append
+                self.ids.append(row_id)
+                self.hashes.append(row_hash)
+        vectors = np.load(self.npy_path, mmap_mode="r")
+        # A crash between writing vectors and ids leaves extra rows, ignore them
+        rows = min(len(self.ids), vectors.shape[0])
+        del self.ids[rows:], self.hashes[rows:]
+        self.positions = {row_id: position for position, row_id in enumerate(self.ids)}
+        self.vectors = vectors[:rows]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _write_header(self, f, rows, dim):
+        header = repr({"descr": "<f4", "fortran_order": False, "shape": (rows, dim)})
+        header = header.ljust(HEADER_BYTES - len(NPY_MAGIC) - 2 - 1) + "\n"
+        f.seek(0)
+        f.write(NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1"))
+
+    def _rewrite_ids(self):
+        tmp_path = f"{self.ids_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps([row_id, row_hash]) + "\n" for row_id, row_hash in zip(self.ids, self.hashes))
+        os.replace(tmp_path, self.ids_path)
+
+    def add(self, ids, texts):
+        """Embed and store rows, replacing the vectors of ids that are already indexed."""
+        if not ids:
+            return
+        # Embedded first: the vectors give the dimension of an embedder that only learns it from a response
+        vectors = self.embedder.embed(texts).astype("<f4")
+        hashes = [text_hash(text) for text in texts]
+        dim = vectors.shape[1]
+
+        if not self._compatible():
+            with open(self.npy_path, "wb") as f:
+                self._write_header(f, 0, dim)
+            open(self.ids_path, "w", encoding="utf-8").close()
+            self.meta = {"embedder": self.embedder.name, "dim": dim}
+            self._write_meta()
+            self.ids, self.hashes, self.positions = [], [], {}
+
+        self.vectors = None  # Release the memory map before writing to the file
+        row_bytes = dim * 4
+        new_ids, new_hashes, replaced = [], [], False
+        with open(self.npy_path, "r+b") as f:
+            for row_id, row_hash, vector in zip(ids, hashes, vectors):
+                if row_id in self.positions:
+                    f.seek(HEADER_BYTES + self.positions[row_id] * row_bytes)
+                    f.write(vector.tobytes())
+                    self.hashes[self.positions[row_id]] = row_hash
+                    replaced = True
+                else:
+                    f.seek(HEADER_BYTES + len(self.ids) * row_bytes)
+                    f.write(vector.tobytes())
+                    self.positions[row_id] = len(self.ids)
+                    self.ids.append(row_id)
+                    self.hashes.append(row_hash)
+                    new_ids.append(row_id)
+                    new_hashes.append(row_hash)
+            self._write_header(f, len(self.ids), dim)
+
+        if replaced:
+            self._rewrite_ids()
+        else:
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps([row_id, row_hash]) + "\n" for row_id, row_hash in zip(new_ids, new_hashes))
+        self.vectors = np.load(self.npy_path, mmap_mode="r")
+
+    def sync(self, ids, texts, source_mtime=None):
+        """Embed only the rows that are new or whose text changed since they were indexed."""
+        stale = [
+            (row_id, text) for row_id, text in zip(ids, texts)
+            if row_id not in self.positions or self.hashes[self.positions[row_id]] != text_hash(text)
+        ]
+        if stale:
+            self.add([row_id for row_id, _ in stale], [text for _, text in stale])
+        if source_mtime is not None and self._compatible():
+            self.meta["source_mtime"] = source_mtime
+            self._write_meta()
+        return len(stale)
+
+    def is_synced_with(self, source_mtime):
+        return self._compatible() and self.meta.get("source_mtime") == source_mtime
+
+    def search(self, query, top_k=10, allowed_ids=None):
+        """
+        Returns:
+            Up to top_k (id, cosine similarity) tuples, best first. When allowed_ids is
+            given only those ids are considered, e.g. the rows still present in the CSV.
+        """
+        if not len(self):
+            return []
+        scores = np.asarray(self.vectors @ self.embedder.embed([query])[0])
+        if allowed_ids is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[[self.positions[row_id] for row_id in allowed_ids if row_id in self.positions]] = True
+            scores = np.where(mask, scores, -np.inf)
+        top_k = min(top_k, int(np.isfinite(scores).sum()))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.ids[position], float(scores[position])) for position in best]
+
+
+def row_texts(df, fields):
+    columns = [field for field in fields if field in df.columns] or list(df.columns)
+    return df[columns].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+
+
+def sync_csv_index(df, csv_path, key_field, fields, embedder):
+    """
+    Bring the vector index stored next to a CSV (<csv_path>.vectors.*) up to date with
+    its rows, keyed on key_field, and return it.
+    """
+    with _sync_lock:
+        index = VectorIndex(f"{csv_path}.vectors", embedder)
+        source_mtime = os.path.getmtime(csv_path)
+        if index.is_synced_with(source_mtime):
+            return index
+        rows = df[df[key_field].notna()]
+        added = index.sync(rows[key_field].astype(str).tolist(), row_texts(rows, fields), source_mtime)
+    if added:
+        print(f"🧭 Embedded {added} new or changed rows into {index.npy_path}")
+    return index
+
+
+def semantic_candidates(prompt, index, df, key_field, top_k, rows=None):
+    """
+    Rows of df whose key_field is among the top_k most similar to the prompt, best first.
+    index is df's vector index, as returned by sync_csv_index and kept warm by the caller.
+    rows restricts the search to a subset of df, e.g. the rows left after hard filters.
+    """
+    rows = df if rows is None else rows
+    keys = rows[key_field].astype(str)
+    hits = index.search(prompt, top_k, allowed_ids=set(keys))
+    order = {row_id: rank for rank, (row_id, _) in enumerate(hits)}
+    matched = rows[keys.isin(order)]
+    return matched.iloc[keys[matched.index].map(order).argsort()]
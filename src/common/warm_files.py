@@ -0,0 +1,74 @@
+import os
+import threading
+
+
+def directory_signature(path):
+    """(name, mtime, size) of every file directly inside a directory, subdirectories are ignored."""
+    with os.scandir(path) as it:
+        return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                            for entry in it if entry.is_file()))
+
+
+class WarmFiles:
+    """
+    Parsed data files kept in memory between requests.
+
+    get(path, loader) returns loader(path) and only calls the loader again once the
+    file's mtime or size changes, or for a directory once any file directly inside it
+    changes, so a scraper re-export is picked up on the next request without restarting
+    the process. refresh() reloads every changed file up front, which a long-running
+    service can call periodically.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.loads = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        if os.path.isdir(path):
+            return directory_signature(path)
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, loader):
+        key = (os.path.abspath(path), loader)
+        signature = self._signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self.loads += 1
+        return value
+
+    def refresh(self):
+        """Reload entries whose file changed on disk and drop entries whose file is gone. Returns the reloaded paths."""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        reloaded = []
+        for (path, loader), (signature, _) in entries:
+            try:
+                if self._signature(path) == signature:
+                    continue
+            except FileNotFoundError:
+                with self._lock:
+                    self._entries.pop((path, loader), None)
+                continue
+            self.get(path, loader)
+            if path not in reloaded:
+                reloaded.append(path)
+        return reloaded
+
+    def stats(self):
+        return {"hits": self.hits, "loads": self.loads, "files": len({path for path, _ in self._entries})}
+
+
+warm_files = WarmFiles()
@@ -1,5 +1,46 @@
+from src.common.crawl_defaults import CrawlSettings
+
 OUTPUT_FILENAME = "src/events_listing_tool/scraper_output/events.csv"
-POST_OUTPUT_FILENAME = "src/events_listing_tool/scraper_output/events_post_processed.csv"
+# Typed columnar copy of the merged events (list fields as native lists), read by the recommender
+POST_OUTPUT_FILENAME = "src/events_listing_tool/scraper_output/events_post_processed.parquet"
+POST_OUTPUT_CSV = "src/events_listing_tool/scraper_output/events_post_processed.csv"  # Spreadsheet view of the same events
+EXTRACTION_CACHE_DIR = "src/events_listing_tool/scraper_output/.extraction_cache/"
+CRAWL_MANIFEST = "src/events_listing_tool/scraper_output/crawl_manifest.json"
+CRAWL_REPORT = "src/events_listing_tool/scraper_output/crawl_report.json"
+CRAWL_CHECKPOINT = "src/events_listing_tool/scraper_output/crawl_checkpoint.jsonl"
+READINESS_PROFILES = "src/events_listing_tool/scraper_output/readiness_profiles.json"
+FETCH_TIERS = "src/events_listing_tool/scraper_output/fetch_tiers.json"
+RESPONSE_CACHE_DIR = "src/events_listing_tool/scraper_output/.response_cache/"
+
+LLM_MODEL = "azure/gpt-4o"
+LLM_TEMPERATURE = 0.2
+LLM_CONCURRENCY = 8  # Streaming recommendations in flight at once per event loop
+RECORD_STORE = "src/events_listing_tool/scraper_output/records.db"
+NEAR_DUPLICATE_AUDIT = "src/events_listing_tool/scraper_output/near_duplicate_merges.csv"
+NEAR_DUPLICATE_THRESHOLD = 0.85  # Name similarity (0-1) at which two records are merged
+
+# This tool's crawl settings, on top of src/common/crawl_defaults.py
+PRUNE_KEYWORDS = ["date", "time", "venue", "location", "address", "register", "registration", "fee", "cost",
+                 "organis", "organiz", "programme", "agenda", "speaker", "market", "industr"]  # Sections mentioning these are kept first
+LINK_KEYWORDS = ["event", "webinar", "seminar", "workshop", "conference", "forum", "summit", "mission", "expo",
+                 "masterclass", "networking", "calendar", "register", "programme"]  # Scored in link paths and anchor texts
+# These sites render slowly, so pages get longer to settle than the shared default
+CRAWL_SETTINGS = CrawlSettings(CRAWL_CHECKPOINT, CRAWL_REPORT, READINESS_PROFILES, FETCH_TIERS, LINK_KEYWORDS,
+                               PRUNE_KEYWORDS, readiness_max_wait_ms=12000)
+
+# Semantic pre-filter applied before the events are pasted into the prompt
+RETRIEVAL_FIELDS = ["event_title", "event_summary", "event_description", "event_type", "capability_area",
+                    "sub_capability_area", "industries", "market_focus"]
+RETRIEVAL_KEY_FIELD = "event_title"
+RETRIEVAL_TOP_K = 20  # Candidate events sent to the model
+FULL_CONTEXT_MAX_ROWS = 30  # Datasets this small are sent whole
+
+# How the candidate events are written into the prompt: "jsonl", "csv", "kv" (field: value blocks)
+# or "table" (DataFrame.to_string, every column padded to a fixed width)
+PROMPT_ENCODING = "csv"  # Fewest tokens on our datasets, see src/benchmarks/prompt_encoding_benchmark.py
+PROMPT_EXCLUDED_FIELDS = ["error", "event_start_date", "event_end_date"]
+PROMPT_FIELD_BUDGETS = {"event_summary": 400, "event_description": 800, "event_address": 200}  # Characters kept per field
+EMBEDDING_MODEL = None  # litellm embedding model e.g. "azure/text-embedding-3-small", None embeds offline
 
 SYSTEM_PROMPT = """
 You are an Event Advisor, an AI expert specializing in recommending the most relevant events organized by the Singapore government to users based on their needs. You have access to a CSV dataset of events, including details such as event titles, dates, times, modes, organisers, summaries, detailed descriptions, venues, addresses, costs, event types, capability areas, industries, market focus, and official event page links.
@@ -0,0 +1,197 @@
+import calendar
+import re
+from datetime import date
+
+import pandas as pd
+
+from src.common.columnar_store import read_table, write_table
+from src.common.facet_index import FacetIndex, IntervalIndex
+
+EVENT_FACETS = ["event_mode", "cost", "event_type", "capability_area", "sub_capability_area", "industries",
+                "market_focus"]
+FACET_WILDCARDS = ["all"]  # e.g. industries ["all"] matches any industry asked for
+# A hybrid event can be attended either way
+EVENT_MODE_ALIASES = {
+    "virtual": ["virtual", "online", "hybrid"],
+    "online": ["virtual", "online", "hybrid"],
+    "physical": ["physical", "in-person", "hybrid"],
+    "in-person": ["physical", "in-person", "hybrid"],
+}
+DATE_FILTERS = ["upcoming", "date_from", "date_to", "include_undated"]
+INDEX_COLUMNS = EVENT_FACETS + ["event_date", "event_start_date", "event_end_date"]  # Read to build the indexes
+
+MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+MONTH = r"(?P<month>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+YEAR = r"(?:,?\s+(?P<year>\d{4}))?"
+# Tried in order, a later pattern never claims text an earlier one matched
+DATE_PATTERNS = [
+    re.compile(r"\b(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})\b"),
+    re.compile(r"\b(?P<day>\d{1,2})[/.](?P<month>\d{1,2})[/.](?P<year>\d{4})\b"),
+    re.compile(rf"\b{DAY}\s*(?:-|–|to|until)\s*(?P<day2>\d{{1,2}})(?:st|nd|rd|th)?\s+{MONTH}{YEAR}\b", re.IGNORECASE),
+    re.compile(rf"\b{DAY}\s+{MONTH}{YEAR}\b", re.IGNORECASE),
+    re.compile(rf"\b{MONTH}\s+{DAY}{YEAR}\b", re.IGNORECASE),
+    re.compile(rf"\b{MONTH}\s+(?P<year>\d{{4}})\b", re.IGNORECASE),
+]
+
+
+def _date_mentions(text):
+    """(position, year or None, month, [days]) for each date written in the text, in order. No days means the whole month."""
+    mentions, taken = [], []
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            if any(match.start() < end and start < match.end() for start, end in taken):
+                continue
+            taken.append(match.span())
+            groups = match.groupdict()
+            month = groups["month"]
+            month = int(month) if month.isdigit() else MONTHS[month.lower()]
+            days = [int(groups[key]) for key in ("day", "day2") if groups.get(key)]
+            year = int(groups["year"]) if groups.get("year") else None
+            mentions.append((match.start(), year, month, days))
+    return sorted(mentions)
+
+
+def parse_date_range(text):
+    """
+    First and last day of an event from its free-text date, e.g. "2025-06-16 to 2025-06-20",
+    "9-10 July 2025", "9 July - 2 August 2025" or "July 2025".
+
+    A date without a year takes the year of the next date that has one, or the year before
+    when it would otherwise fall after that date ("28 Dec - 2 Jan 2026"). A month without
+    a day spans the whole month.
+
+    Returns:
+        tuple[date | None, date | None]: (None, None) when no date could be read
+    """
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return None, None
+    mentions = _date_mentions(str(text))
+    days = []
+    for i, (_, year, month, mention_days) in enumerate(mentions):
+        if year is None:
+            later = next((later for later in mentions[i + 1:] if later[1] is not None), None)
+            if later is None:
+                continue
+            # "28 Dec - 2 Jan 2026": a start later in the year than the end belongs to the year before
+            year = later[1] - 1 if (month, min(mention_days or [1])) > (later[2], min(later[3] or [1])) else later[1]
+        if not 1 <= month <= 12:
+            continue
+        last_day = calendar.monthrange(year, month)[1]
+        for day in mention_days or [1, last_day]:
+            if 1 <= day <= last_day:
+                days.append(date(year, month, day))
+    return (min(days), max(days)) if days else (None, None)
+
+
+def event_date_ranges(df):
+    """(start, end) per row, from the event_start_date/event_end_date columns when post-processing added them."""
+    if "event_start_date" in df and "event_end_date" in df:
+        return [(date.fromisoformat(start) if isinstance(start, str) and start else None,
+                 date.fromisoformat(end) if isinstance(end, str) and end else None)
+                for start, end in zip(df["event_start_date"], df["event_end_date"])]
+    return [parse_date_range(text) for text in df["event_date"]] if "event_date" in df else [(None, None)] * len(df)
+
+
+def add_date_ranges(csv_path):
+    """Post-processing step: add ISO event_start_date and event_end_date columns parsed from event_date (CSV or Parquet)."""
+    df = read_table(csv_path)
+    ranges = [parse_date_range(text) for text in df["event_date"]] if "event_date" in df else [(None, None)] * len(df)
+    df["event_start_date"] = [start.isoformat() if start else "" for start, _ in ranges]
+    df["event_end_date"] = [end.isoformat() if end else "" for _, end in ranges]
+    write_table(df, csv_path)
+    print(f"📅 Read the dates of {sum(1 for start, _ in ranges if start)} of {len(df)} events")
+
+
+def validate_filters(filters):
+    """
+    Check and normalise the hard filters of a request.
+
+    Filters are a dict of facet -> value or list of values (any of them matches), e.g.
+    {"cost": "free", "event_mode": "virtual", "capability_area": ["internationalisation"]},
+    plus the date filters "upcoming" (bool), "date_from" / "date_to" (ISO dates) and
+    "include_undated" (bool, default True: events whose date could not be read are kept).
+
+    Raises:
+        ValueError: On an unknown filter or a date that is not in ISO format,
+            or a facet value that is not a string or a list
+    """
+    unknown = set(filters) - set(EVENT_FACETS) - set(DATE_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filters {', '.join(sorted(unknown))}, "
+                         f"expected any of {', '.join(EVENT_FACETS + DATE_FILTERS)}")
+    normalised = {}
+    for key, value in filters.items():
+        if value is None or value == [] or value == "":
+            continue
+        if key in ("date_from", "date_to"):
+            value = value[0] if isinstance(value, list) else value
+            try:
+                value = date.fromisoformat(str(value)).isoformat()
+            except ValueError:
+                raise ValueError(f"Cannot read {key} {value!r} as a YYYY-MM-DD date")
+        elif key in ("upcoming", "include_undated"):
+            value = value[0] if isinstance(value, list) else value
+            value = str(value).strip().lower() not in ("false", "no", "0") if isinstance(value, str) else bool(value)
+        else:
+            if not isinstance(value, (str, list)):
+                raise ValueError(f"{key} must be a string or a list of strings, not {value!r}")
+            value = sorted({str(item).strip().lower() for item in ([value] if isinstance(value, str) else value)})
+        normalised[key] = value
+    return normalised
+
+
+def parse_filter_text(text):
+    """
+    Filters typed on the command line, e.g. "upcoming cost=free event_mode=virtual
+    capability_area=internationalisation,innovation". A bare word is a true flag.
+    """
+    filters = {}
+    for token in text.split():
+        key, _, value = token.partition("=")
+        filters[key] = value.split(",") if value else True
+    return validate_filters(filters)
+
+
+class EventIndex:
+    """
+    Facet and date indexes over the post-processed events, used to apply hard filters
+    before any event is sent to the model.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.facets = FacetIndex(df, EVENT_FACETS, FACET_WILDCARDS)
+        self.dates = IntervalIndex(event_date_ranges(df))
+
+    def rows(self, filters, today=None):
+        """Positions of the events matching every filter. See validate_filters for the format."""
+        filters = validate_filters(filters)
+        facets = {key: value for key, value in filters.items() if key in EVENT_FACETS}
+        if "event_mode" in facets:
+            facets["event_mode"] = sorted({alias for mode in facets["event_mode"]
+                                           for alias in EVENT_MODE_ALIASES.get(mode, [mode])})
+        rows = self.facets.filter(facets)
+
+        low = date.fromisoformat(filters["date_from"]) if "date_from" in filters else None
+        high = date.fromisoformat(filters["date_to"]) if "date_to" in filters else None
+        if filters.get("upcoming"):
+            today = today or date.today()
+            low = max(low, today) if low else today
+        if low is not None or high is not None:
+            dated = self.dates.overlapping(low, high)
+            if filters.get("include_undated", True):
+                dated |= self.dates.unbounded
+            rows &= dated
+        return rows
+
+    def filter(self, filters, today=None):
+        """The events matching every filter, in file order."""
+        return self.df.iloc[sorted(self.rows(filters, today))]
+
+
+def load_event_index(data_file_path):
+    # Only the facet and date columns are read, rows keep their positions in the full table
+    return EventIndex(read_table(data_file_path, INDEX_COLUMNS))
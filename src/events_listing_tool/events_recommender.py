@@ -1,10 +1,19 @@
+import asyncio
 import os
+from datetime import date
 
 from dotenv import load_dotenv
-from litellm import completion
-import pandas as pd
 
-from src.events_listing_tool.contants import SYSTEM_PROMPT
+from src.common.columnar_store import read_table
+from src.common.llm_stream import ConcurrencyLimiter, complete_text_sync, stream_cached_answer
+from src.common.prompt_table import PromptStats, data_heading, render_rows
+from src.common.response_cache import ResponseCache
+from src.common.vector_index import get_embedder, semantic_candidates, sync_csv_index
+from src.common.warm_files import warm_files
+from src.events_listing_tool.event_facets import load_event_index, validate_filters
+from src.events_listing_tool.contants import EMBEDDING_MODEL, FULL_CONTEXT_MAX_ROWS, LLM_CONCURRENCY, LLM_MODEL, \
+    LLM_TEMPERATURE, PROMPT_ENCODING, PROMPT_EXCLUDED_FIELDS, PROMPT_FIELD_BUDGETS, RESPONSE_CACHE_DIR, \
+    RETRIEVAL_FIELDS, RETRIEVAL_KEY_FIELD, RETRIEVAL_TOP_K, SYSTEM_PROMPT
 
 load_dotenv(dotenv_path=".env") 
 
@@ -12,19 +21,111 @@ os.environ["AZURE_API_KEY"] = os.getenv("AZURE_API_KEY", "")
 os.environ["AZURE_API_BASE"] = os.getenv("AZURE_API_BASE", "")
 os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_API_VERSION", "")
 
-def recommend(prompt, data_file_path):
-    data_string = pd.read_csv(data_file_path).to_string()
-    formatted_prompt = f"User Request:\n{prompt}\n\nCSV Grants Data:\n{data_string}"
-    response = completion(
-        model = "azure/gpt-4o", 
-        messages = [
-            { "content": SYSTEM_PROMPT, "role": "system"},
-            { "content": formatted_prompt,"role": "user"}
-        ],
-        temperature=0.2
-    )
-
-    return response.choices[0].message["content"]
+response_cache = ResponseCache(RESPONSE_CACHE_DIR)
+llm_limiter = ConcurrencyLimiter(LLM_CONCURRENCY)
+prompt_stats = PromptStats(LLM_MODEL)
+embedder = get_embedder(EMBEDDING_MODEL)
+
+NO_MATCHING_EVENTS = "No events match the selected filters."
+
+def refresh_index(data_file_path):
+    """Embed events added or changed since the last export into the vector index next to the CSV."""
+    sync_csv_index(read_table(data_file_path, [RETRIEVAL_KEY_FIELD] + RETRIEVAL_FIELDS), data_file_path, RETRIEVAL_KEY_FIELD, RETRIEVAL_FIELDS,
+                   embedder)
+
+def load_vector_index(data_file_path):
+    return sync_csv_index(warm_files.get(data_file_path, read_table), data_file_path, RETRIEVAL_KEY_FIELD,
+                          RETRIEVAL_FIELDS, embedder)
+
+def render_events(df):
+    return render_rows(df, PROMPT_ENCODING, PROMPT_EXCLUDED_FIELDS, PROMPT_FIELD_BUDGETS)
+
+def render_table(data_file_path):
+    return render_events(warm_files.get(data_file_path, read_table))
+
+def filter_events(data_file_path, filters=None):
+    """The events left after the request's hard filters (dates, mode, cost, taxonomy), see validate_filters."""
+    df = warm_files.get(data_file_path, read_table)
+    if not filters:
+        return df
+    # The facet and date indexes are rebuilt only when the file changes
+    return df.iloc[sorted(warm_files.get(data_file_path, load_event_index).rows(filters))]
+
+def query(data_file_path, filters=None):
+    """Pure structured query, no model call: the events matching the filters as records."""
+    matches = filter_events(data_file_path, filters)
+    return matches.astype(object).where(matches.notna(), None).to_dict(orient="records")
+
+def select_candidates(prompt, df, data_file_path, top_k=RETRIEVAL_TOP_K, rows=None):
+    """
+    Keep only the top_k events most similar to the request, among rows when given. The
+    rows are returned as they are when top_k is None or there are at most
+    FULL_CONTEXT_MAX_ROWS of them.
+    """
+    rows = df if rows is None else rows
+    if top_k is None or len(rows) <= max(FULL_CONTEXT_MAX_ROWS, top_k):
+        return rows
+
+    # The vector index is opened and synced only when the file changes
+    candidates = semantic_candidates(prompt, warm_files.get(data_file_path, load_vector_index), df,
+                                     RETRIEVAL_KEY_FIELD, top_k, rows)
+    return candidates if len(candidates) else rows
+
+def build_messages(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None):
+    # The parsed CSV and its full rendering stay in memory until the file changes
+    df = warm_files.get(data_file_path, read_table)
+    candidates = select_candidates(prompt, df, data_file_path, top_k, filter_events(data_file_path, filters))
+    data_string = warm_files.get(data_file_path, render_table) if candidates is df else render_events(candidates)
+    prompt_stats.record(data_string)
+    formatted_prompt = f"User Request:\n{prompt}\n\n{data_heading('Events', PROMPT_ENCODING)}:\n{data_string}"
+    return [
+        { "content": SYSTEM_PROMPT, "role": "system"},
+        { "content": formatted_prompt,"role": "user"}
+    ]
+
+def answer_cache_key(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None):
+    encoding = (PROMPT_ENCODING, sorted(PROMPT_FIELD_BUDGETS.items()))
+    if filters:
+        filters = validate_filters(filters)
+        # Which events count as upcoming changes every day
+        today = date.today().isoformat() if filters.get("upcoming") else None
+        return response_cache.key(prompt, LLM_MODEL, LLM_TEMPERATURE, SYSTEM_PROMPT, data_file_path, top_k,
+                                  encoding, sorted(filters.items()), today)
+    return response_cache.key(prompt, LLM_MODEL, LLM_TEMPERATURE, SYSTEM_PROMPT, data_file_path, top_k, encoding)
+
+def recommend(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None):
+    """
+    Recommend events for the request. filters are applied before the model is called,
+    e.g. {"upcoming": True, "cost": "free", "event_mode": "virtual",
+    "capability_area": "internationalisation"}, and no model call is made when no event
+    is left.
+    """
+    if filters and not len(filter_events(data_file_path, filters)):
+        return NO_MATCHING_EVENTS
+    cache_key = answer_cache_key(prompt, data_file_path, top_k, filters)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    answer = complete_text_sync(LLM_MODEL, build_messages(prompt, data_file_path, top_k, filters),
+                                temperature=LLM_TEMPERATURE)
+    response_cache.put(cache_key, answer)
+    return answer
+
+async def recommend_stream(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, limiter=llm_limiter, filters=None):
+    """Yield the recommendation as the model streams it, many requests can share one event loop."""
+    # Filtering and the cache key (a hash of the data file) run in a worker thread, off the event loop
+    if filters and not len(await asyncio.to_thread(filter_events, data_file_path, filters)):
+        yield NO_MATCHING_EVENTS
+        return
+    cache_key = await asyncio.to_thread(answer_cache_key, prompt, data_file_path, top_k, filters)
+    async for token in stream_cached_answer(response_cache, cache_key,
+                                            lambda: build_messages(prompt, data_file_path, top_k, filters),
+                                            LLM_MODEL, LLM_TEMPERATURE, limiter):
+        yield token
+
+async def recommend_async(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, limiter=llm_limiter, filters=None):
+    return "".join([token async for token in recommend_stream(prompt, data_file_path, top_k, limiter, filters)])
 
 # Example Usage
 if __name__ == "__main__":
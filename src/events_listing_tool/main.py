@@ -1,17 +1,21 @@
 import os
-import pdb
 
 import pandas as pd
-from litellm import completion
 
-from src.events_listing_tool.contants import OUTPUT_FILENAME, POST_OUTPUT_FILENAME
-from src.events_listing_tool.post_csv_deduplication import merge_csv_records_by_name
-from src.events_listing_tool.web_crawler import crawl_to_json
+from src.common.columnar_store import convert_csv, read_table
+from src.common.crawl_manifest import CrawlManifest
+from src.common.llm_stream import complete_text_sync
+from src.common.near_duplicates import merge_near_duplicates
+from src.common.record_store import record_schema
+from src.events_listing_tool.event_facets import DATE_FILTERS, EVENT_FACETS, add_date_ranges, parse_filter_text
+from src.events_listing_tool.contants import (CRAWL_MANIFEST, NEAR_DUPLICATE_AUDIT, NEAR_DUPLICATE_THRESHOLD,
+                                              OUTPUT_FILENAME, POST_OUTPUT_CSV, POST_OUTPUT_FILENAME)
+from src.events_listing_tool.web_crawler import Event, crawl_to_json, open_record_store
 
 async def main():
-    recrawl_data = input("Do you want to recrawl data? (yes/no): ")
+    recrawl_data = input("Do you want to recrawl data? (yes/no/incremental): ").lower()
 
-    if recrawl_data.lower() == "yes":
+    if recrawl_data in ("yes", "incremental"):
         # urls = input("Enter URLs separated by spaces: ").split()
         urls = [
             # "https://members.sbf.org.sg/event",
@@ -23,29 +27,48 @@ async def main():
             # "https://smecentre-sccci.sg/past-events"
         ]
 
-        # recrawl_depth = int(input("Enter recrawl depth: "))
-        # export_to_excel(await crawl_to_json("https://www.gobusiness.gov.sg/gov-assist/grants/", 0, recrawl_depth))
-        if os.path.isfile(OUTPUT_FILENAME):
-            os.remove(OUTPUT_FILENAME)
-
-        await crawl_to_json(urls)
-        merge_csv_records_by_name(OUTPUT_FILENAME, POST_OUTPUT_FILENAME, 'event_title')
-        # for url in urls:
-        #     export_to_excel(await crawl_to_json(url))
+        manifest = CrawlManifest(CRAWL_MANIFEST)
+        if recrawl_data == "yes":
+            manifest.clear()
+
+        record_store = open_record_store()
+        await crawl_to_json(urls, record_store, manifest=manifest)
+        # Records are merged by name as they are stored, the Parquet file is a typed export of the store
+        record_store.export(POST_OUTPUT_FILENAME)
+        record_store.close()
+        merge_near_duplicates(POST_OUTPUT_FILENAME, merge_key='event_title', threshold=NEAR_DUPLICATE_THRESHOLD,
+                              audit_csv_path=NEAR_DUPLICATE_AUDIT)
+        # Free-text event dates become real date ranges the recommender can filter on
+        add_date_ranges(POST_OUTPUT_FILENAME)
+        from src.events_listing_tool.events_recommender import refresh_index
+        refresh_index(POST_OUTPUT_FILENAME)
+        read_table(POST_OUTPUT_FILENAME).to_csv(POST_OUTPUT_CSV, index=False)
+    elif not os.path.isfile(POST_OUTPUT_FILENAME) and os.path.isfile(POST_OUTPUT_CSV):
+        # Exported before the Parquet copy existed
+        convert_csv(POST_OUTPUT_CSV, POST_OUTPUT_FILENAME, record_schema(Event))
     # post_data_cleaning()
     user_input = input(
         "Enter event recommendation query: ")  #"I am a manufacturing company doing steel works and am looking to leverage on technology to automate my internal processes what grants can i apply for"
+    while True:
+        try:
+            filters = parse_filter_text(input(
+                "Filter events (e.g. upcoming cost=free event_mode=virtual capability_area=internationalisation), "
+                "leave empty for none: "))
+            break
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            print(f"   Valid filters: {', '.join(EVENT_FACETS + DATE_FILTERS)} (date_from and date_to take YYYY-MM-DD dates)")
     csv_file_path = POST_OUTPUT_FILENAME  # Make sure this file exists
     print("\n🔹 Recommending Events...\n")
-    from src.events_listing_tool.events_recommender import recommend
-    recommendations = recommend(user_input, csv_file_path)
+    from src.events_listing_tool.events_recommender import prompt_stats, recommend_stream, response_cache
     print("\n🔹 Recommended Events:\n")
-    print(recommendations)
-
-import os
-import pandas as pd
+    async for token in recommend_stream(user_input, csv_file_path, filters=filters):
+        print(token, end="", flush=True)
+    print()
+    response_cache.print_stats()
+    prompt_stats.print_stats()
 
-def post_data_cleaning(file_path=OUTPUT_FILENAME, output_path=POST_OUTPUT_FILENAME):
+def post_data_cleaning(file_path=OUTPUT_FILENAME, output_path=POST_OUTPUT_CSV):
     # Read CSV file and convert to CSV string
     df = pd.read_csv(file_path)
     data_string = df.to_csv(index=False)
@@ -68,16 +91,16 @@ def post_data_cleaning(file_path=OUTPUT_FILENAME, output_path=POST_OUTPUT_FILENA
 
     formatted_prompt = f"User Request:\n{SYSTEM_PROMPT}\n\nCSV Events Data:\n{data_string}"
 
-    response = completion(
-        model="azure/gpt-4o",
-        messages=[
+    answer = complete_text_sync(
+        "azure/gpt-4o",
+        [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": formatted_prompt}
         ],
         temperature=0.3
     )
 
-    lines = response.choices[0].message["content"].splitlines()
+    lines = answer.splitlines()
     result = "\n".join(lines[1:-1])
 
     # Write the consolidated CSV output to the specified output file
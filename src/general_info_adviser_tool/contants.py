@@ -1,4 +1,23 @@
+from src.common.crawl_defaults import CrawlSettings
+
 OUTPUT_FILEPATH = "src/general_info_adviser_tool/scraper_output/"
+CRAWL_MANIFEST = "src/general_info_adviser_tool/scraper_output/crawl_manifest.json"
+CRAWL_REPORT = "src/general_info_adviser_tool/scraper_output/crawl_report.json"
+CRAWL_CHECKPOINT = "src/general_info_adviser_tool/scraper_output/crawl_checkpoint.jsonl"
+READINESS_PROFILES = "src/general_info_adviser_tool/scraper_output/readiness_profiles.json"
+FETCH_TIERS = "src/general_info_adviser_tool/scraper_output/fetch_tiers.json"
+RESPONSE_CACHE_DIR = "src/general_info_adviser_tool/scraper_output/.response_cache/"
+GUIDE_INDEX_DIR = "src/general_info_adviser_tool/scraper_output/.guide_index/"
+CRAWL_SETTINGS = CrawlSettings(CRAWL_CHECKPOINT, CRAWL_REPORT, READINESS_PROFILES, FETCH_TIERS)
+
+# Guides are split into passages and only the best matching ones are sent to the model
+GUIDE_CHUNK_CHARS = 2000  # Longest passage, sections above this are split on paragraphs
+GUIDE_TOP_K = 12  # Passages sent to the model
+GUIDE_CONTEXT_CHARS = 24000  # Combined passage length sent to the model, roughly 6k tokens
+
+LLM_MODEL = "azure/gpt-4o"
+LLM_TEMPERATURE = 0.2
+LLM_CONCURRENCY = 8  # Streaming recommendations in flight at once per event loop
 
 SYSTEM_PROMPT = """
 You are a business expansion advisor powered by insights from official and credible sources. You are provided with a chunk of text containing information about doing business in a specific country or region. The content may be unstructured and drawn from websites, reports, or other documents.
@@ -20,6 +39,7 @@ When assisting users:
 - Be clear, practical, and region-specific in your responses.
 - If a user asks a question that relates to one of the categories above, focus your answer using the most relevant content.
 - If the relevant information is not found in the text, politely indicate that it is not currently available.
+- The text is a set of passages, each labelled with its country, section and source url. Only use passages for the country the user is asking about.
 - You may use the inferred or provided title to help set context (e.g., "According to insights on Doing Business in Vietnam...").
 
 Example user questions you might receive:
@@ -1,9 +1,14 @@
+import asyncio
 import os
 
 from dotenv import load_dotenv
-from litellm import completion
 
-from src.general_info_adviser_tool.contants import OUTPUT_FILEPATH, SYSTEM_PROMPT
+from src.common.llm_stream import ConcurrencyLimiter, complete_text_sync, stream_cached_answer
+from src.common.response_cache import ResponseCache
+from src.common.warm_files import warm_files
+from src.general_info_adviser_tool.contants import GUIDE_TOP_K, LLM_CONCURRENCY, LLM_MODEL, LLM_TEMPERATURE, \
+    OUTPUT_FILEPATH, RESPONSE_CACHE_DIR, SYSTEM_PROMPT
+from src.general_info_adviser_tool.guide_index import format_passages, load_or_build_guide_index
 
 load_dotenv(dotenv_path=".env")
 
@@ -11,20 +16,46 @@ os.environ["AZURE_API_KEY"] = os.getenv("AZURE_API_KEY", "")
 os.environ["AZURE_API_BASE"] = os.getenv("AZURE_API_BASE", "")
 os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_API_VERSION", "")
 
-def recommend(prompt, data_file_path):
-    with open(data_file_path, "r", encoding="utf-8") as file:
-        text_content = file.read()
+response_cache = ResponseCache(RESPONSE_CACHE_DIR)
+llm_limiter = ConcurrencyLimiter(LLM_CONCURRENCY)
+
+def build_messages(prompt, data_path=OUTPUT_FILEPATH, top_k=GUIDE_TOP_K):
+    """
+    Retrieve the passages that best match the request from one guide, or from every guide
+    when data_path is a directory, instead of pasting whole guides into the prompt.
+    """
+    index = warm_files.get(data_path, load_or_build_guide_index)
+    text_content = format_passages(index.search(prompt, top_k)) or "No matching passages were found."
     formatted_prompt = f"User Request:\n{prompt}\n\n Data:\n{text_content}"
-    response = completion(
-        model="azure/gpt-4o",
-        messages=[
-            {"content": SYSTEM_PROMPT, "role": "system"},
-            {"content": formatted_prompt, "role": "user"}
-        ],
-        temperature=0.2
-    )
-
-    return response.choices[0].message["content"]
+    return [
+        {"content": SYSTEM_PROMPT, "role": "system"},
+        {"content": formatted_prompt, "role": "user"}
+    ]
+
+def answer_cache_key(prompt, data_path=OUTPUT_FILEPATH, top_k=GUIDE_TOP_K):
+    return response_cache.key(prompt, LLM_MODEL, LLM_TEMPERATURE, SYSTEM_PROMPT, data_path, top_k)
+
+def recommend(prompt, data_path=OUTPUT_FILEPATH, top_k=GUIDE_TOP_K):
+    cache_key = answer_cache_key(prompt, data_path, top_k)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    answer = complete_text_sync(LLM_MODEL, build_messages(prompt, data_path, top_k), temperature=LLM_TEMPERATURE)
+    response_cache.put(cache_key, answer)
+    return answer
+
+async def recommend_stream(prompt, data_path=OUTPUT_FILEPATH, top_k=GUIDE_TOP_K, limiter=llm_limiter):
+    """Yield the answer as the model streams it, many requests can share one event loop."""
+    # The cache key hashes every guide, in a worker thread so it does not hold up the event loop
+    cache_key = await asyncio.to_thread(answer_cache_key, prompt, data_path, top_k)
+    async for token in stream_cached_answer(response_cache, cache_key,
+                                            lambda: build_messages(prompt, data_path, top_k),
+                                            LLM_MODEL, LLM_TEMPERATURE, limiter):
+        yield token
+
+async def recommend_async(prompt, data_path=OUTPUT_FILEPATH, top_k=GUIDE_TOP_K, limiter=llm_limiter):
+    return "".join([token async for token in recommend_stream(prompt, data_path, top_k, limiter)])
 
 # Example Usage
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+from src.common.lexical_index import TOKEN_PATTERN, BM25Index, file_fingerprint
+from src.general_info_adviser_tool.contants import GUIDE_CHUNK_CHARS, GUIDE_CONTEXT_CHARS, GUIDE_INDEX_DIR, \
+    GUIDE_TOP_K
+
+# export_to_txt appends this line after every crawled page
+SOURCE_MARKER = re.compile(r"^Above data is from \*\*Source url:\*\* *(\S*)[ \t]*$", re.MULTILINE)
+HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+CITATION = re.compile(r"⟨\d+⟩")  # Link references left by markdown_with_citations
+GUIDE_URL = re.compile(r"/doing-business-guide/(?:investor-tools/)?([a-z-]+)")
+ERROR_PAGE = re.compile(r"^#\s*(?:\d{3}\s|Page not found|Access denied)", re.IGNORECASE)
+
+MIN_CHUNK_WORDS = 25  # Shorter chunks are navigation crumbs rather than content
+MAX_LINK_LINE_RATIO = 0.6  # Chunks made mostly of bullet links and images are menus
+
+
+def split_pages(text):
+    """Yield (source_url, page_markdown) for every page written by export_to_txt."""
+    start = 0
+    for marker in SOURCE_MARKER.finditer(text):
+        yield marker.group(1), text[start:marker.start()]
+        start = marker.end()
+    if text[start:].strip():
+        yield "", text[start:]
+
+
+def split_sections(page):
+    """Yield (heading path, body) for each markdown section, e.g. ("Tax > Corporate Income Tax", "...")."""
+    headings = []
+    start, path = 0, ""
+    for heading in HEADING.finditer(page):
+        yield path, page[start:heading.start()]
+        level, title = len(heading.group(1)), CITATION.sub("", heading.group(2)).strip()
+        headings = [(h_level, h_title) for h_level, h_title in headings if h_level < level] + [(level, title)]
+        path = " > ".join(h_title for _, h_title in headings)
+        start = heading.end()
+    yield path, page[start:]
+
+
+def split_paragraphs(body, max_chars=GUIDE_CHUNK_CHARS):
+    """Group a section's paragraphs into windows of at most max_chars, splitting oversized paragraphs."""
+    window = ""
+    for paragraph in re.split(r"\n\s*\n", body):
+        paragraph = paragraph.strip()
+        while len(paragraph) > max_chars:
+            if window:
+                yield window
+                window = ""
+            yield paragraph[:max_chars]
+            paragraph = paragraph[max_chars:]
+        if window and len(window) + len(paragraph) + 2 > max_chars:
+            yield window
+            window = ""
+        if paragraph:
+            window = f"{window}\n\n{paragraph}" if window else paragraph
+    if window:
+        yield window
+
+
+def is_boilerplate(text):
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(TOKEN_PATTERN.findall(text.lower())) < MIN_CHUNK_WORDS:
+        return True
+    link_lines = sum(1 for line in lines if line.startswith(("*", "![", "[")) and len(line) < 80)
+    return link_lines / len(lines) > MAX_LINK_LINE_RATIO
+
+
+def guide_country(file_path, url):
+    """Country of a page, from its /doing-business-guide/<country> url or the business_guide_<country>.txt name."""
+    match = GUIDE_URL.search(url)
+    if match:
+        return match.group(1).replace("-", " ").title()
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return name.removeprefix("business_guide_").replace("_", " ").title() if name.startswith("business_guide_") else ""
+
+
+def chunk_guide(file_path, max_chars=GUIDE_CHUNK_CHARS):
+    """Yield chunk dicts (text, country, section, url, file) for one exported guide."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    for url, page in split_pages(text):
+        if ERROR_PAGE.match(page.strip()):
+            continue
+        country = guide_country(file_path, url)
+        for section, body in split_sections(page):
+            for passage in split_paragraphs(CITATION.sub("", body), max_chars):
+                if not is_boilerplate(passage):
+                    yield {"text": passage, "country": country, "section": section, "url": url,
+                           "file": os.path.basename(file_path)}
+
+
+class GuideIndex:
+    """
+    BM25 index over heading-sized chunks of the exported guides. Each chunk carries its
+    country, heading path and source url, and identical chunks (menus and footers repeated
+    on every page, guides exported twice) are indexed once.
+    """
+
+    def __init__(self, chunks, index):
+        self.chunks = chunks
+        self.index = index
+        self.countries = sorted({chunk["country"] for chunk in chunks if chunk["country"]})
+
+    @classmethod
+    def build(cls, paths, fingerprint=None, max_chars=GUIDE_CHUNK_CHARS):
+        chunks, seen = [], set()
+        for path in paths:
+            for chunk in chunk_guide(path, max_chars):
+                digest = hashlib.sha1(" ".join(chunk["text"].split()).encode("utf-8")).digest()
+                if digest not in seen:
+                    seen.add(digest)
+                    chunks.append(chunk)
+        documents = [f"{chunk['country']} {chunk['section']} {chunk['text']}" for chunk in chunks]
+        return cls(chunks, BM25Index.build(documents, fingerprint=fingerprint))
+
+    def save(self, prefix):
+        self.index.save(f"{prefix}.bm25.json")
+        tmp_path = f"{prefix}.chunks.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.chunks, f, ensure_ascii=False)
+        os.replace(tmp_path, f"{prefix}.chunks.json")
+
+    @classmethod
+    def load(cls, prefix):
+        with open(f"{prefix}.chunks.json", "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        return cls(chunks, BM25Index.load(f"{prefix}.bm25.json"))
+
+    def mentioned_countries(self, query):
+        query = " ".join(TOKEN_PATTERN.findall(query.lower()))
+        return {country for country in self.countries if re.search(rf"\b{re.escape(country.lower())}\b", query)}
+
+    def search(self, query, top_k=GUIDE_TOP_K, countries=None, max_chars=GUIDE_CONTEXT_CHARS):
+        """
+        Best matching chunks across every guide, at most top_k of them and max_chars of text.
+
+        Args:
+            query (str): The user's question
+            top_k (int): Maximum number of chunks returned
+            countries (set[str], optional): Only search these countries. Defaults to the
+                countries named in the query, or every country when it names none.
+            max_chars (int): Budget for the combined chunk text
+        """
+        countries = countries or self.mentioned_countries(query)
+        results, used = [], 0
+        for doc_id, score in self.index.search(query, len(self.chunks)):
+            chunk = self.chunks[doc_id]
+            if countries and chunk["country"] not in countries:
+                continue
+            if results and used + len(chunk["text"]) > max_chars:
+                break
+            results.append(dict(chunk, score=round(score, 3)))
+            used += len(chunk["text"])
+            if len(results) >= top_k:
+                break
+        return results
+
+
+def guide_paths(data_path):
+    return [data_path] if os.path.isfile(data_path) else sorted(glob.glob(os.path.join(data_path, "*.txt")))
+
+
+def load_or_build_guide_index(data_path):
+    """
+    Load the chunk index for a guide file, or for every guide in a directory, rebuilding it
+    when any guide changed. Indexes are stored under GUIDE_INDEX_DIR.
+    """
+    paths = guide_paths(data_path)
+    fingerprint = hashlib.sha256("".join(file_fingerprint(path, path) for path in paths).encode()).hexdigest()
+    os.makedirs(GUIDE_INDEX_DIR, exist_ok=True)
+    name = hashlib.sha1(os.path.abspath(data_path).encode("utf-8")).hexdigest()[:16]
+    prefix = os.path.join(GUIDE_INDEX_DIR, name)
+
+    try:
+        index = GuideIndex.load(prefix)
+        if index.index.fingerprint == fingerprint:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = GuideIndex.build(paths, fingerprint=fingerprint)
+    index.save(prefix)
+    print(f"📚 Indexed {len(index.chunks)} passages from {len(paths)} guides")
+    return index
+
+
+def format_passages(passages):
+    return "\n\n".join(
+        f"[{passage['country'] or 'General'} | {passage['section'] or 'Overview'}]\n"
+        f"Source: {passage['url']}\n{passage['text']}"
+        for passage in passages
+    )
@@ -1,19 +1,11 @@
-import csv
-import json
 import os
-import asyncio
-import pdb
-from crawl4ai import AsyncWebCrawler, BFSDeepCrawlStrategy, CacheMode, CrawlerRunConfig, LLMConfig, \
-    LXMLWebScrapingStrategy
-from crawl4ai.chunking_strategy import SlidingWindowChunking
-from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from crawl4ai import BFSDeepCrawlStrategy, CacheMode, CrawlerRunConfig, LLMConfig, LXMLWebScrapingStrategy
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
-from litellm import completion
 from pydantic import BaseModel
-import validators
 from dotenv import load_dotenv
 
-from src.general_info_adviser_tool.contants import OUTPUT_FILEPATH
+from src.common.seed_crawl import crawl_seed_records
+from src.general_info_adviser_tool.contants import CRAWL_SETTINGS, OUTPUT_FILEPATH
 
 load_dotenv(dotenv_path=".env")
 
@@ -51,7 +43,7 @@ You are given a text from a webpage related to investing in a country. Your task
 
 extraction_strategy = LLMExtractionStrategy(
     llm_config=LLMConfig(provider="azure/gpt-4o", base_url=os.environ["AZURE_API_BASE"],
-                         api_token=os.environ["AZURE_API_KEY"], temprature=0.3),
+                         api_token=os.environ["AZURE_API_KEY"], temperature=0.3),
     instruction=SYSTEM_INSTRUCTIONS,
     # schema=GeneralInfo.model_json_schema(),
     extraction_type="block",
@@ -64,7 +56,7 @@ config = CrawlerRunConfig(
     cache_mode=CacheMode.BYPASS,
     scan_full_page=True,
     scraping_strategy=LXMLWebScrapingStrategy(),
-    delay_before_return_html=2.5,
+    delay_before_return_html=2.5,  # Only used with adaptive_readiness off, otherwise each page waits until it settles
     exclude_social_media_links=True,
     exclude_external_links=True,
     magic=True,
@@ -72,47 +64,65 @@ config = CrawlerRunConfig(
         max_depth=1,
         include_external=False
     ),
-    # markdown_generator=DefaultMarkdownGenerator()
 )
 
-# async def main():
-#     url = "https://www.wsg.gov.sg/"
-#     overall_combined_json = await crawl_to_json(url, 0, 1)
-#     print(overall_combined_json)
-#     export_to_excel(overall_combined_json)
-
-# For separate LLM processing
-# async def crawl_to_text(urls):
-#     async with AsyncWebCrawler() as crawler:
-#         for url, filename in urls:
-#             print(f"🔗 Crawling {url}...")
-#             results = await crawler.arun(url, config=config)
-#             for result in results:
-#                 if result.markdown.markdown_with_citations:
-#                     formatted_prompt = f"Data:\n{result.markdown.markdown_with_citations}"
-#                     response = completion(
-#                         model="azure/gpt-4o",
-#                         messages=[
-#                             {"content": SYSTEM_INSTRUCTIONS, "role": "system"},
-#                             {"content": formatted_prompt, "role": "user"}
-#                         ],
-#                         temperature=0.2
-#                     )
-#                     pdb.set_trace()
-#                     export_to_txt(response.choices[0].message["content"], OUTPUT_FILEPATH + filename)
-#         return
-
-async def crawl_to_text(urls):
-    async with AsyncWebCrawler() as crawler:
-        for url, filename in urls:
-            print(f"🔗 Crawling {url}...")
-            results = await crawler.arun(url, config=config)
-            for result in results:
-                if result.markdown and result.markdown.markdown_with_citations:
-                    export_to_txt(result.markdown.markdown_with_citations, OUTPUT_FILEPATH + filename, result.url)
-                # if result.cleaned_html:
-                #     export_to_txt(result.cleaned_html, OUTPUT_FILEPATH + filename, result.url)
-        return
+def seed_config(frontier=None, link_scorer=None):
+    # Guides keep every page they link to, even one another guide already crawled, so the frontier is not used
+    return config.clone(deep_crawl_strategy=BFSDeepCrawlStrategy(max_depth=1, include_external=False))
+
+class TextSink:
+    """
+    Where crawl_seed_records puts the guides' pages: each page's markdown, with its
+    citations, is appended to the text file of the seed it was crawled from.
+
+    Args:
+        directory (str): Folder of the text files
+        filenames (dict): Text file name of each seed url
+    """
+
+    def __init__(self, directory, filenames):
+        self.directory = directory
+        self.filenames = filenames
+
+    def known_urls(self):
+        return ()
+
+    async def extract(self, results):
+        """The markdown of each crawl result as its only record, no records for a page without any."""
+        return [[result.markdown.markdown_with_citations]
+                if result.markdown and result.markdown.markdown_with_citations else [] for result in results]
+
+    def add(self, seed, pages):
+        for page_url, page in pages.items():
+            for text in page["records"]:
+                export_to_txt(text, self.directory + self.filenames[seed], page_url)
+
+    def rebuild(self, manifest, urls, changed_seeds, previous_records):
+        """Rewrite the text files of the changed seeds, and any that went missing, from the manifest."""
+        for seed in urls:
+            path = self.directory + self.filenames[seed]
+            if previous_records and seed not in changed_seeds and os.path.isfile(path):
+                continue
+            if os.path.isfile(path):
+                os.remove(path)
+            self.add(seed, {page_url: {"records": texts} for page_url, texts in manifest.seed_pages(seed)})
+
+    def print_stats(self):
+        pass
+
+async def crawl_to_text(urls, manifest=None, max_concurrency=None, per_domain_concurrency=None):
+    """
+    Crawl each (url, filename) seed concurrently and append the page markdown to its text file.
+
+    See crawl_seed_records; with a CrawlManifest the text files of the seeds that changed are
+    rebuilt from the manifest once the crawl finishes.
+
+    Returns:
+        A list of (url, seconds) tuples with the wall time spent crawling each seed.
+    """
+    sink = TextSink(OUTPUT_FILEPATH, dict(urls))
+    return await crawl_seed_records([url for url, _ in urls], CRAWL_SETTINGS, seed_config, sink, manifest,
+                                    max_concurrency, per_domain_concurrency)
 
 def export_to_txt(txt_data, filename, url):
     if not txt_data:
@@ -123,6 +133,3 @@ def export_to_txt(txt_data, filename, url):
         f.write(txt_data)
         f.write("\nAbove data is from **Source url:** " + url)
         f.write("\n")
-
-# if __name__ == "__main__":
-#     asyncio.run(main())
@@ -1,5 +1,49 @@
+from src.common.crawl_defaults import CrawlSettings
+
 OUTPUT_FILENAME = "src/grants_recommender_tool/scraper_output/grants.csv"
-POST_PROCESSED_OUTPUT = "src/grants_recommender_tool/scraper_output/post_processed_grants.csv"
+# Typed columnar copy of the merged records (list fields as native lists), read by the recommenders
+POST_PROCESSED_OUTPUT = "src/grants_recommender_tool/scraper_output/post_processed_grants.parquet"
+POST_PROCESSED_CSV = "src/grants_recommender_tool/scraper_output/post_processed_grants.csv"  # Spreadsheet view of the same records
+EXTRACTION_CACHE_DIR = "src/grants_recommender_tool/scraper_output/.extraction_cache/"
+CRAWL_MANIFEST = "src/grants_recommender_tool/scraper_output/crawl_manifest.json"
+CRAWL_REPORT = "src/grants_recommender_tool/scraper_output/crawl_report.json"
+CRAWL_CHECKPOINT = "src/grants_recommender_tool/scraper_output/crawl_checkpoint.jsonl"
+READINESS_PROFILES = "src/grants_recommender_tool/scraper_output/readiness_profiles.json"
+FETCH_TIERS = "src/grants_recommender_tool/scraper_output/fetch_tiers.json"
+RESPONSE_CACHE_DIR = "src/grants_recommender_tool/scraper_output/.response_cache/"
+
+LLM_MODEL = "azure/gpt-4o"
+LLM_TEMPERATURE = 0.2
+LLM_CONCURRENCY = 8  # Streaming recommendations in flight at once per event loop
+RECORD_STORE = "src/grants_recommender_tool/scraper_output/records.db"
+NEAR_DUPLICATE_AUDIT = "src/grants_recommender_tool/scraper_output/near_duplicate_merges.csv"
+NEAR_DUPLICATE_THRESHOLD = 0.85  # Name similarity (0-1) at which two records are merged
+
+# This tool's crawl settings, on top of src/common/crawl_defaults.py
+PRUNE_KEYWORDS = ["eligib", "benefit", "fund", "grant", "criteria", "qualif", "apply", "application", "deadline",
+                 "valid", "supportable", "co-fund", "subsid", "claim"]  # Sections mentioning these are kept first
+LINK_KEYWORDS = ["grant", "scheme", "fund", "financial support", "incentive", "programme", "initiative", "subsid",
+                 "assistance", "loan", "credit", "eligib", "co fund", "support"]  # Scored in link paths and anchor texts
+CRAWL_SETTINGS = CrawlSettings(CRAWL_CHECKPOINT, CRAWL_REPORT, READINESS_PROFILES, FETCH_TIERS, LINK_KEYWORDS,
+                               PRUNE_KEYWORDS)
+
+# Pre-filter applied before the grants are pasted into the prompt
+RETRIEVAL_MODE = "bm25"  # "bm25" for lexical matching, "semantic" for the vector index
+RETRIEVAL_FIELDS = ["name", "description", "eligibility_criteria", "business_needs", "outcomes", "target_audiences"]
+RETRIEVAL_KEY_FIELDS = ["name", "incentive_name"]  # Row id for the vector index, first column present wins
+EMBEDDING_MODEL = None  # litellm embedding model e.g. "azure/text-embedding-3-small", None embeds offline
+RETRIEVAL_TOP_K = 20  # Candidate grants sent to the model
+FULL_CONTEXT_MAX_ROWS = 30  # Datasets this small are sent whole
+
+# How the candidate grants are written into the prompt: "jsonl", "csv", "kv" (field: value blocks)
+# or "table" (DataFrame.to_string, every column padded to a fixed width)
+PROMPT_ENCODING = "csv"  # Fewest tokens on our datasets, see src/benchmarks/prompt_encoding_benchmark.py
+PROMPT_EXCLUDED_FIELDS = ["error", "funding_cap_sgd", "funding_max_percent"]
+PROMPT_FIELD_BUDGETS = {  # Characters kept per field, longer text is cut at a word boundary
+    "description": 800, "eligibility_criteria": 800, "supportable_activities": 600, "benefits": 600,
+    "other_prerequisites": 500, "activity": 600, "supportable_cost_expense_items": 500, "funding_support": 500,
+    "deliverables": 300,
+}
 
 SYSTEM_PROMPT ="""You are a Grant Advisor, an AI expert specializing in recommending the most relevant singapore government grants to users based on their needs. You have access to a csv data of grants, including their names, descriptions, agencies, eligibility criteria, and links.
 
@@ -1,10 +1,19 @@
+import asyncio
 import os
 
 from dotenv import load_dotenv
-from litellm import completion
-import pandas as pd
 
+from src.common.columnar_store import read_table
+from src.common.lexical_index import load_or_build_csv_index
+from src.common.llm_stream import ConcurrencyLimiter, complete_text_sync, stream_cached_answer
+from src.common.prompt_table import PromptStats, data_heading, render_rows
+from src.common.response_cache import ResponseCache
+from src.common.vector_index import get_embedder, semantic_candidates, sync_csv_index
+from src.common.warm_files import warm_files
 from src.events_listing_tool.contants import SYSTEM_PROMPT
+from src.grants_recommender_tool.contants import EMBEDDING_MODEL, FULL_CONTEXT_MAX_ROWS, LLM_CONCURRENCY, LLM_MODEL, \
+    LLM_TEMPERATURE, PROMPT_ENCODING, PROMPT_EXCLUDED_FIELDS, PROMPT_FIELD_BUDGETS, RESPONSE_CACHE_DIR, \
+    RETRIEVAL_FIELDS, RETRIEVAL_KEY_FIELDS, RETRIEVAL_MODE, RETRIEVAL_TOP_K
 
 load_dotenv(dotenv_path=".env") 
 
@@ -12,19 +21,143 @@ os.environ["AZURE_API_KEY"] = os.getenv("AZURE_API_KEY", "")
 os.environ["AZURE_API_BASE"] = os.getenv("AZURE_API_BASE", "")
 os.environ["AZURE_API_VERSION"] = os.getenv("AZURE_API_VERSION", "")
 
-def recommend(prompt, data_file_path):
-    data_string = pd.read_csv(data_file_path).to_string()
-    formatted_prompt = f"User Request:\n{prompt}\n\nCSV Grants Data:\n{data_string}"
-    response = completion(
-        model = "azure/gpt-4o", 
-        messages = [
-            { "content": SYSTEM_PROMPT, "role": "system"},
-            { "content": formatted_prompt,"role": "user"}
-        ],
-        temperature=0.2
-    )
-
-    return response.choices[0].message["content"]
+response_cache = ResponseCache(RESPONSE_CACHE_DIR)
+llm_limiter = ConcurrencyLimiter(LLM_CONCURRENCY)
+prompt_stats = PromptStats(LLM_MODEL)
+embedder = get_embedder(EMBEDDING_MODEL)
+
+NO_MATCHING_GRANTS = "No grants match the selected filters."
+
+def key_field(df):
+    return next((field for field in RETRIEVAL_KEY_FIELDS if field in df.columns), None)
+
+def refresh_index(data_file_path):
+    """Embed grants added or changed since the last export into the vector index next to the CSV."""
+    df = read_table(data_file_path, RETRIEVAL_KEY_FIELDS + RETRIEVAL_FIELDS)
+    if key_field(df):
+        sync_csv_index(df, data_file_path, key_field(df), RETRIEVAL_FIELDS, embedder)
+
+def load_vector_index(data_file_path):
+    df = warm_files.get(data_file_path, read_table)
+    return sync_csv_index(df, data_file_path, key_field(df), RETRIEVAL_FIELDS, embedder)
+
+def load_bm25_index(data_file_path):
+    return load_or_build_csv_index(warm_files.get(data_file_path, read_table), data_file_path, RETRIEVAL_FIELDS)
+
+def render_grants(df):
+    return render_rows(df, PROMPT_ENCODING, PROMPT_EXCLUDED_FIELDS, PROMPT_FIELD_BUDGETS)
+
+def render_table(data_file_path):
+    return render_grants(warm_files.get(data_file_path, read_table))
+
+def filter_grants(data_file_path, filters=None, load_index=None):
+    """
+    The grants left after the request's hard filters.
+
+    The filters belong to the tool whose data file this is: load_index(data_file_path)
+    returns its facet index (e.g. the stocktake's IncentiveIndex), whose rows(filters)
+    applies them.
+
+    Raises:
+        ValueError: When filters are given without a load_index
+    """
+    df = warm_files.get(data_file_path, read_table)
+    if not filters:
+        return df
+    if load_index is None:
+        raise ValueError("These grants have no facet index to filter on")
+    # The facet index is rebuilt only when the file changes
+    return df.iloc[sorted(warm_files.get(data_file_path, load_index).rows(filters))]
+
+def query(data_file_path, filters=None, load_index=None):
+    """Pure structured query, no model call: the grants matching the filters as records."""
+    matches = filter_grants(data_file_path, filters, load_index)
+    return matches.astype(object).where(matches.notna(), None).to_dict(orient="records")
+
+def select_candidates(prompt, df, data_file_path, top_k=RETRIEVAL_TOP_K, rows=None):
+    """
+    Keep only the top_k grants that best match the request, among rows when given,
+    lexically (BM25) or semantically (vector index) depending on RETRIEVAL_MODE.
+
+    The rows are returned as they are when top_k is None, there are at most
+    FULL_CONTEXT_MAX_ROWS of them, or no grant matches the request.
+    """
+    rows = df if rows is None else rows
+    if top_k is None or len(rows) <= max(FULL_CONTEXT_MAX_ROWS, top_k):
+        return rows
+
+    if RETRIEVAL_MODE == "semantic" and key_field(df):
+        # The vector index is opened and synced only when the file changes
+        candidates = semantic_candidates(prompt, warm_files.get(data_file_path, load_vector_index), df, key_field(df),
+                                         top_k, rows)
+        return candidates if len(candidates) else rows
+
+    index = warm_files.get(data_file_path, load_bm25_index)
+    allowed_ids = None if rows is df else set(df.index.get_indexer(rows.index))
+    hits = index.search(prompt, top_k, allowed_ids)
+    if not hits:
+        return rows
+    return df.iloc[[doc_id for doc_id, _ in hits]]
+
+def build_prompt(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None, load_index=None):
+    # The parsed CSV, its BM25 index and its full rendering stay in memory until the file changes
+    df = warm_files.get(data_file_path, read_table)
+    candidates = select_candidates(prompt, df, data_file_path, top_k, filter_grants(data_file_path, filters, load_index))
+    data_string = warm_files.get(data_file_path, render_table) if candidates is df else render_grants(candidates)
+    prompt_stats.record(data_string)
+    return f"User Request:\n{prompt}\n\n{data_heading('Grants', PROMPT_ENCODING)}:\n{data_string}"
+
+def build_messages(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None, load_index=None):
+    return [
+        { "content": SYSTEM_PROMPT, "role": "system"},
+        { "content": build_prompt(prompt, data_file_path, top_k, filters, load_index),"role": "user"}
+    ]
+
+def answer_cache_key(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None):
+    """filters as normalised by the tool's validate_filters, so equivalent requests share an answer."""
+    encoding = (PROMPT_ENCODING, sorted(PROMPT_FIELD_BUDGETS.items()))
+    if filters:
+        return response_cache.key(prompt, LLM_MODEL, LLM_TEMPERATURE, SYSTEM_PROMPT, data_file_path,
+                                  top_k, RETRIEVAL_MODE, encoding, sorted(filters.items()))
+    return response_cache.key(prompt, LLM_MODEL, LLM_TEMPERATURE, SYSTEM_PROMPT, data_file_path,
+                              top_k, RETRIEVAL_MODE, encoding)
+
+def recommend(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, filters=None, load_index=None):
+    """
+    Recommend grants for the request. filters, validated by the data file's tool, narrow the
+    grants before the model is called, e.g. the stocktake's {"industry": ["financial service"],
+    "incentive_type": ["grant"], "min_funding_cap": 100000.0} with its load_incentive_index as
+    load_index, and no model call is made when no grant is left.
+    """
+    if filters and not len(filter_grants(data_file_path, filters, load_index)):
+        return NO_MATCHING_GRANTS
+    cache_key = answer_cache_key(prompt, data_file_path, top_k, filters)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    answer = complete_text_sync(LLM_MODEL, build_messages(prompt, data_file_path, top_k, filters, load_index),
+                                temperature=LLM_TEMPERATURE)
+    response_cache.put(cache_key, answer)
+    return answer
+
+async def recommend_stream(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, limiter=llm_limiter, filters=None,
+                           load_index=None):
+    """Yield the recommendation as the model streams it, many requests can share one event loop."""
+    # Filtering and the cache key (a hash of the data file) run in a worker thread, off the event loop
+    if filters and not len(await asyncio.to_thread(filter_grants, data_file_path, filters, load_index)):
+        yield NO_MATCHING_GRANTS
+        return
+    cache_key = await asyncio.to_thread(answer_cache_key, prompt, data_file_path, top_k, filters)
+    async for token in stream_cached_answer(response_cache, cache_key,
+                                            lambda: build_messages(prompt, data_file_path, top_k, filters, load_index),
+                                            LLM_MODEL, LLM_TEMPERATURE, limiter):
+        yield token
+
+async def recommend_async(prompt, data_file_path, top_k=RETRIEVAL_TOP_K, limiter=llm_limiter, filters=None,
+                          load_index=None):
+    return "".join([token async for token in recommend_stream(prompt, data_file_path, top_k, limiter, filters,
+                                                              load_index)])
 
 # Example Usage
 if __name__ == "__main__":
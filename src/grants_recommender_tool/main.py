@@ -1,14 +1,18 @@
 import os
 
-from src.grants_recommender_tool.contants import OUTPUT_FILENAME, POST_PROCESSED_OUTPUT
-from src.grants_recommender_tool.post_csv_deduplication import merge_csv_records_by_name
-from src.grants_recommender_tool.web_crawler import crawl_to_json, export_to_excel
+from src.common.columnar_store import convert_csv, read_table
+from src.common.crawl_manifest import CrawlManifest
+from src.common.near_duplicates import merge_near_duplicates
+from src.common.record_store import record_schema
+from src.grants_recommender_tool.contants import (CRAWL_MANIFEST, NEAR_DUPLICATE_AUDIT, NEAR_DUPLICATE_THRESHOLD,
+                                                  POST_PROCESSED_CSV, POST_PROCESSED_OUTPUT)
+from src.grants_recommender_tool.web_crawler import Grant, crawl_to_json, open_record_store
 
 async def grants_main():
 
-    recrawl_data = input("Do you want to recrawl data? (yes/no): ")
+    recrawl_data = input("Do you want to recrawl data? (yes/no/incremental): ").lower()
 
-    if recrawl_data.lower() == "yes":
+    if recrawl_data in ("yes", "incremental"):
         # urls = input("Enter URLs separated by spaces: ").split()
         urls = [
             "https://www.mas.gov.sg/schemes-and-initiatives/fsti-scheme",
@@ -38,23 +42,34 @@ async def grants_main():
             "https://www.imda.gov.sg/how-we-can-help/smes-go-digital/advanced-digital-solutions"
         ]
 
-        # recrawl_depth = int(input("Enter recrawl depth: "))
-        # export_to_excel(await crawl_to_json("https://www.gobusiness.gov.sg/gov-assist/grants/", 0, recrawl_depth))
-        if os.path.isfile(OUTPUT_FILENAME):
-            os.remove(OUTPUT_FILENAME)
+        manifest = CrawlManifest(CRAWL_MANIFEST)
+        if recrawl_data == "yes":
+            manifest.clear()
 
-        await crawl_to_json(urls)
-        # for url in urls:
-        #     export_to_excel(await crawl_to_json(url))
-        merge_csv_records_by_name(OUTPUT_FILENAME, POST_PROCESSED_OUTPUT, 'incentive_name')
+        record_store = open_record_store()
+        await crawl_to_json(urls, record_store, manifest=manifest)
+        # Records are merged by name as they are stored, the Parquet file is a typed export of the store
+        record_store.export(POST_PROCESSED_OUTPUT)
+        record_store.close()
+        merge_near_duplicates(POST_PROCESSED_OUTPUT, merge_key='name', threshold=NEAR_DUPLICATE_THRESHOLD,
+                              audit_csv_path=NEAR_DUPLICATE_AUDIT)
+        from src.grants_recommender_tool.grant_recommender import refresh_index
+        refresh_index(POST_PROCESSED_OUTPUT)
+        read_table(POST_PROCESSED_OUTPUT).to_csv(POST_PROCESSED_CSV, index=False)
+    elif not os.path.isfile(POST_PROCESSED_OUTPUT) and os.path.isfile(POST_PROCESSED_CSV):
+        # Exported before the Parquet copy existed
+        convert_csv(POST_PROCESSED_CSV, POST_PROCESSED_OUTPUT, record_schema(Grant))
 
     user_input = input("Enter grant recommendation query: ") #"I am a manufacturing company doing steel works and am looking to leverage on technology to automate my internal processes what grants can i apply for"
     csv_file_path = POST_PROCESSED_OUTPUT  # Make sure this file exists
     print("\n🔹 Recommending Grants...\n")
-    from src.grants_recommender_tool.grant_recommender import recommend
-    recommendations = recommend(user_input, csv_file_path)
+    from src.grants_recommender_tool.grant_recommender import prompt_stats, recommend_stream, response_cache
     print("\n🔹 Recommended Grants:\n")
-    print(recommendations)
+    async for token in recommend_stream(user_input, csv_file_path):
+        print(token, end="", flush=True)
+    print()
+    response_cache.print_stats()
+    prompt_stats.print_stats()
 
 if __name__ == "__main__":
     import asyncio
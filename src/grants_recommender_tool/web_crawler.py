@@ -1,16 +1,17 @@
-import csv
-import json
 import os
-import asyncio
-import pdb
-from crawl4ai import AsyncWebCrawler, BFSDeepCrawlStrategy, CacheMode, CrawlerRunConfig, LLMConfig
-from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from crawl4ai import BFSDeepCrawlStrategy, CacheMode, CrawlerRunConfig, LLMConfig
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from pydantic import BaseModel
-import validators
 from dotenv import load_dotenv
 
-from src.grants_recommender_tool.contants import OUTPUT_FILENAME
+from src.common.batch_extraction import BatchExtractor
+from src.common.best_first_crawl import BestFirstDeepCrawlStrategy
+from src.common.crawl_frontier import FrontierBFSDeepCrawlStrategy
+from src.common.extraction_cache import CachedExtractionStrategy, ExtractionCache
+from src.common.markdown_pruning import MarkdownPruner
+from src.common.record_store import RecordStore
+from src.common.seed_crawl import RecordSink, crawl_seed_records
+from src.grants_recommender_tool.contants import CRAWL_SETTINGS, EXTRACTION_CACHE_DIR, RECORD_STORE
 
 load_dotenv(dotenv_path=".env")
 
@@ -111,89 +112,70 @@ Return your result as a JSON object with keys exactly matching the field names a
 }
 """)
 
-extraction_strategy = LLMExtractionStrategy(
-    llm_config=LLMConfig(provider="azure/gpt-4o", base_url=os.environ["AZURE_API_BASE"], api_token=os.environ["AZURE_API_KEY"], temprature=0.5),
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR)
+
+extraction_strategy = CachedExtractionStrategy(LLMExtractionStrategy(
+    llm_config=LLMConfig(provider="azure/gpt-4o", base_url=os.environ["AZURE_API_BASE"], api_token=os.environ["AZURE_API_KEY"], temperature=0.5),
     instruction=SYSTEM_INSTRUCTIONS,
     schema=Grant.model_json_schema(),
     extraction_type="schema",
     apply_chunking=False,
     input_format="markdown",
-    verbose=True)
+    verbose=True), extraction_cache)
+
+# With batch extraction the crawler only renders markdown and each seed's pages are extracted together afterwards
+batch_extractor = BatchExtractor(extraction_strategy, Grant, extraction_cache, CRAWL_SETTINGS.extraction_token_budget,
+                                 CRAWL_SETTINGS.extraction_max_documents) if CRAWL_SETTINGS.batch_extraction else None
+# Pruning trims the markdown batch extraction sends, the crawler's own per-page extraction is left as is
+markdown_pruner = MarkdownPruner(CRAWL_SETTINGS.prune_keywords, CRAWL_SETTINGS.page_token_budget) \
+    if CRAWL_SETTINGS.prune_markdown and CRAWL_SETTINGS.batch_extraction else None
+if CRAWL_SETTINGS.prune_markdown and not CRAWL_SETTINGS.batch_extraction:
+    print("⚠️ prune_markdown is ignored without batch_extraction, pages are extracted unpruned")
+
+def deep_crawl_strategy(frontier=None, link_scorer=None):
+    options = dict(
+            max_depth=1,
+            include_external=False,
+            max_pages=50,
+            # score_threshold=0.5
+    )
+    if frontier is None:
+        return BFSDeepCrawlStrategy(**options)
+    # With a frontier, pages another seed of the same run already crawled are skipped
+    if CRAWL_SETTINGS.crawl_strategy == "best_first":
+        options.update(max_depth=CRAWL_SETTINGS.best_first_max_depth, min_score=CRAWL_SETTINGS.min_link_score,
+                       yield_window=CRAWL_SETTINGS.yield_window, min_yield=CRAWL_SETTINGS.min_yield)
+        return BestFirstDeepCrawlStrategy(frontier, link_scorer, record_key="name", **options)
+    return FrontierBFSDeepCrawlStrategy(frontier, **options)
 
 config = CrawlerRunConfig(
-    extraction_strategy=extraction_strategy,
+    extraction_strategy=None if CRAWL_SETTINGS.batch_extraction else extraction_strategy,
     cache_mode=CacheMode.BYPASS,
     scan_full_page=True,
-    delay_before_return_html=2.5,
+    delay_before_return_html=2.5,  # Only used with adaptive_readiness off, otherwise each page waits until it settles
     exclude_social_media_links=True,
     exclude_external_links=True,
     magic=True,
-    deep_crawl_strategy=BFSDeepCrawlStrategy(
-            max_depth=1,
-            include_external=False,
-            max_pages=50,
-            # score_threshold=0.5
-    )
+    deep_crawl_strategy=deep_crawl_strategy()
 )
 
-# async def main():
-#     url = "https://www.wsg.gov.sg/"
-#     overall_combined_json = await crawl_to_json(url, 0, 1)
-#     print(overall_combined_json)
-#     export_to_excel(overall_combined_json)
-
-async def crawl_to_json(urls):
-    async with AsyncWebCrawler() as crawler:
-        for url in urls:
-            print(f"🔗 Crawling {url}...")
-            results = await crawler.arun(url, config=config)
-            # pdb.set_trace()
-            overall_combined_json = []
-            for result in results:
-                if result.extracted_content:
-                    overall_combined_json = overall_combined_json + json.loads(result.extracted_content)
-
-            export_to_excel(overall_combined_json)
-        return
-
-
-        # if result and result.success and current_depth < target_depth:
-        #     try:
-        #         extracted_data = json.loads(result.extracted_content)
-        #     except json.JSONDecodeError:
-        #         print("Error: Extracted content is not valid JSON.")
-        #         return []
-        #
-        #     overall_combined_json = extracted_data
-        #
-        #     for link in result.links.get("internal", []):
-        #         if validators.url(link["href"]):
-        #             print(f"🔗 Crawling {link['href']}...")
-        #             child_data = await crawl_to_json(link["href"], current_depth + 1, target_depth, crawled_url_list)
-        #             overall_combined_json = overall_combined_json + child_data
-        #     return overall_combined_json
-        # elif result and result.success:
-        #     try:
-        #         return json.loads(result.extracted_content)
-        #     except json.JSONDecodeError:
-        #         print("Error: Extracted content is not valid JSON.")
-        #         return []
-        # else:
-        #     return []
-
-def export_to_excel(json_data, filename=OUTPUT_FILENAME):
-    if not json_data:
-        print("No data to export.")
-        return
-
-    file_exists = os.path.isfile(filename)
-
-    with open(filename, mode="a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=json_data[0].keys())
-        if not file_exists or os.stat(filename).st_size == 0:
-            writer.writeheader()
-
-        writer.writerows(json_data)
-
-# if __name__ == "__main__":
-#     asyncio.run(main())
+def open_record_store(path=RECORD_STORE):
+    """The store the crawled grants are merged into, opened by whoever crawls or exports them."""
+    return RecordStore(path, "grants", Grant, "name")
+
+def seed_config(frontier=None, link_scorer=None):
+    # BFSDeepCrawlStrategy counts pages crawled on the instance, so each seed needs its own
+    return config.clone(deep_crawl_strategy=deep_crawl_strategy(frontier, link_scorer))
+
+async def crawl_to_json(urls, record_store, max_concurrency=None, per_domain_concurrency=None, manifest=None):
+    """
+    Crawl the seed URLs concurrently and merge the extracted grants into record_store as each seed finishes.
+
+    See crawl_seed_records.
+
+    Returns:
+        A list of (url, seconds) tuples with the wall time spent crawling each seed.
+    """
+    sink = RecordSink(record_store, "link", extraction_cache, batch_extractor, markdown_pruner)
+    return await crawl_seed_records(urls, CRAWL_SETTINGS, seed_config, sink, manifest, max_concurrency,
+                                    per_domain_concurrency)
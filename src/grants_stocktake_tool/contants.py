@@ -1,5 +1,27 @@
+from src.common.crawl_defaults import CrawlSettings
+
 OUTPUT_FILENAME = "src/grants_stocktake_tool/scraper_output/grants.csv"
-POST_PROCESSED_OUTPUT = "src/grants_stocktake_tool/scraper_output/post_processed_grants.csv"
+# Typed columnar copy of the merged records (list fields as native lists), read by the recommenders
+POST_PROCESSED_OUTPUT = "src/grants_stocktake_tool/scraper_output/post_processed_grants.parquet"
+POST_PROCESSED_CSV = "src/grants_stocktake_tool/scraper_output/post_processed_grants.csv"  # Spreadsheet view of the same records
+EXTRACTION_CACHE_DIR = "src/grants_stocktake_tool/scraper_output/.extraction_cache/"
+CRAWL_MANIFEST = "src/grants_stocktake_tool/scraper_output/crawl_manifest.json"
+CRAWL_REPORT = "src/grants_stocktake_tool/scraper_output/crawl_report.json"
+CRAWL_CHECKPOINT = "src/grants_stocktake_tool/scraper_output/crawl_checkpoint.jsonl"
+READINESS_PROFILES = "src/grants_stocktake_tool/scraper_output/readiness_profiles.json"
+FETCH_TIERS = "src/grants_stocktake_tool/scraper_output/fetch_tiers.json"
+RECORD_STORE = "src/grants_stocktake_tool/scraper_output/records.db"
+NEAR_DUPLICATE_AUDIT = "src/grants_stocktake_tool/scraper_output/near_duplicate_merges.csv"
+NEAR_DUPLICATE_THRESHOLD = 0.85  # Name similarity (0-1) at which two records are merged
+
+# This tool's crawl settings, on top of src/common/crawl_defaults.py
+PRUNE_KEYWORDS = ["eligib", "prerequisite", "fund", "grant", "incentive", "criteria", "qualif", "supportable",
+                 "cost", "expense", "deliverable", "quantum", "cap", "valid", "deadline"]  # Sections mentioning these are kept first
+LINK_KEYWORDS = ["grant", "scheme", "fund", "financial support", "incentive", "programme", "initiative", "subsid",
+                 "assistance", "loan", "credit", "eligib", "tax", "deduction", "allowance", "support"]  # Scored in link paths and anchor texts
+# These sites render slowly, so pages get longer to settle than the shared default
+CRAWL_SETTINGS = CrawlSettings(CRAWL_CHECKPOINT, CRAWL_REPORT, READINESS_PROFILES, FETCH_TIERS, LINK_KEYWORDS,
+                               PRUNE_KEYWORDS, readiness_max_wait_ms=12000)
 
 SYSTEM_PROMPT ="""You are a Grant Advisor, an AI expert specializing in recommending the most relevant singapore government grants to users based on their needs. You have access to a csv data of grants, including their names, descriptions, agencies, eligibility criteria, and links.
 
@@ -0,0 +1,154 @@
+import re
+
+import pandas as pd
+
+from src.common.columnar_store import read_table, write_table
+from src.common.facet_index import FacetIndex, IntervalIndex
+
+INCENTIVE_FACETS = ["industry", "capability_areas", "incentive_type", "grant_sub_category", "agency_administering"]
+FACET_WILDCARDS = ["all"]  # e.g. industry ["All"] matches any industry asked for
+FUNDING_FILTERS = ["min_funding_cap", "min_support_percent", "include_unknown_funding"]
+INDEX_COLUMNS = INCENTIVE_FACETS + ["funding_support", "funding_cap_sgd", "funding_max_percent"]  # Read to build the indexes
+
+# "S$2M", "$400K", "SGD 250,000", "S$100 million"
+AMOUNT_PATTERN = re.compile(
+    r"(?:S\$|SGD\s?|\$)\s?(?P<number>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>k|m|mil|million|b|bn|billion)?\b", re.IGNORECASE)
+PERCENT_PATTERN = re.compile(r"(?P<number>\d{1,3}(?:\.\d+)?)\s*(?:%|per\s?cent\b)", re.IGNORECASE)
+UNITS = {"k": 1e3, "m": 1e6, "mil": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9, "billion": 1e9}
+
+
+def parse_amount(text):
+    """An amount in dollars, from "S$2M", "$400K", "250,000" or a number. None if it cannot be read."""
+    if isinstance(text, (int, float)):
+        return None if pd.isna(text) else float(text)
+    text = str(text).strip()
+    match = AMOUNT_PATTERN.fullmatch(text) or AMOUNT_PATTERN.fullmatch(f"${text}")
+    if not match:
+        return None
+    unit = (match.group("unit") or "").lower()
+    return float(match.group("number").replace(",", "")) * UNITS.get(unit, 1)
+
+
+def parse_funding_support(text):
+    """
+    Largest dollar cap and largest co-funding percentage written in a funding_support text, e.g.
+    "70% Co-funding of eligible expenses with a grant cap of up to S$2M" -> (2000000.0, 70.0).
+
+    Returns:
+        tuple[float | None, float | None]: None for what the text does not state
+    """
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return None, None
+    amounts = [parse_amount(match.group(0)) for match in AMOUNT_PATTERN.finditer(text)]
+    percents = [float(match.group("number")) for match in PERCENT_PATTERN.finditer(text)]
+    amounts = [amount for amount in amounts if amount]
+    percents = [percent for percent in percents if 0 < percent <= 100]
+    return (max(amounts) if amounts else None), (max(percents) if percents else None)
+
+
+def add_funding_terms(csv_path):
+    """Post-processing step: add funding_cap_sgd and funding_max_percent columns parsed from funding_support (CSV or Parquet)."""
+    df = read_table(csv_path)
+    terms = [parse_funding_support(text) for text in df["funding_support"]] if "funding_support" in df \
+        else [(None, None)] * len(df)
+    df["funding_cap_sgd"] = [cap for cap, _ in terms]
+    df["funding_max_percent"] = [percent for _, percent in terms]
+    write_table(df, csv_path)
+    print(f"💰 Read the funding cap of {sum(1 for cap, _ in terms if cap)} and the co-funding share of "
+          f"{sum(1 for _, percent in terms if percent)} of {len(df)} incentives")
+
+
+def funding_terms(df):
+    """(cap, percent) per row, from the columns post-processing added or parsed on the fly."""
+    if "funding_cap_sgd" in df and "funding_max_percent" in df:
+        return [(None if pd.isna(cap) else float(cap), None if pd.isna(percent) else float(percent))
+                for cap, percent in zip(df["funding_cap_sgd"], df["funding_max_percent"])]
+    if "funding_support" in df:
+        return [parse_funding_support(text) for text in df["funding_support"]]
+    return [(None, None)] * len(df)
+
+
+def validate_filters(filters):
+    """
+    Check and normalise the hard filters of a request.
+
+    Filters are a dict of facet -> value or list of values (any of them matches), e.g.
+    {"industry": "financial service", "capability_areas": ["innovation", "digitalisation"],
+    "incentive_type": "grant"}, plus the funding filters "min_funding_cap" (dollars, "S$100K"
+    style amounts are read too), "min_support_percent" and "include_unknown_funding" (bool,
+    default True: incentives whose funding_support states no cap or share are kept).
+
+    Raises:
+        ValueError: On an unknown filter or an amount or percentage that cannot be read,
+            or a facet value that is not a string or a list
+    """
+    unknown = set(filters) - set(INCENTIVE_FACETS) - set(FUNDING_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filters {', '.join(sorted(unknown))}, "
+                         f"expected any of {', '.join(INCENTIVE_FACETS + FUNDING_FILTERS)}")
+    normalised = {}
+    for key, value in filters.items():
+        if value is None or value == [] or value == "":
+            continue
+        if key in ("min_funding_cap", "min_support_percent"):
+            value = value[0] if isinstance(value, list) else value
+            number = parse_amount(value) if key == "min_funding_cap" else parse_amount(str(value).rstrip("% "))
+            if number is None:
+                raise ValueError(f"Cannot read {key} {value!r} as a number")
+            value = number
+        elif key == "include_unknown_funding":
+            value = value[0] if isinstance(value, list) else value
+            value = str(value).strip().lower() not in ("false", "no", "0") if isinstance(value, str) else bool(value)
+        else:
+            if not isinstance(value, (str, list)):
+                raise ValueError(f"{key} must be a string or a list of strings, not {value!r}")
+            value = sorted({str(item).strip().lower() for item in ([value] if isinstance(value, str) else value)})
+        normalised[key] = value
+    return normalised
+
+
+def parse_filter_text(text):
+    """
+    Filters typed on the command line, e.g. "industry=financial_service incentive_type=grant
+    capability_areas=innovation,digitalisation min_funding_cap=100k". Spaces inside a value
+    are written as underscores.
+    """
+    filters = {}
+    for token in text.split():
+        key, _, value = token.partition("=")
+        filters[key] = [item.replace("_", " ") for item in value.split(",")] if value else True
+    return validate_filters(filters)
+
+
+class IncentiveIndex:
+    """
+    Facet and funding indexes over the post-processed stocktake incentives, used to answer
+    structured queries without the model and to narrow the rows the model is sent.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.facets = FacetIndex(df, INCENTIVE_FACETS, FACET_WILDCARDS)
+        terms = funding_terms(df)
+        self.caps = IntervalIndex([(cap, cap) for cap, _ in terms])
+        self.percents = IntervalIndex([(percent, percent) for _, percent in terms])
+
+    def rows(self, filters):
+        """Positions of the incentives matching every filter. See validate_filters for the format."""
+        filters = validate_filters(filters)
+        rows = self.facets.filter({key: value for key, value in filters.items() if key in INCENTIVE_FACETS})
+        include_unknown = filters.get("include_unknown_funding", True)
+        for key, index in (("min_funding_cap", self.caps), ("min_support_percent", self.percents)):
+            if key in filters:
+                matching = index.overlapping(low=filters[key])
+                rows &= matching | index.unbounded if include_unknown else matching
+        return rows
+
+    def filter(self, filters):
+        """The incentives matching every filter, in file order."""
+        return self.df.iloc[sorted(self.rows(filters))]
+
+
+def load_incentive_index(data_file_path):
+    # Only the facet and funding columns are read, rows keep their positions in the full table
+    return IncentiveIndex(read_table(data_file_path, INDEX_COLUMNS))
@@ -0,0 +1,7 @@
+HOST = "127.0.0.1"
+PORT = 8080
+
+MAX_CONCURRENT_REQUESTS = 32  # Requests being answered at once, the rest wait in a queue
+MAX_QUEUED_REQUESTS = 128  # Requests beyond this are refused with 429
+MAX_BATCH_QUERIES = 20  # Queries accepted by one batch request
+RELOAD_INTERVAL_SECONDS = 2.0  # How often the scraper output files are checked for changes
@@ -0,0 +1,412 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+from src.common.llm_stream import StubLLM, use_stub_llm
+from src.common.warm_files import warm_files
+from src.events_listing_tool import events_recommender
+from src.events_listing_tool.contants import POST_OUTPUT_CSV, POST_OUTPUT_FILENAME
+from src.general_info_adviser_tool import general_info_advisor
+from src.general_info_adviser_tool.contants import OUTPUT_FILEPATH
+from src.grants_recommender_tool import grant_recommender
+from src.grants_recommender_tool.contants import POST_PROCESSED_CSV as GRANTS_CSV, \
+    POST_PROCESSED_OUTPUT as GRANTS_OUTPUT
+from src.grants_stocktake_tool.contants import POST_PROCESSED_CSV as STOCKTAKE_CSV, \
+    POST_PROCESSED_OUTPUT as STOCKTAKE_OUTPUT
+from src.grants_stocktake_tool.incentive_facets import load_incentive_index, validate_filters as validate_incentive_filters
+from src.recommendation_service.contants import HOST, MAX_BATCH_QUERIES, MAX_CONCURRENT_REQUESTS, \
+    MAX_QUEUED_REQUESTS, PORT, RELOAD_INTERVAL_SECONDS
+
+
+class Recommender:
+    """
+    An endpoint's recommender module and the data file it answers from.
+
+    Until the tool's crawler has written its Parquet file, answers come from the CSV export
+    at csv_path (exports from before the Parquet copy existed only have the CSV).
+    """
+
+    def __init__(self, module, data_file_path, csv_path=None):
+        self.module = module
+        self.data_file_path = data_file_path
+        self.csv_path = csv_path
+
+    def current_path(self):
+        if self.csv_path and not os.path.isfile(self.data_file_path) and os.path.isfile(self.csv_path):
+            return self.csv_path
+        return self.data_file_path
+
+    def data_path(self, body):
+        path = self.current_path()
+        if not os.path.isfile(path):
+            raise web.HTTPServiceUnavailable(text=f"{path} has not been generated yet, run the crawler")
+        return path
+
+    def data_paths(self):
+        return [self.current_path()]
+
+    def filters(self, body):
+        """The request's hard filters, only recommenders with a facet index take any."""
+        if body.get("filters"):
+            raise web.HTTPBadRequest(text="This recommender does not take filters")
+        return None
+
+    def cache_key(self, query, data_file_path, filters=None):
+        return self.module.answer_cache_key(query, data_file_path)
+
+    def stream(self, query, data_file_path, filters=None):
+        return self.module.recommend_stream(query, data_file_path)
+
+    def query(self, data_file_path, filters):
+        raise web.HTTPBadRequest(text="This recommender does not answer structured queries")
+
+    def warm_up(self, data_file_path):
+        self.module.build_messages("warm up", data_file_path)
+
+
+class FacetedRecommender(Recommender):
+    """
+    Recommenders that apply the request's "filters" object before the model sees any row.
+
+    A recommender shared between tools (the grants recommender also answers from the
+    stocktake's incentives) is given the data file's tool's validate_filters and facet
+    index loader, recommenders owning their facets use their own.
+    """
+
+    def __init__(self, module, data_file_path, csv_path=None, validate_filters=None, load_index=None):
+        super().__init__(module, data_file_path, csv_path)
+        self.validate_filters = validate_filters or module.validate_filters
+        self.index_options = {"load_index": load_index} if load_index else {}
+
+    def filters(self, body):
+        filters = body.get("filters")
+        if not filters:
+            return None
+        if not isinstance(filters, dict):
+            raise web.HTTPBadRequest(text='"filters" must be a JSON object')
+        try:
+            return self.validate_filters(filters)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+
+    def cache_key(self, query, data_file_path, filters=None):
+        return self.module.answer_cache_key(query, data_file_path, filters=filters)
+
+    def stream(self, query, data_file_path, filters=None):
+        return self.module.recommend_stream(query, data_file_path, filters=filters, **self.index_options)
+
+    def query(self, data_file_path, filters):
+        return self.module.query(data_file_path, filters, **self.index_options)
+
+    def warm_up(self, data_file_path):
+        super().warm_up(data_file_path)
+        if self.index_options:
+            # The facet index of a shared recommender is the route's own, build it as well
+            warm_files.get(data_file_path, self.index_options["load_index"])
+
+
+class GuideRecommender(Recommender):
+    """General info answers come from every guide, or from the one named in the request's "guide" field."""
+
+    def data_path(self, body):
+        if not body.get("guide"):
+            return self.data_file_path
+        guide = os.path.basename(str(body["guide"]))
+        if not guide.endswith(".txt"):
+            guide += ".txt"
+        path = os.path.join(self.data_file_path, guide)
+        if not os.path.isfile(path):
+            raise web.HTTPNotFound(text=f"Unknown guide {guide}")
+        return path
+
+
+RECOMMENDERS = {
+    "grants": Recommender(grant_recommender, GRANTS_OUTPUT, GRANTS_CSV),
+    "stocktake": FacetedRecommender(grant_recommender, STOCKTAKE_OUTPUT, STOCKTAKE_CSV, validate_incentive_filters,
+                                    load_incentive_index),
+    "events": FacetedRecommender(events_recommender, POST_OUTPUT_FILENAME, POST_OUTPUT_CSV),
+    "general-info": GuideRecommender(general_info_advisor, OUTPUT_FILEPATH),
+}
+
+
+def recommender_modules():
+    """The recommender modules behind the routes, each once."""
+    return list({id(recommender.module): recommender.module for recommender in RECOMMENDERS.values()}.values())
+
+
+class SharedStream:
+    """
+    One model stream fanned out to every request asking the same question at the same time.
+    Tokens are buffered, so a request joining late replays what it missed before following live.
+    """
+
+    def __init__(self, source, on_done):
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._pump(source, on_done))
+
+    async def _pump(self, source, on_done):
+        try:
+            async for token in source:
+                self.tokens.append(token)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            on_done()
+            self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self):
+        position = 0
+        while True:
+            while position < len(self.tokens):
+                yield self.tokens[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class RecommendationService:
+    """
+    Admission control and request coalescing in front of the recommenders.
+
+    At most MAX_CONCURRENT_REQUESTS requests are answered at once and up to
+    MAX_QUEUED_REQUESTS more wait for a slot; beyond that requests get a 429. Requests
+    with the same cache key (same normalised question, same data) share one model call.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_REQUESTS, max_queued=MAX_QUEUED_REQUESTS):
+        self.max_queued = max_queued
+        self.active = 0
+        self.waiting = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._in_flight = {}
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._slots.locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise web.HTTPTooManyRequests(text="Too many requests in flight, retry shortly")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.requests += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def answer_stream(self, recommender, query, data_file_path, filters=None):
+        # Cache keys hash the data file, which must not hold up the event loop
+        key = await asyncio.to_thread(recommender.cache_key, query, data_file_path, filters)
+        shared = self._in_flight.get(key)
+        if shared is None:
+            shared = SharedStream(recommender.stream(query, data_file_path, filters),
+                                  on_done=lambda: self._in_flight.pop(key, None))
+            self._in_flight[key] = shared
+        else:
+            self.coalesced += 1
+        async for token in shared.subscribe():
+            yield token
+
+    async def answer(self, recommender, query, data_file_path, filters=None):
+        return "".join([token async for token in self.answer_stream(recommender, query, data_file_path, filters)])
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "active": self.active,
+            "waiting": self.waiting,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "warm_files": warm_files.stats(),
+            # By recommender module, "grants" and "stocktake" share grant_recommender's cache and prompt figures
+            "response_cache": {module.__name__: module.response_cache.stats() for module in recommender_modules()},
+            "prompt_data": {module.__name__: module.prompt_stats.stats()
+                            for module in recommender_modules() if hasattr(module, "prompt_stats")},
+        }
+
+
+SERVICE = web.AppKey("service", RecommendationService)
+WATCHER = web.AppKey("watcher", asyncio.Task)
+
+
+def warm_up():
+    """Parse every data file and build its retrieval index so the first request does not pay for it."""
+    for name, recommender in RECOMMENDERS.items():
+        for path in recommender.data_paths():
+            if not os.path.exists(path):
+                print(f"⚠️ {name}: {path} not found, skipping warm up")
+                continue
+            recommender.warm_up(path)
+            print(f"🔥 {name}: {path} loaded")
+
+
+async def watch_data_files(interval=RELOAD_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        for path in await asyncio.to_thread(warm_files.refresh):
+            print(f"♻️ Reloaded {path}")
+
+
+def recommender_for(request):
+    recommender = RECOMMENDERS.get(request.match_info["tool"])
+    if recommender is None:
+        raise web.HTTPNotFound(text=f"Unknown recommender, expected one of {', '.join(RECOMMENDERS)}")
+    return recommender
+
+
+async def read_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Request body must be JSON")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Request body must be a JSON object")
+    return body
+
+
+async def recommend(request):
+    service = request.app[SERVICE]
+    recommender = recommender_for(request)
+    body = await read_body(request)
+    query = str(body.get("query") or "").strip()
+    if not query:
+        raise web.HTTPBadRequest(text='"query" is required')
+    data_file_path = recommender.data_path(body)
+    filters = recommender.filters(body)
+
+    started = time.perf_counter()
+    async with service.admit():
+        if body.get("stream"):
+            response = web.StreamResponse(headers={"Content-Type": "text/plain; charset=utf-8"})
+            await response.prepare(request)
+            try:
+                async for token in service.answer_stream(recommender, query, data_file_path, filters):
+                    await response.write(token.encode("utf-8"))
+                await response.write_eof()
+            except ConnectionResetError:
+                # The client went away, the shared stream still finishes and caches the answer
+                pass
+            return response
+
+        answer = await service.answer(recommender, query, data_file_path, filters)
+    return web.json_response({
+        "query": query,
+        "answer": answer,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    })
+
+
+async def recommend_batch(request):
+    service = request.app[SERVICE]
+    recommender = recommender_for(request)
+    body = await read_body(request)
+    queries = [str(query).strip() for query in body.get("queries") or [] if str(query).strip()]
+    if not queries or len(queries) > MAX_BATCH_QUERIES:
+        raise web.HTTPBadRequest(text=f'"queries" must hold 1 to {MAX_BATCH_QUERIES} queries')
+    data_file_path = recommender.data_path(body)
+    filters = recommender.filters(body)
+
+    started = time.perf_counter()
+    # A batch takes one admission slot, its queries then share the recommender's model concurrency limit
+    async with service.admit():
+        answers = await asyncio.gather(*(service.answer(recommender, query, data_file_path, filters) for query in queries))
+    return web.json_response({
+        "answers": [{"query": query, "answer": answer} for query, answer in zip(queries, answers)],
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    })
+
+
+async def structured_query(request):
+    """The rows matching the request's filters, straight from the facet index without calling the model."""
+    recommender = recommender_for(request)
+    body = await read_body(request)
+    data_file_path = recommender.data_path(body)
+    filters = recommender.filters(body)
+
+    started = time.perf_counter()
+    results = await asyncio.to_thread(recommender.query, data_file_path, filters)
+    return web.json_response({
+        "matches": len(results),
+        "results": results,
+        "elapsed_seconds": round(time.perf_counter() - started, 6),
+    }, dumps=lambda data: json.dumps(data, default=str))
+
+
+async def health(request):
+    return web.json_response({"status": "ok"})
+
+
+async def stats(request):
+    return web.json_response(request.app[SERVICE].stats())
+
+
+async def on_startup(app):
+    await asyncio.to_thread(warm_up)
+    app[WATCHER] = asyncio.create_task(watch_data_files())
+
+
+async def on_cleanup(app):
+    app[WATCHER].cancel()
+
+
+def create_app(service=None):
+    """The service's aiohttp application, with a RecommendationService of default limits unless one is given."""
+    app = web.Application()
+    app[SERVICE] = service or RecommendationService()
+    app.router.add_get("/health", health)
+    app.router.add_get("/stats", stats)
+    app.router.add_post("/recommend/{tool}", recommend)
+    app.router.add_post("/recommend/{tool}/batch", recommend_batch)
+    app.router.add_post("/query/{tool}", structured_query)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve grant, stocktake, events and general info recommendations over HTTP.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="Model calls streaming at once per recommender (defaults to each tool's LLM_CONCURRENCY)")
+    parser.add_argument("--stub-llm", action="store_true", help="Answer with an offline stub instead of Azure OpenAI")
+    parser.add_argument("--stub-token-delay", type=float, default=0.0, help="Seconds the stub waits per token")
+    args = parser.parse_args()
+
+    if args.llm_concurrency:
+        for module in (grant_recommender, events_recommender, general_info_advisor):
+            module.llm_limiter.limit = args.llm_concurrency
+    if args.stub_llm:
+        use_stub_llm(StubLLM(token_delay=args.stub_token_delay))
+        print("🧪 Using the offline stub LLM")
+
+    print(f"🚀 Serving recommendations on http://{args.host}:{args.port}")
+    web.run_app(create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
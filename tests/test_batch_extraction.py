@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from src.common.batch_extraction import BatchExtractor
+from src.common.extraction_cache import ExtractionCache
+from src.common.markdown_pruning import MarkdownPruner
+
+FOOTER = "Contact us at the agency hotline for help with any of the schemes listed on this website today"
+
+
+class Scheme(BaseModel):
+    name: str
+
+
+class CountingStrategy:
+    """Stands in for LLMExtractionStrategy, answering every page with one record."""
+
+    def __init__(self):
+        self.instruction = "Extract the scheme"
+        self.schema = Scheme.model_json_schema()
+        self.llm_config = SimpleNamespace(provider="azure/gpt-4o")
+        self.calls = []
+
+    def run(self, url, sections):
+        self.calls.append(sections[0])
+        return [{"name": url, "error": False}]
+
+
+def page(url):
+    return url, f"# {url}\n\nThe {url} scheme funds projects.\n\n{FOOTER}"
+
+
+def test_cache_key_ignores_what_the_pruner_has_seen(tmp_path):
+    strategy = CountingStrategy()
+    extractor = BatchExtractor(strategy, Scheme, ExtractionCache(str(tmp_path)))
+    target = page("https://agency.gov.sg/schemes/a")
+
+    first = asyncio.run(extractor.extract([target], MarkdownPruner(verbose=False)))
+    # A pruner that has seen the footer on other pages strips it, the page must still hit the cache
+    seasoned = MarkdownPruner(verbose=False)
+    for i in range(5):
+        seasoned.observe(*page(f"https://agency.gov.sg/schemes/{i}"))
+    second = asyncio.run(extractor.extract([target], seasoned))
+
+    assert first == second == [[{"name": target[0], "error": False}]]
+    assert len(strategy.calls) == 1 and extractor.cached_pages == 1
+
+
+def test_pruned_markdown_is_what_gets_sent(tmp_path):
+    strategy = CountingStrategy()
+    extractor = BatchExtractor(strategy, Scheme, ExtractionCache(str(tmp_path)))
+    pruner = MarkdownPruner(verbose=False)
+    for i in range(5):
+        pruner.observe(*page(f"https://agency.gov.sg/schemes/{i}"))
+
+    asyncio.run(extractor.extract([page("https://agency.gov.sg/schemes/a")], pruner))
+    assert FOOTER not in strategy.calls[0]
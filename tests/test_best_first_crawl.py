@@ -0,0 +1,69 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.common.best_first_crawl import BestFirstDeepCrawlStrategy, LinkScorer
+from src.common.crawl_frontier import CrawlFrontier
+
+SITE = "https://example.gov.sg"
+
+
+class Config:
+    def clone(self, **kwargs):
+        return self
+
+
+class FakeCrawler:
+    """Serves pages from {url: (links, records)} and remembers the order they were fetched in."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    async def arun_many(self, urls, config):
+        self.fetched += urls
+        return [self.result(url) for url in urls]
+
+    def result(self, url):
+        links, records = self.pages.get(url, ([], []))
+        return SimpleNamespace(url=url, success=True, metadata={}, markdown=None,
+                               extracted_content=json.dumps(records),
+                               links={"internal": [{"href": href, "text": text} for href, text in links]})
+
+
+def crawl(pages, scorer, **kwargs):
+    crawler = FakeCrawler(pages)
+    frontier = CrawlFrontier()
+    frontier.claim(SITE)
+    strategy = BestFirstDeepCrawlStrategy(frontier, scorer, record_key="name", batch_size=1, max_depth=2, **kwargs)
+    asyncio.run(strategy._arun_batch(SITE, crawler, Config()))
+    return crawler.fetched
+
+
+def test_scores_keywords_known_paths_and_negative_pages():
+    scorer = LinkScorer(["grant"], known_urls=[f"{SITE}/schemes/psg", f"{SITE}/schemes/edg"])
+    grant = scorer.score(f"{SITE}/grants/psg", "Productivity grant")
+    known = scorer.score(f"{SITE}/schemes/mra")
+    news = scorer.score(f"{SITE}/news/grants", "Grant news")
+    assert grant > known > scorer.score(f"{SITE}/events") > news
+    assert scorer.score(f"{SITE}/grants/psg", depth=2) == round(scorer.score(f"{SITE}/grants/psg") - 0.1, 4)
+
+
+def test_fetches_the_most_promising_links_first():
+    pages = {SITE: ([(f"{SITE}/events", "Events"), (f"{SITE}/news", "News"), (f"{SITE}/grants", "Grants")], [])}
+    fetched = crawl(pages, LinkScorer(["grant"]), min_score=-1.0)
+    assert fetched == [SITE, f"{SITE}/grants", f"{SITE}/events", f"{SITE}/news"]
+
+
+def test_links_below_min_score_are_never_fetched():
+    pages = {SITE: ([(f"{SITE}/grants", "Grants"), (f"{SITE}/careers", "Careers")], [])}
+    assert crawl(pages, LinkScorer(["grant"]), min_score=-0.15) == [SITE, f"{SITE}/grants"]
+
+
+def test_stops_a_seed_once_pages_stop_yielding_new_records():
+    links = [(f"{SITE}/grants/{i}", f"Grant {i}") for i in range(10)]
+    pages = {SITE: (links, [{"name": "PSG"}])}
+    pages.update({url: ([], [{"name": "PSG"}]) for url, _ in links})
+    fetched = crawl(pages, LinkScorer(["grant"]), yield_window=3, min_yield=0.5)
+    # The seed's record is new, the next two pages only repeat it, so the window falls to 1 in 3
+    assert len(fetched) == 3
@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+from pydantic import BaseModel
+
+from src.common.columnar_store import (ParquetExport, arrow_schema, coerce_value, convert_csv, read_table,
+                                       read_table_records, table_columns, write_table)
+
+
+class Scheme(BaseModel):
+    name: str
+    funding: Optional[float] = None
+    sectors: Optional[List[str]] = None
+    open: bool | None = None
+
+
+def test_schema_follows_the_model():
+    schema = arrow_schema(Scheme, {"error": pa.bool_()})
+    assert [(field.name, field.type) for field in schema] == [
+        ("name", pa.string()), ("funding", pa.float64()), ("sectors", pa.list_(pa.string())),
+        ("open", pa.bool_()), ("error", pa.bool_())]
+
+
+def test_coerce_value():
+    assert coerce_value("", pa.string()) is None
+    assert coerce_value("Retail", pa.list_(pa.string())) == ["Retail"]
+    assert coerce_value(["a", "b"], pa.string()) == "a\nb"
+    assert coerce_value("50%", pa.float64()) is None
+    assert coerce_value("True", pa.bool_()) is True
+
+
+def test_export_round_trips_lists(tmp_path):
+    path = str(tmp_path / "schemes.parquet")
+    export = ParquetExport(path, arrow_schema(Scheme))
+    export.write([{"name": "PSG", "funding": "0.5", "sectors": ["Retail", "Logistics"]}])
+    export.write([{"name": "EDG", "open": "true"}])
+    export.close()
+
+    assert read_table_records(path) == [
+        {"name": "PSG", "funding": 0.5, "sectors": ["Retail", "Logistics"], "open": None},
+        {"name": "EDG", "funding": None, "sectors": None, "open": True}]
+    assert list(read_table(path, columns=["sectors", "missing"]).columns) == ["sectors"]
+
+
+def test_convert_csv_parses_list_cells_once(tmp_path):
+    csv_path, parquet_path = str(tmp_path / "schemes.csv"), str(tmp_path / "schemes.parquet")
+    pd.DataFrame({"name": ["PSG"], "sectors": ["['Retail', 'Logistics']"], "notes": ["Added later"]}) \
+        .to_csv(csv_path, index=False)
+    convert_csv(csv_path, parquet_path, arrow_schema(Scheme))
+
+    df = read_table(parquet_path)
+    assert df.loc[0, "sectors"] == ["Retail", "Logistics"]
+    assert table_columns(parquet_path) == ["name", "sectors", "notes"]
+
+    # Rewriting keeps the list type and types new columns from their values
+    df["score"] = [1.5]
+    write_table(df, parquet_path)
+    assert read_table_records(parquet_path) == [
+        {"name": "PSG", "sectors": ["Retail", "Logistics"], "notes": "Added later", "score": 1.5}]
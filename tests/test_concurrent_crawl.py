@@ -0,0 +1,68 @@
+import asyncio
+from collections import Counter
+from urllib.parse import urlparse
+
+from src.common.concurrent_crawl import crawl_seeds
+
+
+class FakeCrawler:
+    """Answers arun after the url's delay, raising for failing urls, and records how many seeds overlap."""
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.running = Counter()
+        self.peak = 0
+        self.peak_per_domain = Counter()
+        self.configs = []
+
+    async def arun(self, url, config=None, **kwargs):
+        domain = urlparse(url).netloc
+        self.configs.append(config)
+        self.running[domain] += 1
+        self.peak = max(self.peak, sum(self.running.values()))
+        self.peak_per_domain[domain] = max(self.peak_per_domain[domain], self.running[domain])
+        try:
+            await asyncio.sleep(self.delays.get(url, 0.01))
+            if url in self.failing:
+                raise RuntimeError("browser crashed")
+            return [url]
+        finally:
+            self.running[domain] -= 1
+
+
+def crawl(crawler, urls, max_concurrency, per_domain_concurrency):
+    async def collect():
+        return [seed async for seed in crawl_seeds(crawler, urls, object, max_concurrency, per_domain_concurrency)]
+    return asyncio.run(collect())
+
+
+def test_global_and_per_domain_limits_hold():
+    urls = [f"https://{host}.gov.sg/{i}" for host in ("a", "b", "c") for i in range(4)]
+    crawler = FakeCrawler({})
+    seeds = crawl(crawler, urls, max_concurrency=4, per_domain_concurrency=2)
+
+    assert sorted(url for url, _, _ in seeds) == sorted(urls)
+    assert crawler.peak == 4
+    assert max(crawler.peak_per_domain.values()) == 2
+    # Every seed gets its own config
+    assert len(set(map(id, crawler.configs))) == len(urls)
+
+
+def test_seeds_are_yielded_in_completion_order():
+    slow, medium, fast = "https://a.gov.sg/slow", "https://b.gov.sg/medium", "https://c.gov.sg/fast"
+    crawler = FakeCrawler({slow: 0.15, medium: 0.08, fast: 0.01})
+    seeds = crawl(crawler, [slow, medium, fast], max_concurrency=3, per_domain_concurrency=1)
+
+    assert [url for url, _, _ in seeds] == [fast, medium, slow]
+    assert [results for _, results, _ in seeds] == [[fast], [medium], [slow]]
+    assert seeds[2][2] >= 0.15
+
+
+def test_a_failing_seed_does_not_stop_the_crawl():
+    broken, fine = "https://a.gov.sg/broken", "https://a.gov.sg/fine"
+    crawler = FakeCrawler({broken: 0.01, fine: 0.05}, failing=[broken])
+    seeds = crawl(crawler, [broken, fine], max_concurrency=2, per_domain_concurrency=2)
+
+    assert [(url, results) for url, results, _ in seeds] == [(broken, []), (fine, [fine])]
+    assert seeds[0][2] >= 0.01
@@ -0,0 +1,60 @@
+import json
+
+from src.common.crawl_checkpoint import CrawlCheckpoint
+
+SEEDS = ["https://example.gov.sg/a", "https://example.gov.sg/b", "https://example.gov.sg/c"]
+
+
+def page(url):
+    return {url: {"records": [{"name": url}]}}
+
+
+def test_resumes_finished_seeds(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = CrawlCheckpoint(path, SEEDS)
+    checkpoint.record_seed(SEEDS[0], page(SEEDS[0] + "/1"))
+    checkpoint.record_seed(SEEDS[1], {}, success=False)
+
+    resumed = CrawlCheckpoint(path, SEEDS).completed_seeds()
+    assert resumed == {SEEDS[0]: page(SEEDS[0] + "/1")}
+
+
+def test_recovers_from_a_torn_journal(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = CrawlCheckpoint(path, SEEDS)
+    checkpoint.record_seed(SEEDS[0], page(SEEDS[0] + "/1"))
+    intact = path.read_bytes()
+    # The process died while appending the next seed: one page line made it, the next is cut short
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"seed": SEEDS[1], "page": SEEDS[1] + "/1", "entry": {"records": []}}) + "\n")
+        f.write('{"seed": "' + SEEDS[1] + '", "page": "' + SEEDS[1][:10])
+
+    resumed = CrawlCheckpoint(path, SEEDS)
+    assert resumed.completed_seeds() == {SEEDS[0]: page(SEEDS[0] + "/1")}
+    assert path.read_bytes() == intact
+
+    # Later appends stay readable
+    resumed.record_seed(SEEDS[1], page(SEEDS[1] + "/2"))
+    assert list(CrawlCheckpoint(path, SEEDS).completed_seeds()) == SEEDS[:2]
+
+
+def test_a_different_seed_list_starts_over(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    CrawlCheckpoint(path, SEEDS).record_seed(SEEDS[0], page(SEEDS[0]))
+    assert CrawlCheckpoint(path, SEEDS[:2]).completed_seeds() == {}
+
+
+def test_finish_removes_the_journal(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = CrawlCheckpoint(path, SEEDS)
+    checkpoint.finish()
+    assert not path.exists()
+
+
+def test_resumed_runs_reclaim_the_pages_finished_seeds_claimed(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = CrawlCheckpoint(path, SEEDS)
+    checkpoint.record_seed(SEEDS[0], page(SEEDS[0] + "/1"), claimed=[SEEDS[0] + "/1", SEEDS[0] + "/failed"])
+    checkpoint.record_seed(SEEDS[1], {}, success=False, claimed=[SEEDS[1] + "/1"])
+
+    assert CrawlCheckpoint(path, SEEDS).claimed_pages() == [SEEDS[0] + "/1", SEEDS[0] + "/failed"]
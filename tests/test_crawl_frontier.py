@@ -0,0 +1,35 @@
+import pytest
+
+from src.common.crawl_frontier import CrawlFrontier, canonicalize_url, repair_nested_link
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://WWW.Example.gov.sg:443/grants/", "https://www.example.gov.sg/grants"),
+    ("http://example.gov.sg:8080//a///b/#section", "http://example.gov.sg:8080/a/b"),
+    ("https://example.gov.sg/search?b=2&utm_source=mail&a=1&gclid=x", "https://example.gov.sg/search?a=1&b=2"),
+    ("https://example.gov.sg/page?empty=", "https://example.gov.sg/page?empty="),
+    ("https:/example.gov.sg/collapsed", "https://example.gov.sg/collapsed"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_relative_links_resolve_against_the_base():
+    assert canonicalize_url("../funding/", "https://example.gov.sg/grants/list") == "https://example.gov.sg/funding"
+
+
+def test_nested_links_are_repaired():
+    assert repair_nested_link("https://www.gobusiness.gov.sg/gov-assist/grants/<https:/www.mas.gov.sg/schemes>") == \
+        "https://www.mas.gov.sg/schemes"
+    assert canonicalize_url("https://www.enterprisesg.gov.sg/</financial-support/mra>") == \
+        "https://www.enterprisesg.gov.sg/financial-support/mra"
+
+
+def test_frontier_claims_each_page_once():
+    frontier = CrawlFrontier()
+    frontier.mark_seen(["https://example.gov.sg/done/"])
+    seeds = frontier.claim_seeds(["https://example.gov.sg/a", "https://EXAMPLE.gov.sg/a/#top", "https://example.gov.sg/b"])
+    assert seeds == ["https://example.gov.sg/a", "https://example.gov.sg/b"]
+    assert not frontier.claim("https://example.gov.sg/done")
+    assert frontier.claim("https://example.gov.sg/c")
+    assert frontier.duplicates == 2
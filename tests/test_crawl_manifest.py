@@ -0,0 +1,59 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.common.crawl_manifest import CrawlManifest
+
+
+def serve(etags, check):
+    """Run check(base_url) against a local server whose pages carry the given current ETags."""
+    async def page(request):
+        etag = etags[request.match_info["name"]]
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(text="page", headers={"ETag": etag})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/{name}", page)
+        async with TestServer(app) as server:
+            return await check(str(server.make_url("")).rstrip("/"))
+    return asyncio.run(run())
+
+
+def test_seeds_whose_pages_all_answer_304_are_unchanged(tmp_path):
+    manifest = CrawlManifest(str(tmp_path / "manifest.json"))
+
+    async def check(site):
+        manifest.record_page("a", f"{site}/a1", {"ETag": '"1"'}, "A1", [])
+        manifest.record_page("a", f"{site}/a2", {"ETag": '"1"'}, "A2", [])
+        manifest.record_page("b", f"{site}/b1", {"ETag": '"1"'}, "B1", [])
+        manifest.record_page("c", f"{site}/c1", {}, "C1", [])
+        return await manifest.unchanged_seeds(["a", "b", "c", "new"])
+
+    unchanged = serve({"a1": '"1"', "a2": '"1"', "b1": '"2"', "c1": '"1"'}, check)
+    # b1 changed, c1 has no validator to ask with, and "new" was never crawled
+    assert unchanged == {"a"}
+
+
+def test_record_page_reports_content_changes(tmp_path):
+    manifest = CrawlManifest(str(tmp_path / "manifest.json"))
+    assert manifest.record_page("a", "http://site/a1", {}, "First version", [{"name": "PSG"}])
+    assert not manifest.record_page("a", "http://site/a1", {"ETag": '"2"'}, "First version", [{"name": "PSG"}])
+    assert manifest.record_page("a", "http://site/a1", {}, "Second version", [{"name": "EDG"}])
+    assert manifest.seed_records("a") == [{"name": "EDG"}]
+
+
+def test_round_trip_drops_seeds_no_longer_listed(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = CrawlManifest(path)
+    manifest.record_page("a", "http://site/shared", {}, "Shared", [{"name": "PSG"}])
+    manifest.record_page("b", "http://site/shared", {}, "Shared", [{"name": "PSG"}])
+    manifest.record_page("b", "http://site/b1", {}, "B1", [{"name": "EDG"}])
+    manifest.save()
+
+    manifest = CrawlManifest(path)
+    manifest.retain_seeds(["a"])
+    assert list(manifest.pages) == ["http://site/shared"]
+    assert manifest.records() == [{"name": "PSG"}]
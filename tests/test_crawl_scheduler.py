@@ -0,0 +1,79 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+from crawl4ai.models import CrawlResult
+
+from src.common import crawl_scheduler
+from src.common.crawl_scheduler import CrawlScheduler, HostState, TokenBucket, retry_after_seconds
+
+URL = "https://example.gov.sg/grants"
+
+
+class FakeCrawler:
+    """Answers arun with the given (status, headers) responses in turn."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def arun(self, url, config=None, **kwargs):
+        status, headers = self.responses[self.calls]
+        self.calls += 1
+        return [CrawlResult(url=url, html="", success=status == 200, status_code=status, response_headers=headers)]
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    async def acquire(bucket, times):
+        started = time.monotonic()
+        for _ in range(times):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(acquire(TokenBucket(rate=20, capacity=3), 3)) < 0.04
+    # Two more requests past the burst wait about 1 / rate each
+    assert 0.08 < asyncio.run(acquire(TokenBucket(rate=20, capacity=3), 5)) < 0.3
+
+
+def test_retry_after_reads_seconds_and_http_dates():
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert 25 < retry_after_seconds({"retry-after": formatdate(time.time() + 30, usegmt=True)}) <= 30
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    assert retry_after_seconds({}) is None
+
+
+def test_throttled_hosts_slow_down():
+    host = HostState(rate=4.0, burst=4, max_concurrency=4)
+    host.limit = 4.0
+    host.on_failure(throttled=True)
+    assert (host.limit, host.bucket.rate, host.throttled) == (2.0, 2.0, 1)
+
+
+def test_retries_honour_retry_after(monkeypatch):
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(crawl_scheduler.asyncio, "sleep", sleep)
+    monkeypatch.setattr(crawl_scheduler.random, "uniform", lambda low, high: low)
+    scheduler = CrawlScheduler(requests_per_second=1000, retries=2, respect_robots=False)
+    crawler = FakeCrawler((429, {"Retry-After": "5"}), (503, {}), (200, {}))
+
+    result = asyncio.run(scheduler.fetch(crawler, URL))
+    assert result.success
+    assert delays == [5.0, 0.0]
+    assert scheduler.hosts["example.gov.sg"].retries == 2
+    assert scheduler.failed_pages == {}
+
+
+def test_permanent_failures_are_not_retried():
+    scheduler = CrawlScheduler(requests_per_second=1000, retries=2, respect_robots=False)
+    crawler = FakeCrawler((404, {}))
+
+    result = asyncio.run(scheduler.fetch(crawler, URL))
+    assert not result.success
+    assert crawler.calls == 1
+    assert scheduler.failed_pages == {URL: "HTTP 404"}
+    scheduler.record_seed(URL, [result])
+    assert scheduler.report()["failed_seeds"] == {URL: "HTTP 404"}
@@ -0,0 +1,55 @@
+import csv
+import filecmp
+
+import pytest
+
+from src.benchmarks.merge_benchmark import legacy_merge_csv_records_by_name, write_synthetic_csv
+from src.common.csv_merge import SET_THRESHOLD, merge_csv_records_by_name, parse_cell
+
+
+def write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.mark.parametrize("external_sort", [False, True])
+def test_matches_the_legacy_merge(tmp_path, external_sort):
+    source = tmp_path / "grants.csv"
+    write_synthetic_csv(source, rows=3000, keys=60)
+    legacy, merged = tmp_path / "legacy.csv", tmp_path / "merged.csv"
+    legacy_merge_csv_records_by_name(source, legacy, "incentive_name")
+    merge_csv_records_by_name(source, merged, "incentive_name", external_sort=external_sort, chunk_rows=250)
+    assert filecmp.cmp(legacy, merged, shallow=False)
+
+
+def test_matches_the_legacy_merge_on_mixed_cells(tmp_path):
+    # Lists past SET_THRESHOLD items, escaped quotes, a list meeting a string and cells that only look like lists
+    many = [f"Item {i}" for i in range(SET_THRESHOLD + 5)]
+    rows = [
+        {"name": "A", "tags": str(many[:20]), "notes": "first", "other": "[not a list"},
+        {"name": "A", "tags": str(many[10:] + ["it's"]), "notes": "second\nfirst", "other": "[1, 2]"},
+        {"name": "A", "tags": "loose", "notes": "first", "other": "[2, 3]"},
+        {"name": "", "tags": "['dropped']", "notes": "no key", "other": ""},
+        {"name": "B", "tags": "plain", "notes": "", "other": "['x']"},
+        {"name": "B", "tags": "['plain', 'more']", "notes": "b", "other": "y"},
+    ]
+    source = tmp_path / "rows.csv"
+    write_rows(source, rows)
+    assert merge_csv_records_by_name(source) == legacy_merge_csv_records_by_name(source)
+
+
+def test_parse_cell():
+    assert parse_cell("['a', \"b\"]") == ["a", "b"]
+    assert parse_cell("['it\\'s']") == ["it's"]
+    assert parse_cell("[1, [2]]") == [1, [2]]
+    assert parse_cell("[broken") == "[broken"
+    assert parse_cell("[not, python]") == "[not, python]"
+
+
+def test_external_sort_requires_an_output_path(tmp_path):
+    source = tmp_path / "rows.csv"
+    write_rows(source, [{"name": "A"}])
+    with pytest.raises(ValueError):
+        merge_csv_records_by_name(source, external_sort=True)
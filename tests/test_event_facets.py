@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+from src.events_listing_tool.event_facets import parse_date_range, parse_filter_text, validate_filters
+
+
+def test_iso_range():
+    assert parse_date_range("2025-06-16 to 2025-06-20") == (date(2025, 6, 16), date(2025, 6, 20))
+
+
+def test_day_range_within_a_month():
+    assert parse_date_range("9-10 July 2025") == (date(2025, 7, 9), date(2025, 7, 10))
+
+
+def test_start_without_year_takes_the_end_year():
+    assert parse_date_range("9 July - 2 August 2025") == (date(2025, 7, 9), date(2025, 8, 2))
+
+
+def test_start_without_year_rolls_back_across_new_year():
+    assert parse_date_range("28 Dec - 2 Jan 2026") == (date(2025, 12, 28), date(2026, 1, 2))
+    assert parse_date_range("December 30 to January 3, 2026") == (date(2025, 12, 30), date(2026, 1, 3))
+
+
+def test_month_without_day_spans_the_month():
+    assert parse_date_range("February 2024") == (date(2024, 2, 1), date(2024, 2, 29))
+
+
+def test_unreadable_dates():
+    assert parse_date_range(None) == (None, None)
+    assert parse_date_range(float("nan")) == (None, None)
+    assert parse_date_range("To be announced") == (None, None)
+    assert parse_date_range("28 Dec") == (None, None)
+
+
+def test_parse_filter_text():
+    assert parse_filter_text("upcoming cost=free date_from=2026-01-05 capability_area=innovation,internationalisation") == {
+        "upcoming": True, "cost": ["free"], "date_from": "2026-01-05",
+        "capability_area": ["innovation", "internationalisation"]}
+
+
+def test_parse_filter_text_rejects_typos_and_bad_dates():
+    with pytest.raises(ValueError, match="Unknown filters upcomng"):
+        parse_filter_text("upcomng")
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        parse_filter_text("date_from=tomorrow")
+
+
+@pytest.mark.parametrize("value", [5, True, {"free": 1}])
+def test_validate_filters_rejects_facet_values_that_are_not_strings_or_lists(value):
+    with pytest.raises(ValueError, match="cost must be a string or a list"):
+        validate_filters({"cost": value})
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from src.common.extraction_cache import CachedExtractionStrategy, ExtractionCache
+
+
+class ScriptedStrategy:
+    """Stands in for LLMExtractionStrategy, answering each call with the next scripted blocks."""
+
+    input_format = "markdown"
+
+    def __init__(self, *answers):
+        self.instruction = "Extract the scheme"
+        self.schema = {"properties": {"name": {"type": "string"}}}
+        self.llm_config = SimpleNamespace(provider="azure/gpt-4o")
+        self.answers = list(answers)
+        self.calls = []
+
+    def run(self, url, sections, *q, **kwargs):
+        self.calls.append((url, q, kwargs))
+        return self.answers.pop(0)
+
+
+def test_hit_skips_the_model(tmp_path):
+    strategy = ScriptedStrategy([{"name": "PSG", "error": False}])
+    cached = CachedExtractionStrategy(strategy, ExtractionCache(str(tmp_path)))
+
+    first = cached.run("https://agency.gov.sg/psg", ["# PSG\n\nFunds solutions."])
+    # Only whitespace differs, the page hashes the same
+    second = cached.run("https://agency.gov.sg/psg", ["# PSG   \n\n\n\nFunds solutions.\n"])
+
+    assert first == second == [{"name": "PSG", "error": False}]
+    assert len(strategy.calls) == 1
+    assert cached.cache.stats()["hits"] == 1
+
+
+def test_error_records_are_not_cached(tmp_path):
+    strategy = ScriptedStrategy([{"index": 0, "error": True, "content": ["timeout"]}],
+                                [{"name": "PSG", "error": False}])
+    cached = CachedExtractionStrategy(strategy, ExtractionCache(str(tmp_path)))
+
+    assert cached.run("https://agency.gov.sg/psg", ["# PSG"])[0]["error"] is True
+    assert cached.run("https://agency.gov.sg/psg", ["# PSG"]) == [{"name": "PSG", "error": False}]
+    assert len(strategy.calls) == 2
+
+
+def test_extra_arguments_reach_the_strategy(tmp_path):
+    strategy = ScriptedStrategy([{"name": "PSG", "error": False}])
+    cached = CachedExtractionStrategy(strategy, ExtractionCache(str(tmp_path)))
+
+    cached.run("https://agency.gov.sg/psg", ["# PSG"], "extra", verbose=True)
+
+    assert strategy.calls == [("https://agency.gov.sg/psg", ("extra",), {"verbose": True})]
@@ -0,0 +1,60 @@
+from src.general_info_adviser_tool.guide_index import GuideIndex, chunk_guide, split_sections
+
+TAX = ("Corporate income tax in Vietnam is charged at a standard rate of twenty percent on taxable profits, "
+       "with preferential rates for projects in encouraged sectors and locations such as high technology parks.")
+SETUP = ("Foreign investors setting up a company in Vietnam first obtain an investment registration certificate "
+         "and then an enterprise registration certificate before opening a capital account with a local bank.")
+HK_TAX = ("Profits tax in Hong Kong is levied on profits arising in or derived from Hong Kong, with a two tier "
+          "system that charges a lower rate on the first two million dollars of assessable profits each year.")
+MENU = "* [Home](/)\n* [Guides](/guides)\n* [Contact](/contact)"
+
+
+def page(url, body):
+    return f"{body}\nAbove data is from **Source url:** {url}\n"
+
+
+def write_guides(tmp_path):
+    vietnam = tmp_path / "business_guide_vietnam.txt"
+    vietnam.write_text(
+        page("https://example.com/doing-business-guide/vietnam/taxation",
+             f"{MENU}\n\n# Taxation\n\n## Corporate Income Tax\n\n{TAX}")
+        + page("https://example.com/doing-business-guide/vietnam/setup", f"{MENU}\n\n# Company Setup\n\n{SETUP}")
+        + page("https://example.com/doing-business-guide/vietnam/missing", "# 404 Page not found\n\n" + SETUP),
+        encoding="utf-8")
+    hong_kong = tmp_path / "business_guide_hong_kong.txt"
+    hong_kong.write_text(page("https://example.com/other", f"# Profits Tax\n\n{HK_TAX}"), encoding="utf-8")
+    return [str(vietnam), str(hong_kong)]
+
+
+def test_sections_carry_their_heading_path():
+    sections = list(split_sections("Intro\n# Tax\nA\n## Corporate\nB\n# Setup\nC"))
+    assert [path for path, _ in sections] == ["", "Tax", "Tax > Corporate", "Setup"]
+
+
+def test_chunks_skip_menus_and_error_pages(tmp_path):
+    vietnam, _ = write_guides(tmp_path)
+    chunks = list(chunk_guide(vietnam))
+    assert [(chunk["section"], chunk["text"]) for chunk in chunks] == [
+        ("Taxation > Corporate Income Tax", TAX), ("Company Setup", SETUP)]
+    assert {chunk["country"] for chunk in chunks} == {"Vietnam"}
+
+
+def test_search_filters_by_the_countries_a_query_names(tmp_path):
+    index = GuideIndex.build(write_guides(tmp_path) * 2)
+    # Guides indexed twice keep one copy of each chunk
+    assert len(index.chunks) == 3
+    assert index.countries == ["Hong Kong", "Vietnam"]
+
+    hits = index.search("profits tax rate in Vietnam")
+    assert {hit["country"] for hit in hits} == {"Vietnam"}
+    assert hits[0]["text"] == TAX
+    assert index.search("profits tax rate")[0]["country"] == "Hong Kong"
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = GuideIndex.build(write_guides(tmp_path), fingerprint="abc")
+    index.save(str(tmp_path / "guides"))
+    loaded = GuideIndex.load(str(tmp_path / "guides"))
+    assert loaded.chunks == index.chunks
+    assert loaded.index.fingerprint == "abc"
+    assert loaded.search("investment registration certificate") == index.search("investment registration certificate")
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from src.grants_stocktake_tool.incentive_facets import IncentiveIndex, parse_amount, parse_funding_support, \
+    validate_filters
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("S$2M", 2e6), ("$400K", 4e5), ("SGD 250,000", 250000.0), ("S$100 million", 1e8), ("100k", 1e5),
+    (5000, 5000.0), ("a lot", None), (float("nan"), None),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("70% Co-funding of eligible expenses with a grant cap of up to S$2M", (2e6, 70.0)),
+    ("Up to 50% for SMEs, 30 per cent for non-SMEs, capped at $400K or $100K per project", (4e5, 50.0)),
+    ("Funding of up to SGD 250,000", (250000.0, None)),
+    ("Covers 150% of costs", (None, None)),
+    ("Support is assessed case by case", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_funding_support(text, expected):
+    assert parse_funding_support(text) == expected
+
+
+def test_validate_filters():
+    assert validate_filters({"industry": "Financial Service", "min_funding_cap": "S$100K",
+                             "min_support_percent": "50%", "include_unknown_funding": "no"}) == {
+        "industry": ["financial service"], "min_funding_cap": 1e5, "min_support_percent": 50.0,
+        "include_unknown_funding": False}
+    with pytest.raises(ValueError, match="Unknown filters"):
+        validate_filters({"sector": "retail"})
+    with pytest.raises(ValueError, match="min_funding_cap"):
+        validate_filters({"min_funding_cap": "plenty"})
+    with pytest.raises(ValueError, match="industry must be a string or a list"):
+        validate_filters({"industry": 5})
+
+
+def test_incentive_index_filters_facets_and_funding():
+    df = pd.DataFrame({
+        "industry": ["['Financial Service']", "['All']", "['Retail']"],
+        "incentive_type": ["Grant", "Grant", "Loan"],
+        "funding_support": ["Up to S$200K", "Case by case", "50% of costs up to $50K"],
+    })
+    index = IncentiveIndex(df)
+    assert index.rows({"industry": "financial service"}) == {0, 1}
+    assert index.rows({"min_funding_cap": "100k"}) == {0, 1}
+    assert index.rows({"min_funding_cap": "100k", "include_unknown_funding": False}) == {0}
+    assert index.rows({"incentive_type": "loan", "min_support_percent": 40}) == {2}
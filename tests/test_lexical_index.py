@@ -0,0 +1,35 @@
+from src.common.lexical_index import BM25Index, tokenize
+
+DOCUMENTS = [
+    "Productivity Solutions Grant for digital solutions and automation",
+    "Market Readiness Assistance for overseas expansion",
+    "Enterprise Development Grant for innovation, automation and overseas growth projects",
+]
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("The Grants for SMEs and Businesses") == ["grant", "sme", "businesse"]
+    assert tokenize("access class") == ["access", "class"]
+
+
+def test_search_ranks_by_bm25():
+    index = BM25Index.build(DOCUMENTS)
+    hits = index.search("overseas expansion")
+    assert [doc_id for doc_id, _ in hits] == [1, 2]
+    assert hits[0][1] > hits[1][1]
+    assert index.search("unrelated words") == []
+
+
+def test_search_respects_allowed_ids_and_top_k():
+    index = BM25Index.build(DOCUMENTS)
+    assert [doc_id for doc_id, _ in index.search("automation", allowed_ids={2})] == [2]
+    assert len(index.search("grant automation overseas", top_k=2)) == 2
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = BM25Index.build(DOCUMENTS, fingerprint="abc")
+    path = tmp_path / "index.json"
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.fingerprint == "abc"
+    assert loaded.search("automation grant") == index.search("automation grant")
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.common import llm_stream
+from src.common.llm_stream import StubLLM, stream_completion, use_stub_llm
+from src.common.response_cache import ResponseCache
+from src.grants_recommender_tool import grant_recommender
+from src.grants_recommender_tool.contants import LLM_CONCURRENCY
+
+
+def offline(*args, **kwargs):
+    raise AssertionError("litellm was called")
+
+
+def test_sync_and_streamed_recommendations_use_the_stub(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_stream, "_stub_llm", None)
+    monkeypatch.setattr(grant_recommender, "response_cache", ResponseCache(str(tmp_path / "cache")))
+    # Nothing may reach litellm while the stub is in use
+    monkeypatch.setattr(llm_stream, "completion", offline)
+    monkeypatch.setattr(llm_stream, "acompletion", offline)
+    stub = use_stub_llm(StubLLM())
+    data = tmp_path / "grants.csv"
+    pd.DataFrame({"name": ["Productivity Solutions Grant"], "description": ["Digital solutions"]}).to_csv(data, index=False)
+
+    answer = grant_recommender.recommend("digital grants", str(data))
+    streamed = asyncio.run(grant_recommender.recommend_async("overseas grants", str(data)))
+
+    assert answer.startswith("Stub answer for: digital grants")
+    assert streamed.startswith("Stub answer for: overseas grants")
+    assert stub.calls == 2
+
+
+def chunk(content, delta=True, choices=True):
+    """A litellm streaming chunk, optionally without a delta or without any choices."""
+    delta = SimpleNamespace(content=content, role=None) if delta else None
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)] if choices else [])
+
+
+async def collect(stream):
+    return [token async for token in stream]
+
+
+def test_stream_completion_skips_chunks_without_text(monkeypatch):
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+
+        async def chunks():
+            for item in [chunk(None), chunk("Hello"), chunk(""), chunk(None, delta=False), chunk(None, choices=False),
+                         chunk(" world")]:
+                yield item
+        return chunks()
+
+    monkeypatch.setattr(llm_stream, "_stub_llm", None)
+    monkeypatch.setattr(llm_stream, "acompletion", acompletion)
+    tokens = asyncio.run(collect(stream_completion("azure/gpt-4o", [{"role": "user", "content": "hi"}], 0.2)))
+
+    assert tokens == ["Hello", " world"]
+    assert calls[0]["stream"] is True and calls[0]["temperature"] == 0.2
+
+
+def test_limiter_caps_concurrent_calls_at_llm_concurrency(monkeypatch):
+    streaming = 0
+    peak = 0
+
+    async def acompletion(**kwargs):
+        async def chunks():
+            nonlocal streaming, peak
+            streaming += 1
+            peak = max(peak, streaming)
+            await asyncio.sleep(0.01)
+            yield chunk("answer")
+            streaming -= 1
+        return chunks()
+
+    async def many_calls():
+        streams = [collect(stream_completion("azure/gpt-4o", [], 0.2, grant_recommender.llm_limiter))
+                   for _ in range(LLM_CONCURRENCY * 3)]
+        return await asyncio.gather(*streams)
+
+    monkeypatch.setattr(llm_stream, "_stub_llm", None)
+    monkeypatch.setattr(llm_stream, "acompletion", acompletion)
+    answers = asyncio.run(many_calls())
+
+    assert answers == [["answer"]] * (LLM_CONCURRENCY * 3)
+    assert peak == LLM_CONCURRENCY
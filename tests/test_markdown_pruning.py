@@ -0,0 +1,45 @@
+from src.common.markdown_pruning import MarkdownPruner
+
+NAV = "Home About us Grants Events Contact us Media centre"
+FOOTER = "Copyright 2025 Enterprise Singapore. All rights reserved. Terms of use and privacy statement."
+
+
+def page(body):
+    return f"{NAV}\n\n# Scheme\n\n{body}\n\n{FOOTER}"
+
+
+def test_blocks_repeated_across_the_domain_are_removed():
+    pruner = MarkdownPruner(verbose=False)
+    pages = [(f"https://agency.gov.sg/schemes/{i}", page(f"Scheme {i} funds up to 70% of qualifying project costs."))
+             for i in range(3)]
+
+    pruned = pruner.prune_pages(pages)
+
+    assert pruned[0][1] == "# Scheme\n\nScheme 0 funds up to 70% of qualifying project costs."
+    assert pruner.tokens_after < pruner.tokens_before
+
+
+def test_nothing_is_removed_before_min_pages_are_seen():
+    pruner = MarkdownPruner(verbose=False)
+    pages = [(f"https://agency.gov.sg/schemes/{i}", page(f"Scheme {i}.")) for i in range(2)]
+    assert pruner.prune_pages(pages) == pages
+
+
+def test_keyword_sections_are_kept_first_within_the_token_budget():
+    history = " ".join(["The scheme was launched many years ago and has been revised several times since."] * 5)
+    markdown = (f"# Productivity Solutions Grant\n\nFunds digital solutions.\n\n# History\n\n{history}\n\n"
+                f"# Eligibility\n\nCompanies must be registered in Singapore.")
+    pruner = MarkdownPruner(keywords=["eligib"], token_budget=30, verbose=False)
+
+    pruned = pruner.prune("https://agency.gov.sg/psg", markdown)
+
+    assert pruned == ("# Productivity Solutions Grant\n\nFunds digital solutions.\n\n# History\n\n"
+                      "# Eligibility\n\nCompanies must be registered in Singapore.")
+
+
+def test_blocks_without_words_are_kept():
+    pruner = MarkdownPruner(verbose=False)
+    pages = [(f"https://agency.gov.sg/schemes/{i}", page("| — | — |\n\n最高资助额为项目成本的百分之七十")) for i in range(3)]
+    pruned = pruner.prune_pages(pages)[2][1]
+    assert "| — | — |" in pruned
+    assert "最高资助额为项目成本的百分之七十" in pruned
@@ -0,0 +1,63 @@
+import csv
+
+from src.common.near_duplicates import cluster_names, lsh_params, merge_near_duplicates, name_features
+
+
+def clusters(merges, names):
+    """Canonical name of every name, itself when it was not merged."""
+    return {name: merges[name][0] if name in merges else name for name in names}
+
+
+def test_name_features_drop_acronyms_and_keep_numbers():
+    assert name_features("FSTI 3.0 – AI Grant (FSTI)")[0] == name_features("FSTI AI Grant")[0]
+    assert name_features("Grant Call II")[1] == frozenset({"ii"})
+
+
+def test_near_duplicate_names_merge():
+    names = ["Productivity Solutions Grant", "Productivity Solutions Grant (PSG)", "Market Readiness Assistance"]
+    assert cluster_names(names) == {"Productivity Solutions Grant (PSG)": ("Productivity Solutions Grant", 1.0)}
+
+
+def test_conflicting_numbers_never_merge():
+    assert cluster_names(["Enterprise Development Grant 2024", "Enterprise Development Grant 2025"]) == {}
+
+
+def test_name_without_numbers_does_not_bridge_numbered_names():
+    names = ["Maritime Innovation Grant Call", "Maritime Innovation Grant Call I", "Maritime Innovation Grant Call II"]
+    canonical = clusters(cluster_names(names), names)
+    assert canonical["Maritime Innovation Grant Call I"] != canonical["Maritime Innovation Grant Call II"]
+
+
+def test_numbered_cluster_rejects_other_numbers_in_any_order():
+    names = ["Enterprise Development Grant", "Enterprise Development Grant 2024", "Enterprise Development Grant 2025",
+             "Enterprise Development Grant 2024 (EDG)"]
+    canonical = clusters(cluster_names(names), names)
+    assert canonical["Enterprise Development Grant 2024"] != canonical["Enterprise Development Grant 2025"]
+    assert canonical["Enterprise Development Grant 2024 (EDG)"] == canonical["Enterprise Development Grant 2024"]
+
+
+def test_parenthetical_qualifiers_never_merge_with_other_qualifiers():
+    names = ["Enterprise Development Grant", "Enterprise Development Grant (Core)",
+             "Enterprise Development Grant (Market Access)", "Enterprise Development Grants (Core)",
+             "Enterprise Development Grant (EDG)"]
+    assert name_features("Enterprise Development Grant (Core)") == ("enterprise development grant", frozenset(), "core")
+    assert cluster_names(names) == {
+        "Enterprise Development Grants (Core)": ("Enterprise Development Grant (Core)", 1.0),
+        "Enterprise Development Grant (EDG)": ("Enterprise Development Grant", 1.0),
+    }
+
+
+def test_lsh_params_reach_target_recall():
+    bands, rows = lsh_params(0.85)
+    assert 1 - (1 - 0.85 ** rows) ** bands >= 0.95
+
+
+def test_merge_near_duplicates_rewrites_csv(tmp_path):
+    path = tmp_path / "grants.csv"
+    path.write_text("name,benefits\nProductivity Solutions Grant,Up to 50%\n"
+                    "Productivity Solutions Grant (PSG),Capped at S$30000\n", encoding="utf-8")
+    merges = merge_near_duplicates(str(path), merge_key="name")
+    assert list(merges) == ["Productivity Solutions Grant (PSG)"]
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["name"] for row in rows] == ["Productivity Solutions Grant"]
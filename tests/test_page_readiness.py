@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from src.common.page_readiness import MIN_SAMPLES, PageReadiness
+
+
+class Config:
+    def clone(self, **kwargs):
+        return SimpleNamespace(**kwargs)
+
+
+def page(url, wait_ms, timed_out=False):
+    timeout = ' data-ready-timeout="1"' if timed_out else ""
+    return SimpleNamespace(url=url, success=True, metadata=None,
+                           html=f'<html lang="en" data-ready-ms="{wait_ms}"{timeout}><body></body></html>')
+
+
+def test_timeouts_are_learned_per_domain():
+    readiness = PageReadiness(quiet_ms=500, min_timeout_ms=1500, max_timeout_ms=10000)
+    for wait_ms in [800, 900, 1000, 1100, 4000]:
+        readiness.observe(page("https://slow.gov.sg/a", wait_ms))
+    for wait_ms in [510] * MIN_SAMPLES:
+        readiness.observe(page("https://static.gov.sg/a", wait_ms))
+    readiness.observe(page("https://new.gov.sg/a", 700))
+
+    assert readiness.timeout_ms("slow.gov.sg") == 6500  # p90 4000 * 1.5 + quiet period
+    assert readiness.timeout_ms("static.gov.sg") == 1500  # Raised to min_timeout_ms
+    assert readiness.timeout_ms("new.gov.sg") == 10000  # Too few samples yet
+
+
+def test_configure_waits_for_the_page_instead_of_a_fixed_delay():
+    readiness = PageReadiness(quiet_ms=500, max_timeout_ms=8000)
+    config = readiness.configure("https://example.gov.sg/grants", Config())
+    assert config.delay_before_return_html == 0
+    assert config.wait_for.startswith("js:")
+    assert ">= 500" in config.wait_for and "< 8000" in config.wait_for
+
+
+def test_observe_records_timeouts_and_persists_profiles(tmp_path):
+    path = str(tmp_path / "readiness.json")
+    readiness = PageReadiness(path)
+    result = page("https://example.gov.sg/a", 10000, timed_out=True)
+    assert readiness.observe(result) == 10000
+    assert result.metadata == {"ready_ms": 10000, "ready_timeout": True}
+    assert readiness.observe(SimpleNamespace(url="https://example.gov.sg/b", success=False, html="")) is None
+    readiness.save()
+
+    assert PageReadiness(path).profiles["example.gov.sg"] == {"waits_ms": [10000], "timeouts": 1, "pages": 1}
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src.common.prompt_table import data_heading, render_rows, truncate
+
+DF = pd.DataFrame({
+    "name": ["Productivity Solutions Grant", "Market Readiness Assistance"],
+    "sectors": ["['Retail', 'Logistics']", None],
+    "description": ["Funds pre-approved digital solutions, up to 50% of costs", ""],
+    "link": ["https://example.gov.sg/psg", "https://example.gov.sg/mra"],
+})
+
+
+def test_truncate_cuts_at_a_word_boundary():
+    assert truncate("Funds pre-approved digital solutions", 22) == "Funds pre-approved…"
+    assert truncate("Short", 22) == "Short"
+
+
+def test_jsonl_drops_empty_cells_and_reads_list_literals():
+    assert render_rows(DF, "jsonl", excluded_fields=["link"]).splitlines() == [
+        '{"name":"Productivity Solutions Grant","sectors":["Retail","Logistics"],'
+        '"description":"Funds pre-approved digital solutions, up to 50% of costs"}',
+        '{"name":"Market Readiness Assistance"}',
+    ]
+
+
+def test_csv_joins_lists_and_keeps_only_used_columns():
+    assert render_rows(DF[["name", "sectors", "description"]].iloc[[1]], "csv") == \
+        "name\nMarket Readiness Assistance"
+    assert render_rows(DF, "csv", excluded_fields=["description", "link"]) == (
+        "name,sectors\n"
+        "Productivity Solutions Grant,Retail; Logistics\n"
+        "Market Readiness Assistance,")
+
+
+def test_kv_applies_field_budgets():
+    assert render_rows(DF.iloc[[0]], "kv", excluded_fields=["link"], field_budgets={"description": 24}) == (
+        "name: Productivity Solutions Grant\n"
+        "sectors: Retail; Logistics\n"
+        "description: Funds pre-approved…")
+
+
+def test_table_is_the_dataframe_string():
+    assert render_rows(DF, "table", excluded_fields=["link"]) == DF.drop(columns=["link"]).to_string()
+
+
+def test_unknown_encodings_are_rejected():
+    with pytest.raises(ValueError):
+        render_rows(DF, "xml")
+    assert data_heading("Grants", "jsonl") == "Grants Data (one JSON object per line)"
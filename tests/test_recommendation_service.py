@@ -0,0 +1,146 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.common import llm_stream
+from src.common.llm_stream import StubLLM, use_stub_llm
+from src.common.response_cache import ResponseCache
+from src.events_listing_tool import events_recommender
+from src.grants_recommender_tool import grant_recommender
+from src.recommendation_service import server
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    """Routes backed by small CSV exports in tmp_path, fresh response caches and the offline stub LLM."""
+    grants_csv = tmp_path / "grants.csv"
+    pd.DataFrame({
+        "name": ["Productivity Solutions Grant", "Market Readiness Assistance"],
+        "description": ["Funds digital solutions for SMEs", "Supports overseas expansion"],
+    }).to_csv(grants_csv, index=False)
+    events_csv = tmp_path / "events.csv"
+    pd.DataFrame({
+        "event_title": ["Go Digital Clinic", "Export Masterclass"],
+        "cost": ["Free", "Paid"],
+        "event_mode": ["Virtual", "Physical"],
+        "event_date": ["2030-03-01", "2030-04-01"],
+    }).to_csv(events_csv, index=False)
+
+    monkeypatch.setattr(server, "RECOMMENDERS", {
+        "grants": server.Recommender(grant_recommender, str(tmp_path / "grants.parquet"), str(grants_csv)),
+        "events": server.FacetedRecommender(events_recommender, str(tmp_path / "events.parquet"), str(events_csv)),
+    })
+    for module in (grant_recommender, events_recommender):
+        monkeypatch.setattr(module, "response_cache", ResponseCache(str(tmp_path / module.__name__)))
+    monkeypatch.setattr(llm_stream, "_stub_llm", None)
+    return use_stub_llm(StubLLM(token_delay=0.01))
+
+
+def call(service, *requests):
+    """Run each request(client) against a test server of the app and return their results."""
+    async def run():
+        async with TestClient(TestServer(server.create_app(service))) as client:
+            return [await request(client) for request in requests]
+    return asyncio.run(run())
+
+
+async def post(client, path, body):
+    response = await client.post(path, json=body)
+    return response.status, await (response.json() if response.status == 200 else response.text())
+
+
+def test_recommend_answers_then_serves_the_cached_answer(stub):
+    first, second = call(None, lambda client: post(client, "/recommend/grants", {"query": "digital grants"}),
+                         lambda client: post(client, "/recommend/grants", {"query": "Digital grants?"}))
+    assert first[0] == second[0] == 200
+    assert first[1]["answer"].startswith("Stub answer for: digital grants")
+    assert second[1]["answer"] == first[1]["answer"]
+    assert stub.calls == 1
+
+
+def test_recommend_streams_tokens(stub):
+    async def stream(client):
+        response = await client.post("/recommend/events", json={"query": "free events", "stream": True})
+        chunks = [chunk async for chunk in response.content.iter_any()]
+        return response.status, b"".join(chunks).decode()
+
+    [(status, text)] = call(None, stream)
+    assert status == 200
+    assert text.startswith("Stub answer for: free events")
+
+
+def test_batch_answers_every_query(stub):
+    [(status, body)] = call(None, lambda client: post(client, "/recommend/grants/batch",
+                                                      {"queries": ["digital grants", "overseas expansion"]}))
+    assert status == 200
+    assert [answer["query"] for answer in body["answers"]] == ["digital grants", "overseas expansion"]
+    assert stub.calls == 2
+
+
+def test_batch_needs_queries(stub):
+    [(status, _)] = call(None, lambda client: post(client, "/recommend/grants/batch", {"queries": []}))
+    assert status == 400
+
+
+def test_query_returns_matching_rows_without_the_model(stub):
+    [(status, body)] = call(None, lambda client: post(client, "/query/events", {"filters": {"cost": "free"}}))
+    assert status == 200
+    assert [row["event_title"] for row in body["results"]] == ["Go Digital Clinic"]
+    assert stub.calls == 0
+
+
+def test_query_needs_a_facet_index(stub):
+    [(status, _)] = call(None, lambda client: post(client, "/query/grants", {"filters": {"cost": "free"}}))
+    assert status == 400
+
+
+@pytest.mark.parametrize("filters", [{"cost": 5}, {"cost": True}, {"costs": "free"}, ["cost"]])
+def test_invalid_filters_are_a_bad_request(stub, filters):
+    [(status, _)] = call(None, lambda client: post(client, "/recommend/events", {"query": "events", "filters": filters}))
+    assert status == 400
+    assert stub.calls == 0
+
+
+def test_requests_beyond_the_queue_get_429(stub):
+    service = server.RecommendationService(max_concurrent=1, max_queued=0)
+
+    async def overflow(client):
+        first = asyncio.create_task(post(client, "/recommend/grants", {"query": "digital grants"}))
+        while not service.active:
+            await asyncio.sleep(0.01)
+        rejected = await post(client, "/recommend/grants", {"query": "overseas expansion"})
+        return (await first)[0], rejected[0]
+
+    [(first, rejected)] = call(service, overflow)
+    assert (first, rejected) == (200, 429)
+    assert service.rejected == 1
+
+
+def test_stats_report_each_response_cache_once(stub):
+    async def traffic(client):
+        await post(client, "/recommend/grants", {"query": "digital grants"})
+        await post(client, "/recommend/grants", {"query": "digital grants"})
+        response = await client.get("/stats")
+        return await response.json()
+
+    [stats] = call(None, traffic)
+    assert stats["requests"] == 2
+    assert stats["response_cache"][grant_recommender.__name__]["misses"] == 1
+    assert stats["response_cache"][grant_recommender.__name__]["memory_hits"] == 1
+    assert stats["response_cache"][events_recommender.__name__]["misses"] == 0
+
+
+def test_health(stub):
+    async def health(client):
+        response = await client.get("/health")
+        return response.status, await response.json()
+
+    assert call(None, health) == [(200, {"status": "ok"})]
+
+
+def test_missing_data_is_service_unavailable(stub, tmp_path):
+    (tmp_path / "grants.csv").unlink()
+    [(status, _)] = call(None, lambda client: post(client, "/recommend/grants", {"query": "digital grants"}))
+    assert status == 503
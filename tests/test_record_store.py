@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from src.common.csv_merge import SET_THRESHOLD
+from src.common.record_store import RecordStore, record_schema
+
+
+class Scheme(BaseModel):
+    name: str
+    description: Optional[str] = None
+    sectors: Optional[List[str]] = None
+
+
+def test_upserts_merge_like_the_csv_merge(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"), "schemes", Scheme, "name")
+    many = [f"Sector {i}" for i in range(SET_THRESHOLD + 5)]
+    store.upsert_many([{"name": "PSG", "description": "Funds solutions", "sectors": many[:20]},
+                       {"name": "EDG", "description": "Grows enterprises", "error": False}])
+    store.upsert_many([{"name": "PSG", "description": "Funds solutions", "sectors": many},
+                       {"name": "PSG", "description": "Up to 50% support", "sectors": ["Retail"]},
+                       {"name": "", "description": "No key"}])
+
+    assert store.records() == [
+        {"name": "PSG", "description": "Funds solutions\nUp to 50% support", "sectors": many + ["Retail"]},
+        {"name": "EDG", "description": "Grows enterprises", "error": "False"},
+    ]
+
+
+def test_a_string_meeting_a_list_becomes_a_list(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"), "schemes", Scheme, "name")
+    store.upsert_many([{"name": "PSG", "sectors": "Retail"}])
+    store.upsert_many([{"name": "PSG", "sectors": ["Retail", "Logistics"]}])
+    assert store.get("PSG") == {"name": "PSG", "sectors": ["Retail", "Logistics"]}
+
+
+def test_replace_keys_rebuilds_only_those_rows(tmp_path):
+    store = RecordStore(str(tmp_path / "records.db"), "schemes", Scheme, "name")
+    store.upsert_many([{"name": "PSG", "description": "Old"}, {"name": "EDG", "description": "Kept"},
+                       {"name": "MRA", "description": "Dropped"}])
+    written = store.replace_keys({"PSG", "MRA"}, [{"name": "PSG", "description": "New"},
+                                                  {"name": "EDG", "description": "Ignored"}])
+    assert written == 1
+    assert store.records() == [{"name": "EDG", "description": "Kept"}, {"name": "PSG", "description": "New"}]
+
+
+def test_the_schema_is_known_without_opening_a_store(tmp_path):
+    schema = record_schema(Scheme)
+    assert schema.names == ["name", "description", "sectors", "error"]
+    assert RecordStore(str(tmp_path / "records.db"), "schemes", Scheme, "name").schema == schema
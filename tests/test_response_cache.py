@@ -0,0 +1,53 @@
+from src.common.response_cache import ResponseCache, normalize_query
+
+
+def key(query, data_file):
+    return ResponseCache.key(query, "model", 0, "System prompt", str(data_file))
+
+
+def test_normalisation_keeps_every_word():
+    assert normalize_query("  What GRANTS can I apply for? ") == normalize_query("what grants can i apply for")
+    assert normalize_query("grants for SMEs from overseas") != normalize_query("grants for SMEs overseas")
+    assert normalize_query("grant") != normalize_query("grants")
+
+
+def test_memory_tier_evicts_the_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"), memory_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+
+    # "b" fell out of memory but is still answered from disk
+    assert cache.get("b") == "B"
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_changing_the_data_file_invalidates_answers(tmp_path):
+    data = tmp_path / "grants.csv"
+    data.write_text("name\nPSG\n")
+    cache = ResponseCache(str(tmp_path / "cache"))
+    cache.put(key("digital grants", data), "Answer")
+    assert cache.get(key("Digital grants!", data)) == "Answer"
+
+    data.write_text("name\nPSG\nEDG\n")
+    assert cache.get(key("digital grants", data)) is None
+
+
+def test_only_the_guides_in_a_directory_version_its_answers(tmp_path):
+    guides = tmp_path / "guides"
+    guides.mkdir()
+    (guides / "business_guide_india.txt").write_text("Tax rates")
+    cache = ResponseCache(str(tmp_path / "cache"))
+    cache.put(key("tax in india", guides), "Answer")
+
+    # The crawl's own state files sit next to the guides
+    (guides / "crawl_manifest.json").write_text("{}")
+    (guides / "crawl_report.json").write_text("{}")
+    assert cache.get(key("tax in india", guides)) == "Answer"
+
+    (guides / "business_guide_vietnam.txt").write_text("Payroll")
+    assert cache.get(key("tax in india", guides)) is None
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.common.tiered_fetch import PIN_AFTER_ESCALATIONS, TieredCrawler, needs_browser
+
+CONTENT = " ".join(["grant"] * 200)
+
+
+def result(url, markdown="", html="", success=True, status_code=200, error_message=None):
+    return SimpleNamespace(url=url, success=success, status_code=status_code, error_message=error_message,
+                           html=html, markdown=SimpleNamespace(raw_markdown=markdown), extracted_content=None)
+
+
+class FakeCrawler:
+    """Answers arun from {url: result} and counts the fetches."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    async def arun(self, url, config=None, **kwargs):
+        self.fetched.append(url)
+        return [self.pages[url]]
+
+
+def tiered(http_pages, browser_pages, path=None):
+    crawler = TieredCrawler(path, min_words=150)
+    crawler.http_crawler = FakeCrawler(http_pages)
+    crawler.browser = FakeCrawler(browser_pages)
+    return crawler
+
+
+def fetch(crawler, url):
+    return asyncio.run(crawler.arun(url))[0]
+
+
+def test_needs_browser_reasons():
+    assert needs_browser(result("u", CONTENT)) is None
+    assert needs_browser(result("u", "Loading")) == "only 1 words of content"
+    assert needs_browser(result("u", CONTENT, '<div id="root"></div>')) == "single-page app markers"
+    assert needs_browser(result("u", success=False, error_message="Timeout\nTraceback")) == "HTTP fetch failed (Timeout)"
+
+
+def test_content_pages_stay_on_http_and_empty_pages_escalate():
+    static, app = "https://static.gov.sg/a", "https://app.gov.sg/a"
+    crawler = tiered({static: result(static, CONTENT), app: result(app, "Loading")},
+                     {app: result(app, CONTENT)})
+
+    assert fetch(crawler, static).markdown.raw_markdown == CONTENT
+    assert fetch(crawler, app).markdown.raw_markdown == CONTENT
+    assert crawler.browser.fetched == [app]
+    assert crawler.pages == {"http": 1, "browser": 1}
+
+
+def test_final_http_errors_are_not_escalated():
+    url = "https://static.gov.sg/missing"
+    crawler = tiered({url: result(url, success=False, status_code=404)}, {})
+    assert fetch(crawler, url).status_code == 404
+    assert crawler.browser.fetched == []
+
+
+def test_domains_that_keep_escalating_are_pinned_to_the_browser(tmp_path):
+    path = str(tmp_path / "tiers.json")
+    urls = [f"https://app.gov.sg/{i}" for i in range(PIN_AFTER_ESCALATIONS + 1)]
+    crawler = tiered({url: result(url, "Loading") for url in urls}, {url: result(url, CONTENT) for url in urls}, path)
+    for url in urls:
+        fetch(crawler, url)
+
+    # Once pinned, the last page skips the HTTP fetch
+    assert crawler.http_crawler.fetched == urls[:PIN_AFTER_ESCALATIONS]
+    crawler.save()
+    assert TieredCrawler(path).pinned_to_browser("app.gov.sg")
+    assert not TieredCrawler(path).pinned_to_browser("static.gov.sg")
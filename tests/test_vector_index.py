@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.common.vector_index import HashingEmbedder, VectorIndex, semantic_candidates, sync_csv_index
+from src.common.warm_files import WarmFiles
+
+
+class ProbedEmbedder:
+    """Stands in for LiteLLMEmbedder: the dimension is only known once a response came back."""
+
+    def __init__(self, dim=16):
+        self.name = "probed"
+        self.dim = None
+        self._hashing = HashingEmbedder(dim)
+
+    def embed(self, texts):
+        vectors = self._hashing.embed(texts)
+        self.dim = vectors.shape[1]
+        return vectors
+
+
+def test_index_built_with_embedder_that_learns_its_dimension(tmp_path):
+    prefix = str(tmp_path / "rows.vectors")
+    index = VectorIndex(prefix, ProbedEmbedder())
+    index.sync(["a", "b"], ["green manufacturing grant", "overseas expansion loan"])
+
+    assert np.load(f"{prefix}.npy").shape == (2, 16)
+    assert index.search("manufacturing grant", top_k=1)[0][0] == "a"
+
+    # A fresh embedder reuses the stored index before it has made a call of its own
+    reopened = VectorIndex(prefix, ProbedEmbedder())
+    assert len(reopened) == 2
+    assert reopened.sync(["a", "b"], ["green manufacturing grant", "overseas expansion loan"]) == 0
+
+
+def test_changed_rows_are_embedded_again(tmp_path):
+    index = VectorIndex(str(tmp_path / "rows.vectors"), HashingEmbedder(32))
+    assert index.sync(["a", "b"], ["one", "two"]) == 2
+    assert index.sync(["a", "b", "c"], ["one", "two changed", "three"]) == 2
+    assert len(index) == 3
+
+
+def test_warm_index_is_only_synced_again_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "grants.csv")
+    pd.DataFrame({"name": ["a", "b", "c"], "description": ["green manufacturing grant", "overseas expansion loan",
+                                                           "digital skills training"]}).to_csv(path, index=False)
+    embedder = HashingEmbedder(64)
+    synced = []
+
+    def load_vector_index(csv_path):
+        synced.append(csv_path)
+        return sync_csv_index(pd.read_csv(csv_path), csv_path, "name", ["description"], embedder)
+
+    warm = WarmFiles()
+    df = pd.read_csv(path)
+    for _ in range(3):
+        hits = semantic_candidates("manufacturing grant", warm.get(path, load_vector_index), df, "name", 2)
+        assert hits["name"].tolist()[0] == "a"
+    assert len(synced) == 1
+    # Searching a subset of the rows
+    assert semantic_candidates("manufacturing grant", warm.get(path, load_vector_index), df, "name", 2,
+                               df.iloc[1:])["name"].tolist()[0] != "a"
+
+    pd.DataFrame({"name": ["d"], "description": ["manufacturing grant for steel works"]}).to_csv(path, index=False)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    df = pd.read_csv(path)
+    hits = semantic_candidates("manufacturing grant", warm.get(path, load_vector_index), df, "name", 2)
+    assert hits["name"].tolist() == ["d"]
+    assert len(synced) == 2